@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+# HTTP statuses that mean the provider is overloaded rather than the request is bad
+OVERLOAD_STATUSES = (429, 500, 502, 503, 504)
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """HTTP status of a provider SDK error, if it carries one."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_overload(error: BaseException) -> bool:
+    """True for throttling (429), server errors and timeouts."""
+    if error_status(error) in OVERLOAD_STATUSES:
+        return True
+    return isinstance(error, TimeoutError) or "Timeout" in type(error).__name__
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on the number of in-flight LLM requests to one provider.
+
+    Every successful request whose latency is normal and that used the
+    last free slot raises the limit by 1/limit, i.e. by one per round of
+    ``limit`` requests (additive increase). Requests started while slots
+    were left over do not, so the limit never runs far ahead of the
+    concurrency actually reached and a decrease takes effect at once.
+
+    A 429, server error or timeout, or a latency spike, halves the limit
+    (multiplicative decrease), at most once per round trip: requests that
+    started before the last decrease do not trigger another one. Latency
+    is compared per estimated token against a moving baseline, so large
+    requests are not mistaken for spikes.
+
+    Calls beyond the limit wait for a slot. The limit grows to at most one
+    above the number of threads making calls, so SCHEDULER_WORKERS and
+    SCHEDULER_SESSION_CONCURRENCY (or WORKER_THREADS) act as upper bounds.
+    """
+
+    def call(self, fn: Callable[..., Any], *args: Any, tokens: int = 0, **kwargs: Any) -> Any:
+        """
+        Run one LLM request under the limit.
+
+        Args:
+            fn: The request, e.g. ``client.summarize``
+            *args: Positional arguments for ``fn``
+            tokens: Estimated size of the request, for latency normalization
+            **kwargs: Keyword arguments for ``fn``
+        """
+        started, saturated = self._acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._release(started, saturated, tokens, error=e)
+            raise
+        self._release(started, saturated, tokens)
+        return result
+
+    def stream(self, make_stream: Callable[[], Iterable[str]], tokens: int = 0) -> Iterator[str]:
+        """Yield from a streaming LLM request, holding a slot until the stream ends."""
+        started, saturated = self._acquire()
+        try:
+            yield from make_stream()
+        except BaseException as e:
+            self._release(started, saturated, tokens, error=e)
+            raise
+        self._release(started, saturated, tokens)
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(self.min_limit, int(self._limit))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "baseline_latency_ms_per_1k_tokens": round(self._baseline * 1000, 1) if self._baseline else None,
+                "throttled": self._throttled,
+                "decreases": self._decreases,
+            }
+
+    def _acquire(self) -> Tuple[float, bool]:
+        """Wait for a slot; returns the start time and whether the request took the last free slot."""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            saturated = self._in_flight >= self.limit
+        return self._clock(), saturated
+
+    def _release(
+        self,
+        started: float,
+        saturated: bool,
+        tokens: int,
+        error: Optional[BaseException] = None
+    ) -> None:
+        latency = (self._clock() - started) / (1 + tokens / 1000)
+        with self._cond:
+            self._in_flight -= 1
+            if error is not None:
+                if is_overload(error):
+                    if error_status(error) == 429:
+                        self._throttled += 1
+                    self._decrease(started)
+            elif self._baseline and latency > self._baseline * self.latency_spike_factor:
+                self._decrease(started)
+            elif saturated:
+                # Only grow a limit that actually held requests back
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            if error is None:
+                # Moving baseline of normalized latency
+                self._baseline = latency if self._baseline is None else 0.9 * self._baseline + 0.1 * latency
+            self._cond.notify_all()
+
+    def _decrease(self, started: float) -> None:
+        """Multiplicative decrease, unless the request predates the last one (caller holds the lock)."""
+        if started < self._last_decrease:
+            return
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        self._last_decrease = self._clock()
+        self._decreases += 1
+
+    def __init__(
+        self,
+        initial: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Initialize the AdaptiveLimiter.
+
+        Defaults come from environment variables:
+            ADAPTIVE_INITIAL_CONCURRENCY: Starting limit (4 default)
+            ADAPTIVE_MIN_CONCURRENCY / ADAPTIVE_MAX_CONCURRENCY: Bounds (1 / 32 default)
+            ADAPTIVE_LATENCY_SPIKE_FACTOR: Latency over baseline that counts as a spike (2.0 default)
+            ADAPTIVE_DECREASE_FACTOR: Multiplier applied on overload (0.5 default)
+
+        Args:
+            initial: Starting limit
+            min_limit: Lowest limit
+            max_limit: Highest limit
+            clock: Monotonic time source in seconds, for request latency
+        """
+        self.min_limit = min_limit or int(os.getenv("ADAPTIVE_MIN_CONCURRENCY", "1"))
+        self.max_limit = max_limit or int(os.getenv("ADAPTIVE_MAX_CONCURRENCY", "32"))
+        self.latency_spike_factor = float(os.getenv("ADAPTIVE_LATENCY_SPIKE_FACTOR", "2.0"))
+        self.decrease_factor = float(os.getenv("ADAPTIVE_DECREASE_FACTOR", "0.5"))
+        start = initial or int(os.getenv("ADAPTIVE_INITIAL_CONCURRENCY", "4"))
+        self._limit = float(min(max(start, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        # Normalized latency baseline (seconds per 1k tokens), None until the first success
+        self._baseline: Optional[float] = None
+        self._last_decrease = 0.0
+        self._throttled = 0
+        self._decreases = 0
+        self._cond = threading.Condition()
+        self._clock = clock
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> Optional[AdaptiveLimiter]:
+    """
+    Return the limiter shared by every request to ``provider`` in this process.
+
+    Returns None when ADAPTIVE_CONCURRENCY is "0".
+    """
+    if os.getenv("ADAPTIVE_CONCURRENCY", "1") == "0":
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = AdaptiveLimiter()
+        return limiter
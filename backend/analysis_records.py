@@ -0,0 +1,219 @@
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+
+def intern(value: Optional[str]) -> Optional[str]:
+    """Intern a string so repeated names share one object; passes None through."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class FunctionRecord:
+    """A function or method found anywhere in a file."""
+
+    __slots__ = ("name", "args", "returns", "docstring")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'args': list(self.args),
+            'returns': self.returns,
+            'docstring': self.docstring
+        }
+
+    def __init__(self, name: str, args: Tuple[str, ...], returns: Optional[str], docstring: Optional[str]) -> None:
+        self.name = intern(name)
+        self.args = tuple(intern(a) for a in args)
+        self.returns = intern(returns)
+        self.docstring = docstring
+
+
+class ClassRecord:
+    """A top-level class with its bases and method names."""
+
+    __slots__ = ("name", "bases", "methods", "docstring")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'bases': list(self.bases),
+            'methods': list(self.methods),
+            'docstring': self.docstring
+        }
+
+    def __init__(self, name: str, bases: Tuple[str, ...], methods: Tuple[str, ...], docstring: Optional[str]) -> None:
+        self.name = intern(name)
+        self.bases = tuple(intern(b) for b in bases)
+        self.methods = tuple(intern(m) for m in methods)
+        self.docstring = docstring
+
+
+class ModuleSymbols:
+    """
+    Function and class names defined by one project module.
+
+    One instance exists per module and is shared by every file that imports
+    it, instead of each file holding its own copy of the resolved lists.
+    """
+
+    __slots__ = ("source_file", "functions", "classes")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize as a local cross_library_functions entry."""
+        return {
+            'source_file': self.source_file,
+            'functions': list(self.functions),
+            'classes': list(self.classes),
+            'is_local': True
+        }
+
+    def __init__(self, source_file: str, functions: Tuple[str, ...], classes: Tuple[str, ...]) -> None:
+        self.source_file = intern(source_file)
+        self.functions = tuple(intern(f) for f in functions)
+        self.classes = tuple(intern(c) for c in classes)
+
+
+class FileMetrics:
+    """Size and complexity measures for one file."""
+
+    __slots__ = (
+        "lines", "code_lines", "comment_lines", "blank_lines",
+        "complexity", "max_complexity", "max_nesting", "functions"
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'lines': self.lines,
+            'code_lines': self.code_lines,
+            'comment_lines': self.comment_lines,
+            'blank_lines': self.blank_lines,
+            'complexity': self.complexity,
+            'max_complexity': self.max_complexity,
+            'max_nesting': self.max_nesting,
+            'functions': [
+                {'name': name, 'line': line, 'lines': length, 'complexity': complexity, 'max_nesting': nesting}
+                for name, line, length, complexity, nesting in self.functions
+            ]
+        }
+
+    def __init__(
+        self,
+        lines: int,
+        code_lines: int,
+        comment_lines: int,
+        blank_lines: int,
+        complexity: int,
+        max_nesting: int,
+        functions: Tuple[Tuple[str, int, int, int, int], ...]
+    ) -> None:
+        """
+        Args:
+            lines: Physical lines in the file
+            code_lines: Lines containing code (including docstrings)
+            comment_lines: Lines containing only a comment
+            blank_lines: Empty or whitespace-only lines
+            complexity: Cyclomatic complexity of the whole file
+            max_nesting: Deepest nesting of control-flow blocks
+            functions: (qualified name, first line, length in lines,
+                cyclomatic complexity, max nesting) per function
+        """
+        self.lines = lines
+        self.code_lines = code_lines
+        self.comment_lines = comment_lines
+        self.blank_lines = blank_lines
+        self.complexity = complexity
+        self.max_complexity = max((f[3] for f in functions), default=0)
+        self.max_nesting = max_nesting
+        self.functions = tuple((intern(name), line, length, cc, nesting) for name, line, length, cc, nesting in functions)
+
+
+def external_library_entry() -> Dict[str, Any]:
+    """cross_library_functions entry for an import that is not a project file."""
+    return {
+        'source_file': None,
+        'functions': [],
+        'classes': [],
+        'is_local': False,
+        'note': 'External library'
+    }
+
+
+class FileAnalysis:
+    """
+    Compact analysis result for one file.
+
+    Names are interned and stored once: docstrings live on the function and
+    class records (not in a separate dict), type hints are tuples, and
+    cross-library entries point at shared ModuleSymbols. ``to_dict()``
+    produces exactly the JSON shape returned by
+    ``DependencyGenerator.summarize_file``.
+    """
+
+    __slots__ = (
+        "imports", "functions", "classes", "module_docstring",
+        "type_hints", "constants", "cross_library", "metrics", "todos"
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            'imports': list(self.imports),
+            'functions': [f.to_dict() for f in self.functions],
+            'classes': [c.to_dict() for c in self.classes],
+            'docstrings': {
+                'module': self.module_docstring,
+                'functions': {f.name: f.docstring for f in self.functions},
+                'classes': {c.name: c.docstring for c in self.classes}
+            },
+            'type_hints': {
+                name: {'args': dict(args), 'returns': returns}
+                for name, args, returns in self.type_hints
+            },
+            'constants': [{'name': name, 'value': value} for name, value in self.constants],
+            'metrics': self.metrics.to_dict() if self.metrics is not None else None,
+            'todos': [{'line': line, 'tag': tag, 'text': text} for line, tag, text in self.todos],
+        }
+        if self.cross_library is not None:
+            result['cross_library_functions'] = {
+                imp: symbols.to_dict() if symbols is not None else external_library_entry()
+                for imp, symbols in self.cross_library
+            }
+        return result
+
+    def __init__(
+        self,
+        imports: Tuple[str, ...],
+        functions: Tuple[FunctionRecord, ...],
+        classes: Tuple[ClassRecord, ...],
+        module_docstring: Optional[str],
+        type_hints: Tuple[Tuple[str, Tuple[Tuple[str, Optional[str]], ...], Optional[str]], ...],
+        constants: Tuple[Tuple[str, str], ...],
+        cross_library: Optional[Tuple[Tuple[str, Optional[ModuleSymbols]], ...]] = None,
+        metrics: Optional[FileMetrics] = None,
+        todos: Tuple[Tuple[int, str, str], ...] = ()
+    ) -> None:
+        """
+        Args:
+            imports: Import strings in source order
+            functions: Every function/method definition
+            classes: Top-level classes
+            module_docstring: The module docstring, if any
+            type_hints: (function name, ((arg, annotation), ...), return annotation)
+                for top-level functions
+            constants: (name, value repr) for module-level constants
+            cross_library: (import, shared ModuleSymbols or None if external),
+                or None when no project files were given
+            metrics: Size and complexity measures, or None if the file
+                could not be parsed
+            todos: (line, "TODO" or "FIXME", comment text) per comment
+        """
+        self.imports = tuple(intern(i) for i in imports)
+        self.functions = functions
+        self.classes = classes
+        self.module_docstring = module_docstring
+        self.type_hints = tuple(
+            (intern(name), tuple((intern(arg), intern(ann)) for arg, ann in args), intern(returns))
+            for name, args, returns in type_hints
+        )
+        self.constants = tuple((intern(name), value) for name, value in constants)
+        self.cross_library = cross_library
+        self.metrics = metrics
+        self.todos = tuple(todos)
@@ -0,0 +1,155 @@
+import json
+import re
+from typing import Dict, List
+
+
+# Delimiter placed before every file in a batched request
+BATCH_FILE_MARKER = "===== FILE: {path} ====="
+_MARKER_PATTERN = re.compile(r"^===== FILE: (.+?) =====$", re.MULTILINE)
+
+BATCH_SYSTEM_PROMPT = '''You are a Senior Software Engineer and Technical Writer with experience documenting enterprise-grade systems.
+Your task is to generate clear, professional, industry-standard documentation for several small source files at once.
+
+Input
+
+Each file starts with a line of the form:
+===== FILE: <relative/path> =====
+followed by the file contents.
+
+Documentation Requirements
+
+For every file produce concise Markdown documentation covering:
+
+Overview (purpose and responsibilities)
+
+Public Interfaces (functions, classes, parameters, return values)
+
+Dependencies and integrations
+
+Usage notes, edge cases and constraints
+
+Mention the file from where imports are being utilised
+
+Output Format
+
+Respond with a single JSON object and nothing else, using exactly this shape:
+{"files": [{"path": "<relative/path>", "documentation": "<markdown>"}]}
+
+Include one entry for every input file, using the path exactly as given.
+
+Begin once the files are provided.'''
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def pack_small_files(
+    files: Dict[str, str],
+    budget_tokens: int,
+    max_file_tokens: int,
+    max_files: int
+) -> List[List[str]]:
+    """
+    Group file paths into work units for LLM requests.
+
+    Files of at most ``max_file_tokens`` are packed together, in order, until
+    adding another would exceed ``budget_tokens`` or ``max_files``. Larger
+    files get a unit of their own.
+
+    Args:
+        files: Dict mapping relative file paths to their contents
+        budget_tokens: Token budget for the file contents of one batch
+        max_file_tokens: Largest file (in tokens) that may be batched
+        max_files: Maximum number of files in one batch
+
+    Returns:
+        List of units, each a list of file paths (single-file units are
+        summarized individually)
+    """
+    units: List[List[str]] = []
+    batch: List[str] = []
+    batch_tokens = 0
+
+    for path, content in files.items():
+        tokens = estimate_tokens(content)
+        if tokens > max_file_tokens or tokens > budget_tokens:
+            units.append([path])
+            continue
+        if batch and (batch_tokens + tokens > budget_tokens or len(batch) >= max_files):
+            units.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(path)
+        batch_tokens += tokens
+
+    if batch:
+        units.append(batch)
+    return units
+
+
+def build_batch_query(files: Dict[str, str]) -> str:
+    """Concatenate files into one request, each preceded by its marker line."""
+    sections = []
+    for path, content in files.items():
+        sections.append(f"{BATCH_FILE_MARKER.format(path=path)}\n{content}")
+    return "\n\n".join(sections)
+
+
+def split_batch_query(query: str) -> Dict[str, str]:
+    """Inverse of build_batch_query: map each file path to its content."""
+    matches = list(_MARKER_PATTERN.finditer(query))
+    files = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(query)
+        files[match.group(1)] = query[match.end() + 1:end].rstrip("\n")
+    return files
+
+
+def parse_batch_response(text: str, expected_paths: List[str]) -> Dict[str, str]:
+    """
+    Extract per-file documentation from a batched response.
+
+    Tolerates Markdown code fences and surrounding prose. Entries for paths
+    that were not requested are ignored; files missing from the response are
+    simply absent from the result so the caller can fall back to single-file
+    requests.
+    """
+    if not text:
+        return {}
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+
+    entries = data.get("files", []) if isinstance(data, dict) else []
+    expected = set(expected_paths)
+    summaries = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        path = entry.get("path")
+        documentation = entry.get("documentation")
+        if path in expected and isinstance(documentation, str) and documentation.strip():
+            summaries[path] = documentation
+    return summaries
+
+
+def summarize_batch(client, files: Dict[str, str]) -> Dict[str, str]:
+    """
+    Summarize several small files with a single LLM request.
+
+    Args:
+        client: LLM client whose summarize() accepts a system_prompt
+        files: Dict mapping relative file paths to their contents
+
+    Returns:
+        Dict mapping file paths to their documentation; files the model
+        skipped or mangled are left out
+    """
+    response = client.summarize(build_batch_query(files), system_prompt=BATCH_SYSTEM_PROMPT)
+    return parse_batch_response(response, list(files.keys()))
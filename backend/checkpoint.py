@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Tuple
+
+
+class Checkpoint:
+    """
+    Append-only record of files whose documentation is fully written.
+
+    Each line of the checkpoint file is a JSON object
+    ``{"file", "hash", "summarized"}``. The content hash lets a resumed job
+    skip files it already finished while still reprocessing files whose
+    contents changed since; ``summarized`` records whether the file got an
+    LLM summary, so a shallow analysis tier can later be deepened.
+    """
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """Return the SHA-256 hex digest of a file's contents."""
+        return hashlib.sha256(content.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+    def is_done(self, file_path: str, content: str, summarized: bool = False) -> bool:
+        """
+        Return True if ``file_path`` was completed with exactly this content.
+
+        With ``summarized``, a completion without an LLM summary does not count.
+        """
+        with self._lock:
+            entry = self._done.get(file_path)
+        if entry is None or entry[0] != self.content_hash(content):
+            return False
+        return entry[1] or not summarized
+
+    def mark_done(self, file_path: str, content: str, summarized: bool = True) -> None:
+        """Record ``file_path`` as completed; flushed to disk immediately."""
+        digest = self.content_hash(content)
+        with self._lock:
+            self._done[file_path] = (digest, summarized)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"file": file_path, "hash": digest, "summarized": summarized}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def mark_removed(self, file_path: str) -> None:
+        """Forget ``file_path``, e.g. after it was deleted from the project."""
+        with self._lock:
+            if self._done.pop(file_path, None) is None:
+                return
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"file": file_path, "hash": None}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def all_summarized(self) -> bool:
+        """True if files are recorded and every one of them got an LLM summary."""
+        with self._lock:
+            return bool(self._done) and all(summarized for _, summarized in self._done.values())
+
+    def completed(self) -> Dict[str, str]:
+        """Return the completed files and their content hashes."""
+        with self._lock:
+            return {file_path: entry[0] for file_path, entry in self._done.items()}
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from a crash mid-write; ignore it
+                    continue
+                if entry["hash"] is None:
+                    self._done.pop(entry["file"], None)
+                else:
+                    self._done[entry["file"]] = (entry["hash"], entry.get("summarized", True))
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the Checkpoint, loading any existing entries.
+
+        Args:
+            path: Path of the checkpoint file (created on first write)
+        """
+        self.path = path
+        self._done: Dict[str, Tuple[str, bool]] = {}
+        self._lock = threading.Lock()
+        parent_dir = os.path.dirname(path)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok=True)
+        self._load()
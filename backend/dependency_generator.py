@@ -1,10 +1,144 @@
 #https://earthly.dev/blog/python-ast/
 import json
 import ast
-try:
-    from graphviz import Digraph
-except Exception:
-    Digraph = None
+import io
+import os
+import re
+import tokenize
+from analysis_records import ClassRecord, FileAnalysis, FileMetrics, FunctionRecord, ModuleSymbols, external_library_entry
+
+# File names treated as entry points by the "entry" analysis tier
+ENTRY_POINT_NAMES = {
+    "main.py", "__main__.py", "app.py", "server.py", "cli.py",
+    "manage.py", "wsgi.py", "asgi.py", "setup.py"
+}
+_MAIN_GUARD = re.compile(r"""^if\s+__name__\s*==\s*['"]__main__['"]\s*:""", re.MULTILINE)
+
+# TODO/FIXME as a whole word, so identifiers such as "todo_list" do not match
+_TODO_TAG = re.compile(r"\b(TODO|FIXME)\b", re.IGNORECASE)
+
+# Tokens that do not make a line count as code
+_NON_CODE_TOKENS = {
+    tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT,
+    tokenize.DEDENT, tokenize.ENDMARKER, tokenize.ENCODING
+}
+
+class _MetricsVisitor(ast.NodeVisitor):
+    """
+    Cyclomatic complexity and nesting depth per function, in one AST walk.
+
+    Complexity is 1 plus one per decision point (if/elif, loops, except
+    handlers, conditional expressions, extra boolean operands, comprehension
+    loops and filters, match cases). Nesting counts control-flow blocks; an
+    ``elif`` stays at the depth of its ``if``. Nested functions are measured
+    on their own and do not add to the enclosing function.
+    """
+
+    def visit_FunctionDef(self, node) -> None:
+        name = ".".join(self._scope + [node.name])
+        # Reserve the slot now so functions are listed in source order
+        index = len(self.functions)
+        self.functions.append(None)
+        frame = [1, 0]
+        self._frames.append(frame)
+        depth, self._depth = self._depth, 0
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+        self._depth = depth
+        self._frames.pop()
+        length = getattr(node, "end_lineno", node.lineno) - node.lineno + 1
+        self.functions[index] = (name, node.lineno, length, frame[0], frame[1])
+        self.complexity += frame[0]
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node) -> None:
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def visit_If(self, node) -> None:
+        self._add_complexity(1)
+        self.visit(node.test)
+        self._visit_block(node.body)
+        orelse = node.orelse
+        # Walk an elif chain at the same depth as its if
+        while len(orelse) == 1 and isinstance(orelse[0], ast.If):
+            self._add_complexity(1)
+            self.visit(orelse[0].test)
+            self._visit_block(orelse[0].body)
+            orelse = orelse[0].orelse
+        if orelse:
+            self._visit_block(orelse)
+
+    def visit_IfExp(self, node) -> None:
+        self._add_complexity(1)
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node) -> None:
+        self._add_complexity(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node) -> None:
+        self._add_complexity(1 + len(node.ifs))
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node) -> None:
+        self._add_complexity(1)
+        self.generic_visit(node)
+
+    def visit_For(self, node) -> None:
+        self._add_complexity(1)
+        self._visit_nested(node)
+
+    visit_AsyncFor = visit_For
+    visit_While = visit_For
+
+    def visit_With(self, node) -> None:
+        self._visit_nested(node)
+
+    visit_AsyncWith = visit_With
+    visit_Try = visit_With
+    visit_TryStar = visit_With
+
+    def visit_Match(self, node) -> None:
+        self._add_complexity(len(node.cases))
+        self._visit_nested(node)
+
+    def _visit_nested(self, node) -> None:
+        self._enter()
+        self.generic_visit(node)
+        self._depth -= 1
+
+    def _visit_block(self, statements) -> None:
+        self._enter()
+        for statement in statements:
+            self.visit(statement)
+        self._depth -= 1
+
+    def _enter(self) -> None:
+        self._depth += 1
+        self.max_nesting = max(self.max_nesting, self._depth)
+        if self._frames:
+            self._frames[-1][1] = max(self._frames[-1][1], self._depth)
+
+    def _add_complexity(self, amount: int) -> None:
+        if self._frames:
+            self._frames[-1][0] += amount
+        else:
+            self.complexity += amount
+
+    def __init__(self) -> None:
+        # (qualified name, line, length, complexity, max nesting) in visit order
+        self.functions = []
+        # Module-level decisions plus every function's complexity
+        self.complexity = 0
+        self.max_nesting = 0
+        self._frames = []
+        self._scope = []
+        self._depth = 0
+
 
 class DependencyGenerator:
     def _safe_parse(self, content):
@@ -14,7 +148,10 @@ class DependencyGenerator:
             return None
     
     def generateGraph(self, content) -> None:
-        if Digraph is None:
+        # Optional backend, imported on first use to keep module import fast
+        try:
+            from graphviz import Digraph
+        except Exception:
             print("graphviz not available; skipping graph generation")
             return None
 
@@ -41,6 +178,9 @@ class DependencyGenerator:
         tree = self._safe_parse(content)
         if tree is None:
             return []
+        return self._imports_from_tree(tree)
+
+    def _imports_from_tree(self, tree) -> list:
         imports = []
         for node in ast.walk(tree):
             if isinstance(node, ast.Import):
@@ -58,6 +198,9 @@ class DependencyGenerator:
         tree = self._safe_parse(content)
         if tree is None:
             return []
+        return [f.to_dict() for f in self._function_records(tree)]
+
+    def _function_records(self, tree) -> list:
         functions = []
         for node in ast.walk(tree):
             if isinstance(node, ast.FunctionDef):
@@ -68,12 +211,7 @@ class DependencyGenerator:
                         returns = ast.unparse(node.returns)
                 except Exception:
                     returns = None
-                functions.append({
-                    'name': node.name,
-                    'args': args,
-                    'returns': returns,
-                    'docstring': ast.get_docstring(node)
-                })
+                functions.append(FunctionRecord(node.name, args, returns, ast.get_docstring(node)))
 
         return functions
 
@@ -85,6 +223,9 @@ class DependencyGenerator:
         tree = self._safe_parse(content)
         if tree is None:
             return []
+        return [c.to_dict() for c in self._class_records(tree)]
+
+    def _class_records(self, tree) -> list:
         classes = []
         for node in tree.body:
             if isinstance(node, ast.ClassDef):
@@ -100,12 +241,7 @@ class DependencyGenerator:
                     if isinstance(child, ast.FunctionDef):
                         methods.append(child.name)
 
-                classes.append({
-                    'name': node.name,
-                    'bases': bases,
-                    'methods': methods,
-                    'docstring': ast.get_docstring(node)
-                })
+                classes.append(ClassRecord(node.name, bases, methods, ast.get_docstring(node)))
 
         return classes
 
@@ -114,13 +250,10 @@ class DependencyGenerator:
         tree = self._safe_parse(content)
         if tree is None:
             return {'module': None, 'functions': {}, 'classes': {}}
-        module_doc = ast.get_docstring(tree)
-        functions = self.extract_functions(content)
-        classes = self.extract_classes(content)
         return {
-            'module': module_doc,
-            'functions': {f['name']: f['docstring'] for f in functions},
-            'classes': {c['name']: c['docstring'] for c in classes}
+            'module': ast.get_docstring(tree),
+            'functions': {f.name: f.docstring for f in self._function_records(tree)},
+            'classes': {c.name: c.docstring for c in self._class_records(tree)}
         }
 
     def extract_type_hints(self, content):
@@ -131,10 +264,17 @@ class DependencyGenerator:
         tree = self._safe_parse(content)
         if tree is None:
             return {}
-        hints = {}
+        return {
+            name: {'args': dict(args), 'returns': returns}
+            for name, args, returns in self._type_hint_entries(tree)
+        }
+
+    def _type_hint_entries(self, tree) -> list:
+        """Return (name, [(arg, annotation)], returns) for top-level functions."""
+        hints = []
         for node in tree.body:
             if isinstance(node, ast.FunctionDef):
-                arg_hints = {}
+                arg_hints = []
                 for arg in node.args.args:
                     ann = None
                     if arg.annotation is not None:
@@ -142,14 +282,14 @@ class DependencyGenerator:
                             ann = ast.unparse(arg.annotation)
                         except Exception:
                             ann = None
-                    arg_hints[arg.arg] = ann
+                    arg_hints.append((arg.arg, ann))
                 ret = None
                 if node.returns is not None:
                     try:
                         ret = ast.unparse(node.returns)
                     except Exception:
                         ret = None
-                hints[node.name] = {'args': arg_hints, 'returns': ret}
+                hints.append((node.name, arg_hints, ret))
         return hints
 
     def extract_top_level_constants(self, content):
@@ -160,6 +300,9 @@ class DependencyGenerator:
         tree = self._safe_parse(content)
         if tree is None:
             return []
+        return [{'name': name, 'value': value} for name, value in self._constant_entries(tree)]
+
+    def _constant_entries(self, tree) -> list:
         consts = []
         for node in tree.body:
             if isinstance(node, ast.Assign):
@@ -171,18 +314,67 @@ class DependencyGenerator:
                 if isinstance(node.value, (ast.Constant, ast.Num, ast.Str, ast.Bytes)):
                     val = node.value.value if isinstance(node.value, ast.Constant) else None
                     for n in names:
-                        consts.append({'name': n, 'value': repr(val)})
+                        consts.append((n, repr(val)))
         return consts
 
+    def is_entry_point(self, file_path: str, content: str) -> bool:
+        """
+        Return True for files that are likely program entry points.
+
+        Matches conventional entry-point file names and modules with a
+        top-level ``if __name__ == "__main__":`` block.
+        """
+        if os.path.basename(file_path) in ENTRY_POINT_NAMES:
+            return True
+        return bool(_MAIN_GUARD.search(content))
+
     def extract_todos(self, content):
-        """Return list of comment TODO/FIXME lines with line numbers."""
+        """Return the TODO/FIXME comments with line numbers."""
+        _, _, todos = self._scan_tokens(content)
+        return [{'line': line, 'tag': tag, 'text': text} for line, tag, text in todos]
+
+    def _scan_tokens(self, content) -> tuple:
+        """
+        Classify lines and collect TODO/FIXME comments in one tokenizer pass.
+
+        Only real ``#`` comments are considered, so the words inside strings
+        and identifiers are ignored.
+
+        Returns:
+            (code line numbers, comment line numbers, [(line, tag, text)])
+        """
+        code_rows = set()
+        comment_rows = set()
         todos = []
-        for i, line in enumerate(content.splitlines(), start=1):
-            idx = line.lower().find('todo')
-            fix = line.lower().find('fixme')
-            if idx != -1 or fix != -1:
-                todos.append({'line': i, 'text': line.strip()})
-        return todos
+        try:
+            for tok in tokenize.generate_tokens(io.StringIO(content).readline):
+                if tok.type == tokenize.COMMENT:
+                    comment_rows.add(tok.start[0])
+                    match = _TODO_TAG.search(tok.string)
+                    if match:
+                        todos.append((tok.start[0], match.group(1).upper(), tok.string.lstrip('#').strip()))
+                elif tok.type not in _NON_CODE_TOKENS:
+                    code_rows.update(range(tok.start[0], tok.end[0] + 1))
+        except (tokenize.TokenError, SyntaxError):
+            pass
+        return code_rows, comment_rows, todos
+
+    def _file_metrics(self, tree, content) -> tuple:
+        """Return (FileMetrics, todos) from one AST walk and one tokenizer pass."""
+        visitor = _MetricsVisitor()
+        visitor.visit(tree)
+        code_rows, comment_rows, todos = self._scan_tokens(content)
+        lines = content.splitlines()
+        metrics = FileMetrics(
+            lines=len(lines),
+            code_lines=len(code_rows),
+            comment_lines=len(comment_rows - code_rows),
+            blank_lines=sum(1 for row, line in enumerate(lines, start=1) if not line.strip() and row not in code_rows),
+            complexity=visitor.complexity,
+            max_nesting=visitor.max_nesting,
+            functions=visitor.functions
+        )
+        return metrics, todos
 
     def analyze_cross_library_imports(
         self, 
@@ -200,50 +392,182 @@ class DependencyGenerator:
             Dict mapping import names to their resolved information including
             available functions/classes from the source file.
         """
-        cross_library_info = {}
-        
+        return {
+            imp: symbols.to_dict() if symbols is not None else external_library_entry()
+            for imp, symbols in self._resolve_imports(imports, project_files)
+        }
+
+    def _resolve_imports(self, imports: list, project_files: dict, symbol_source=None) -> tuple:
+        """
+        Resolve imports to shared ModuleSymbols (None for external libraries).
+
+        Resolutions and module symbol tables are cached per project, so each
+        project module is parsed once no matter how many files import it.
+        ``symbol_source``, if given, is asked for a module's ModuleSymbols
+        first; modules it returns None for are parsed from project_files.
+        """
+        resolutions, module_symbols = self._project_caches(project_files)
+        resolved = []
         for imp in imports:
-            # Parse the import to get module path
-            parts = imp.split('.')
+            if imp not in resolutions:
+                resolutions[imp] = self._find_import_source(imp, project_files)
+            rel_path = resolutions[imp]
+            if rel_path is None:
+                resolved.append((imp, None))
+                continue
+            if rel_path not in module_symbols:
+                symbols = symbol_source(rel_path) if symbol_source is not None else None
+                if symbols is None:
+                    tree = self._safe_parse(project_files[rel_path])
+                    symbols = ModuleSymbols(
+                        rel_path,
+                        [f.name for f in self._function_records(tree)] if tree is not None else [],
+                        [c.name for c in self._class_records(tree)] if tree is not None else []
+                    )
+                module_symbols[rel_path] = symbols
+            resolved.append((imp, module_symbols[rel_path]))
+        return tuple(resolved)
+
+    def _find_import_source(self, imp: str, project_files: dict):
+        """Return the first project file matching an import string, or None."""
+        # Parse the import to get module path
+        parts = imp.split('.')
+        if not parts:
+            return None
+
+        # Try to find matching project file
+        possible_paths = [
+            f"{'/'.join(parts)}.py",
+            f"{parts[0]}.py",
+            f"{'/'.join(parts[:-1])}.py" if len(parts) > 1 else None
+        ]
+
+        for rel_path in project_files.keys():
+            for possible in possible_paths:
+                if possible and rel_path.endswith(possible):
+                    return rel_path
+        return None
+
+    def _project_caches(self, project_files: dict) -> tuple:
+        """Return (import resolutions, module symbols) caches for this project dict."""
+        # Compare by identity; holding the reference keeps the id from being reused
+        if self._cached_project is not project_files:
+            self._cached_project = project_files
+            self._import_resolutions = {}
+            self._module_symbols = {}
+        return self._import_resolutions, self._module_symbols
+
+    def _module_index(self, project_files: dict) -> dict:
+        """
+        Map dotted module names to project file paths.
+
+        Every ``.py`` file is registered under its full dotted path and under
+        each shorter dotted suffix (so ``pkg/util.py`` answers to
+        ``pkg.util`` and ``util``), mirroring the suffix matching used by
+        analyze_cross_library_imports. Full names win over suffixes.
+        """
+        modules = {}
+        suffixes = {}
+        for rel_path in project_files:
+            if not rel_path.endswith('.py'):
+                continue
+            parts = rel_path[:-3].replace('\\', '/').split('/')
+            if parts[-1] == '__init__':
+                parts = parts[:-1]
             if not parts:
                 continue
-                
-            # Try to find matching project file
-            possible_paths = [
-                f"{'/'.join(parts)}.py",
-                f"{parts[0]}.py",
-                f"{'/'.join(parts[:-1])}.py" if len(parts) > 1 else None
-            ]
-            
-            for rel_path in project_files.keys():
-                for possible in possible_paths:
-                    if possible and rel_path.endswith(possible):
-                        # Found a matching file, extract its contents
-                        source_content = project_files[rel_path]
-                        source_functions = self.extract_functions(source_content)
-                        source_classes = self.extract_classes(source_content)
-                        
-                        cross_library_info[imp] = {
-                            'source_file': rel_path,
-                            'functions': [f['name'] for f in source_functions],
-                            'classes': [c['name'] for c in source_classes],
-                            'is_local': True
-                        }
+            modules.setdefault('.'.join(parts), rel_path)
+            for i in range(1, len(parts)):
+                suffixes.setdefault('.'.join(parts[i:]), rel_path)
+        for name, rel_path in suffixes.items():
+            modules.setdefault(name, rel_path)
+        return modules
+
+    def _resolve_relative(self, rel_path: str, module, level: int):
+        """Turn a relative import (``from ..a import b``) into a dotted module name."""
+        if not level:
+            return module
+        package = rel_path.replace('\\', '/').split('/')[:-1]
+        if level > 1:
+            package = package[:-(level - 1)] if level - 1 <= len(package) else []
+        return '.'.join(package + ([module] if module else []))
+
+    def build_reference_index(self, project_files: dict) -> dict:
+        """
+        Build the reverse ("used by") reference table for a whole project.
+
+        Makes one pass over every Python file's imports, recording which
+        files use which symbols of which project modules. Covers
+        ``from module import name`` and attribute access on imported modules
+        (``import pkg.mod as m; m.func()``).
+
+        Args:
+            project_files: Dict mapping relative file paths to their contents
+
+        Returns:
+            Dict mapping a source file path to ``{symbol: [user file paths]}``
+        """
+        modules = self._module_index(project_files)
+        references = {}
+
+        def record(target, symbol, user):
+            if target and target != user and symbol and symbol != '*':
+                references.setdefault(target, {}).setdefault(symbol, set()).add(user)
+
+        for rel_path, content in project_files.items():
+            if not rel_path.endswith('.py'):
+                continue
+            tree = self._safe_parse(content)
+            if tree is None:
+                continue
+
+            # Local names bound to project modules, e.g. {'m': 'pkg.mod'}
+            module_aliases = {}
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    for alias in node.names:
+                        if alias.asname:
+                            module_aliases[alias.asname] = alias.name
+                        else:
+                            # "import a.b" binds "a"; attribute chains start there
+                            module_aliases[alias.name.split('.')[0]] = alias.name.split('.')[0]
+                elif isinstance(node, ast.ImportFrom):
+                    module = self._resolve_relative(rel_path, node.module, node.level)
+                    for alias in node.names:
+                        submodule = f"{module}.{alias.name}" if module else alias.name
+                        if submodule in modules:
+                            # "from pkg import mod" imports a module, not a symbol
+                            module_aliases[alias.asname or alias.name] = submodule
+                        elif module in modules:
+                            record(modules[module], alias.name, rel_path)
+
+            if not module_aliases:
+                continue
+            for node in ast.walk(tree):
+                if not isinstance(node, ast.Attribute):
+                    continue
+                # Flatten "a.b.c.d" and find the longest prefix naming a module
+                chain = []
+                current = node
+                while isinstance(current, ast.Attribute):
+                    chain.append(current.attr)
+                    current = current.value
+                if not isinstance(current, ast.Name) or current.id not in module_aliases:
+                    continue
+                chain.reverse()
+                base = module_aliases[current.id]
+                for i in range(len(chain) - 1, -1, -1):
+                    module = '.'.join([base] + chain[:i])
+                    if module in modules:
+                        # "pkg.mod" itself is a submodule access, not a symbol
+                        if f"{module}.{chain[i]}" not in modules:
+                            record(modules[module], chain[i], rel_path)
                         break
-                if imp in cross_library_info:
-                    break
-            
-            # If not found in project, mark as external
-            if imp not in cross_library_info:
-                cross_library_info[imp] = {
-                    'source_file': None,
-                    'functions': [],
-                    'classes': [],
-                    'is_local': False,
-                    'note': 'External library'
-                }
-        
-        return cross_library_info
+
+        return {
+            target: {symbol: sorted(users) for symbol, users in symbols.items()}
+            for target, symbols in references.items()
+        }
 
     def summarize_file(self, content: str, project_files: dict = {}) -> dict:
         """
@@ -256,28 +580,51 @@ class DependencyGenerator:
         Returns:
             Dict containing all extracted information about the file
         """
+        return self.analyze_file(content, project_files).to_dict()
+
+    def analyze_file(self, content: str, project_files: dict = {}, symbol_source=None) -> FileAnalysis:
+        """
+        Analyze a file into a compact FileAnalysis record.
         
-        imports = self.extract_imports(content)
+        Parses the file once and runs every extractor on the same tree;
+        metrics and TODO/FIXME comments come from one further AST walk and
+        one tokenizer pass. ``to_dict()`` on the result gives the
+        summarize_file JSON shape.
         
-        result = {
-            'imports': imports,
-            'functions': self.extract_functions(content),
-            'classes': self.extract_classes(content),
-            'docstrings': self.extract_docstrings(content),
-            'type_hints': self.extract_type_hints(content),
-            'constants': self.extract_top_level_constants(content),
-        }
+        Args:
+            content: The file content to analyze
+            project_files: Optional dict of all project files for cross-library analysis
+            symbol_source: Optional callable returning the ModuleSymbols of a
+                project file (or None), e.g. from a session's search index, so
+                the contents of project_files need not be available
+        """
+        tree = self._safe_parse(content)
+        if tree is None:
+            analysis = FileAnalysis((), (), (), None, (), ())
+            imports = []
+        else:
+            imports = self._imports_from_tree(tree)
+            metrics, todos = self._file_metrics(tree, content)
+            analysis = FileAnalysis(
+                imports=imports,
+                functions=tuple(self._function_records(tree)),
+                classes=tuple(self._class_records(tree)),
+                module_docstring=ast.get_docstring(tree),
+                type_hints=self._type_hint_entries(tree),
+                constants=self._constant_entries(tree),
+                metrics=metrics,
+                todos=todos
+            )
         
         # Add cross-library analysis if project files are provided
         if project_files:
-            result['cross_library_functions'] = self.analyze_cross_library_imports(
-                imports, project_files
-            )
+            analysis.cross_library = self._resolve_imports(imports, project_files, symbol_source)
         
-        return result
+        return analysis
 
     def __init__(self) -> None:
         """Initialize the DependencyGenerator."""
-        pass
-
-
+        # Per-project caches used by cross-library resolution
+        self._cached_project = None
+        self._import_resolutions = {}
+        self._module_symbols = {}
@@ -0,0 +1,467 @@
+import html
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class DocumentView:
+    """
+    Render-ready view of one file's analysis result.
+
+    Built in a single pass over the analysis dict: docstring, "used by" and
+    cross-library lookups are resolved once here, so every output format
+    renders from plain tuples instead of repeating nested ``.get()`` chains.
+    """
+
+    __slots__ = (
+        "file_name", "summary", "imports", "functions", "classes",
+        "type_hints", "constants", "metrics", "todos"
+    )
+
+    @classmethod
+    def from_analysis(cls, data: Dict[str, Any]) -> "DocumentView":
+        """Create a view from a per-file JSON document."""
+        view = cls()
+        view.file_name = data.get("file_name", "No file name provided.")
+        view.summary = data.get("summary", "No summary provided.")
+
+        cross_library_info = data.get("cross_library_functions", {})
+        view.imports = []
+        for imp in data.get("imports", []):
+            info = cross_library_info.get(imp)
+            if info is None:
+                view.imports.append((imp, None, None))
+            else:
+                view.imports.append((imp, info.get("functions"), info.get("source_file")))
+
+        docstrings = data.get("docstrings", {})
+        function_docs = docstrings.get("functions", {})
+        class_docs = docstrings.get("classes", {})
+        used_by = data.get("used_by", {})
+
+        view.functions = []
+        for func in data.get("functions", []):
+            name = func.get("name", "Unnamed function")
+            view.functions.append((
+                name,
+                func.get("args", []),
+                func.get("returns", "No return value specified"),
+                function_docs.get(name, "No description provided."),
+                used_by.get(name)
+            ))
+
+        view.classes = []
+        for cls_info in data.get("classes", []):
+            name = cls_info.get("name", "Unnamed class")
+            view.classes.append((
+                name,
+                cls_info.get("bases", []),
+                cls_info.get("methods", []),
+                class_docs.get(name, "No description provided."),
+                used_by.get(name)
+            ))
+
+        view.type_hints = [
+            (func_name, hints.get("args", {}), hints.get("returns"))
+            for func_name, hints in data.get("type_hints", {}).items()
+        ]
+
+        view.constants = []
+        for const in data.get("constants", []):
+            if isinstance(const, dict):
+                view.constants.append((const.get("name", "Unknown"), const.get("value", "N/A")))
+            else:
+                view.constants.append((const, None))
+
+        view.metrics = data.get("metrics")
+        view.todos = [
+            (todo.get("line"), todo.get("tag", "TODO"), todo.get("text", ""))
+            for todo in data.get("todos", [])
+        ]
+        return view
+
+
+# (label, key) of the file-level metrics shown in the Metrics section
+METRIC_LABELS = (
+    ("Lines", "lines"),
+    ("Code lines", "code_lines"),
+    ("Comment lines", "comment_lines"),
+    ("Blank lines", "blank_lines"),
+    ("Cyclomatic complexity", "complexity"),
+    ("Highest function complexity", "max_complexity"),
+    ("Deepest nesting", "max_nesting"),
+)
+
+
+class Renderer(ABC):
+    """
+    Base class for output formats.
+
+    Subclasses declare their section templates in ``TEMPLATES``; they are
+    compiled once per class into bound ``str.format`` callables (``self.t``)
+    and reused for every document.
+    """
+
+    # Output sub-folder and file extension for this format
+    name = ""
+    extension = ""
+    TEMPLATES: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.t = {key: template.format for key, template in cls.TEMPLATES.items()}
+
+    def render(self, view: DocumentView) -> str:
+        """Render a complete document."""
+        return self.render_header(view) + self.render_summary(view.summary) + self.render_details(view)
+
+    @abstractmethod
+    def render_header(self, view: DocumentView) -> str:
+        """Render everything up to (not including) the summary text."""
+
+    @abstractmethod
+    def render_summary(self, summary: str) -> str:
+        """Render the summary text."""
+
+    @abstractmethod
+    def render_details(self, view: DocumentView) -> str:
+        """Render every section that follows the summary."""
+
+    def render_index(self, entries: List[Tuple[str, str, str]]) -> Optional[str]:
+        """
+        Render the site index for this format, or None if it has none.
+
+        Args:
+            entries: (file name, relative link, short description) per document
+        """
+        return None
+
+
+class MarkdownRenderer(Renderer):
+    """
+    Markdown documents, one per source file.
+
+    Has no site index of its own: the Markdown index is the project-wide
+    index.md written from ProjectAggregator.render_index.
+    """
+
+    name = "md"
+    extension = "md"
+    TEMPLATES = {
+        "header": "# File Name\n\n`{file_name}`\n\n# Summary\n\n",
+        "summary": "{summary}\n\n",
+        "import": "- `{imp}`\n",
+        "import_functions": "  - **Available functions:** {functions}\n",
+        "import_source": "  - **Source:** `{source}`\n",
+        "function": (
+            "### `{name}()`\n\n"
+            "- **Arguments:** `{args}`\n"
+            "- **Returns:** `{returns}`\n"
+            "- **Description:** {description}\n"
+        ),
+        "class": "### `{name}`\n\n",
+        "class_bases": "- **Inherits from:** `{bases}`\n",
+        "class_methods": "- **Methods:** `{methods}`\n",
+        "description": "- **Description:** {description}\n",
+        "used_by": "- **Used by:** {users}\n",
+        "user": "`{user}`",
+        "type_hint": "### `{name}`\n\n",
+        "type_hint_row": "| `{arg}` | `{hint}` |\n",
+        "type_hint_returns": "\n**Returns:** `{returns}`\n\n",
+        "constant": "| `{name}` | `{value}` |\n",
+        "constant_plain": "| `{name}` | - |\n",
+        "metric": "| {label} | {value} |\n",
+        "function_metric": "| `{name}` | {line} | {lines} | {complexity} | {nesting} |\n",
+        "todo": "- Line {line} **{tag}**: {text}\n",
+    }
+
+    def render_header(self, view: DocumentView) -> str:
+        return self.t["header"](file_name=view.file_name)
+
+    def render_summary(self, summary: str) -> str:
+        return self.t["summary"](summary=summary)
+
+    def render_details(self, view: DocumentView) -> str:
+        t = self.t
+        out: List[str] = ["## Imports\n\n"]
+        if view.imports:
+            out.append("This script imports the following modules:\n\n")
+            for imp, functions, source in view.imports:
+                out.append(t["import"](imp=imp))
+                if functions:
+                    out.append(t["import_functions"](functions=", ".join(functions)))
+                if source:
+                    out.append(t["import_source"](source=source))
+        else:
+            out.append("No imports found.\n")
+        out.append("\n")
+
+        out.append("## Functions\n\n")
+        if view.functions:
+            for name, args, returns, description, used_by in view.functions:
+                out.append(t["function"](
+                    name=name, args=", ".join(args) if args else "None",
+                    returns=returns, description=description
+                ))
+                if used_by:
+                    out.append(t["used_by"](users=", ".join(t["user"](user=user) for user in used_by)))
+                out.append("\n")
+        else:
+            out.append("No functions found.\n")
+        out.append("\n")
+
+        out.append("## Classes\n\n")
+        if view.classes:
+            for name, bases, methods, description, used_by in view.classes:
+                out.append(t["class"](name=name))
+                if bases:
+                    out.append(t["class_bases"](bases=", ".join(bases)))
+                if methods:
+                    out.append(t["class_methods"](methods=", ".join(methods)))
+                out.append(t["description"](description=description))
+                if used_by:
+                    out.append(t["used_by"](users=", ".join(t["user"](user=user) for user in used_by)))
+                out.append("\n")
+        else:
+            out.append("No classes found.\n")
+        out.append("\n")
+
+        if view.type_hints:
+            out.append("## Type Hints\n\n")
+            for name, args, returns in view.type_hints:
+                out.append(t["type_hint"](name=name))
+                if args:
+                    out.append("| Argument | Type |\n|----------|------|\n")
+                    for arg, hint in args.items():
+                        out.append(t["type_hint_row"](arg=arg, hint=hint or "Any"))
+                if returns:
+                    out.append(t["type_hint_returns"](returns=returns))
+
+        out.append("## Constants\n\n")
+        if view.constants:
+            out.append("This script defines the following constants:\n\n")
+            out.append("| Name | Value |\n|------|-------|\n")
+            for name, value in view.constants:
+                if value is None:
+                    out.append(t["constant_plain"](name=name))
+                else:
+                    out.append(t["constant"](name=name, value=value))
+        else:
+            out.append("No constants found.\n")
+        out.append("\n")
+
+        if view.metrics:
+            out.append("## Metrics\n\n")
+            out.append("| Metric | Value |\n|--------|-------|\n")
+            for label, key in METRIC_LABELS:
+                out.append(t["metric"](label=label, value=view.metrics.get(key, 0)))
+            out.append("\n")
+            functions = view.metrics.get("functions", [])
+            if functions:
+                out.append("| Function | Line | Lines | Complexity | Nesting |\n")
+                out.append("|----------|------|-------|------------|---------|\n")
+                for func in functions:
+                    out.append(t["function_metric"](
+                        name=func["name"], line=func["line"], lines=func["lines"],
+                        complexity=func["complexity"], nesting=func["max_nesting"]
+                    ))
+                out.append("\n")
+
+        if view.todos:
+            out.append("## TODOs\n\n")
+            for line, tag, text in view.todos:
+                out.append(t["todo"](line=line, tag=tag, text=text))
+            out.append("\n")
+
+        out.append("---\n\n")
+        out.append("*This documentation was generated automatically by DocsGenerator.*\n")
+        return "".join(out)
+
+
+class HtmlRenderer(Renderer):
+    """Standalone HTML pages plus an ``index.html`` linking every document."""
+
+    name = "html"
+    extension = "html"
+    TEMPLATES = {
+        "page_start": (
+            "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+            "<title>{title}</title>\n</head>\n<body>\n"
+        ),
+        "page_end": (
+            "<hr>\n<p><em>This documentation was generated automatically by DocsGenerator.</em></p>\n"
+            "</body>\n</html>\n"
+        ),
+        "header": "<h1>File Name</h1>\n<p><code>{file_name}</code></p>\n<h1>Summary</h1>\n",
+        "summary": "<pre class=\"summary\">{summary}</pre>\n",
+        "import": "<li><code>{imp}</code>{details}</li>\n",
+        "import_details": "<ul>{details}</ul>",
+        "import_functions": "<li><strong>Available functions:</strong> {functions}</li>",
+        "import_source": "<li><strong>Source:</strong> <code>{source}</code></li>",
+        "function": (
+            "<h3><code>{name}()</code></h3>\n<ul>\n"
+            "<li><strong>Arguments:</strong> <code>{args}</code></li>\n"
+            "<li><strong>Returns:</strong> <code>{returns}</code></li>\n"
+            "<li><strong>Description:</strong> {description}</li>\n{used_by}</ul>\n"
+        ),
+        "class": (
+            "<h3><code>{name}</code></h3>\n<ul>\n{bases}{methods}"
+            "<li><strong>Description:</strong> {description}</li>\n{used_by}</ul>\n"
+        ),
+        "class_bases": "<li><strong>Inherits from:</strong> <code>{bases}</code></li>\n",
+        "class_methods": "<li><strong>Methods:</strong> <code>{methods}</code></li>\n",
+        "used_by": "<li><strong>Used by:</strong> {users}</li>\n",
+        "user": "<code>{user}</code>",
+        "type_hint": "<h3><code>{name}</code></h3>\n",
+        "type_hint_returns": "<p><strong>Returns:</strong> <code>{returns}</code></p>\n",
+        "row": "<tr><td><code>{first}</code></td><td><code>{second}</code></td></tr>\n",
+        "metric": "<tr><td>{label}</td><td>{value}</td></tr>\n",
+        "function_metric": (
+            "<tr><td><code>{name}</code></td><td>{line}</td><td>{lines}</td>"
+            "<td>{complexity}</td><td>{nesting}</td></tr>\n"
+        ),
+        "todo": "<li>Line {line} <strong>{tag}</strong>: {text}</li>\n",
+        "index_entry": "<li><a href=\"{link}\"><code>{file_name}</code></a>{description}</li>\n",
+        "index_description": " &mdash; {description}",
+    }
+
+    def render(self, view: DocumentView) -> str:
+        return (
+            self.t["page_start"](title=html.escape(str(view.file_name)))
+            + super().render(view)
+            + self.t["page_end"]()
+        )
+
+    def render_header(self, view: DocumentView) -> str:
+        return self.t["header"](file_name=html.escape(str(view.file_name)))
+
+    def render_summary(self, summary: str) -> str:
+        return self.t["summary"](summary=html.escape(str(summary)))
+
+    def render_details(self, view: DocumentView) -> str:
+        t = self.t
+        esc = html.escape
+        out: List[str] = ["<h2>Imports</h2>\n"]
+        if view.imports:
+            out.append("<ul>\n")
+            for imp, functions, source in view.imports:
+                details = []
+                if functions:
+                    details.append(t["import_functions"](functions=esc(", ".join(functions))))
+                if source:
+                    details.append(t["import_source"](source=esc(source)))
+                out.append(t["import"](
+                    imp=esc(imp), details=t["import_details"](details="".join(details)) if details else ""
+                ))
+            out.append("</ul>\n")
+        else:
+            out.append("<p>No imports found.</p>\n")
+
+        out.append("<h2>Functions</h2>\n")
+        for name, args, returns, description, used_by in view.functions:
+            out.append(t["function"](
+                name=esc(name), args=esc(", ".join(args) if args else "None"),
+                returns=esc(str(returns)), description=esc(str(description)),
+                used_by=self._used_by(used_by)
+            ))
+        if not view.functions:
+            out.append("<p>No functions found.</p>\n")
+
+        out.append("<h2>Classes</h2>\n")
+        for name, bases, methods, description, used_by in view.classes:
+            out.append(t["class"](
+                name=esc(name),
+                bases=t["class_bases"](bases=esc(", ".join(bases))) if bases else "",
+                methods=t["class_methods"](methods=esc(", ".join(methods))) if methods else "",
+                description=esc(str(description)),
+                used_by=self._used_by(used_by)
+            ))
+        if not view.classes:
+            out.append("<p>No classes found.</p>\n")
+
+        if view.type_hints:
+            out.append("<h2>Type Hints</h2>\n")
+            for name, args, returns in view.type_hints:
+                out.append(t["type_hint"](name=esc(name)))
+                if args:
+                    out.append("<table>\n<tr><th>Argument</th><th>Type</th></tr>\n")
+                    for arg, hint in args.items():
+                        out.append(t["row"](first=esc(arg), second=esc(hint or "Any")))
+                    out.append("</table>\n")
+                if returns:
+                    out.append(t["type_hint_returns"](returns=esc(returns)))
+
+        out.append("<h2>Constants</h2>\n")
+        if view.constants:
+            out.append("<table>\n<tr><th>Name</th><th>Value</th></tr>\n")
+            for name, value in view.constants:
+                out.append(t["row"](first=esc(str(name)), second=esc(str(value)) if value is not None else "-"))
+            out.append("</table>\n")
+        else:
+            out.append("<p>No constants found.</p>\n")
+
+        if view.metrics:
+            out.append("<h2>Metrics</h2>\n<table>\n<tr><th>Metric</th><th>Value</th></tr>\n")
+            for label, key in METRIC_LABELS:
+                out.append(t["metric"](label=label, value=esc(str(view.metrics.get(key, 0)))))
+            out.append("</table>\n")
+            functions = view.metrics.get("functions", [])
+            if functions:
+                out.append(
+                    "<table>\n<tr><th>Function</th><th>Line</th><th>Lines</th>"
+                    "<th>Complexity</th><th>Nesting</th></tr>\n"
+                )
+                for func in functions:
+                    out.append(t["function_metric"](
+                        name=esc(func["name"]), line=func["line"], lines=func["lines"],
+                        complexity=func["complexity"], nesting=func["max_nesting"]
+                    ))
+                out.append("</table>\n")
+
+        if view.todos:
+            out.append("<h2>TODOs</h2>\n<ul>\n")
+            for line, tag, text in view.todos:
+                out.append(t["todo"](line=line, tag=esc(tag), text=esc(text)))
+            out.append("</ul>\n")
+        return "".join(out)
+
+    def render_index(self, entries: List[Tuple[str, str, str]]) -> Optional[str]:
+        out = [self.t["page_start"](title="Documentation Index"), "<h1>Documentation Index</h1>\n<ul>\n"]
+        for file_name, link, description in entries:
+            out.append(self.t["index_entry"](
+                link=html.escape(link), file_name=html.escape(file_name),
+                description=self.t["index_description"](description=html.escape(description)) if description else ""
+            ))
+        out.append("</ul>\n")
+        out.append(self.t["page_end"]())
+        return "".join(out)
+
+    def _used_by(self, users: Optional[List[str]]) -> str:
+        if not users:
+            return ""
+        return self.t["used_by"](users=", ".join(self.t["user"](user=html.escape(user)) for user in users))
+
+
+# Output formats selectable through DOCS_OUTPUT_FORMATS
+RENDERERS = {
+    MarkdownRenderer.name: MarkdownRenderer,
+    HtmlRenderer.name: HtmlRenderer,
+}
+
+
+def get_renderers(formats: Iterable[str]) -> List[Renderer]:
+    """Instantiate the renderers for the given format names."""
+    renderers = []
+    for fmt in formats:
+        if fmt not in RENDERERS:
+            raise ValueError(f"Unknown output format '{fmt}'. Expected one of: {', '.join(RENDERERS)}")
+        renderers.append(RENDERERS[fmt]())
+    return renderers
+
+
+def index_description(summary: Optional[str], max_length: int = 120) -> str:
+    """First meaningful line of a summary, for index listings."""
+    for line in (summary or "").splitlines():
+        line = line.strip().lstrip("#").strip()
+        if line and not line.startswith("```"):
+            return line if len(line) <= max_length else line[:max_length - 3] + "..."
+    return ""
@@ -0,0 +1,158 @@
+"""
+Headless command-line runner: document one or many project directories.
+
+    python docs_cli.py PROJECT [PROJECT ...] [options]
+
+Projects run in parallel and share one scheduler, so LLM requests from all
+projects are interleaved over a fixed number of workers. Each project's docs
+are written to ``<output>/<project>/docs``. With --incremental (the default)
+a rerun only reprocesses files whose contents changed since the last run.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from doc_renderers import RENDERERS
+from providers import available_providers
+from scheduler import FairScheduler
+from summarize import ANALYSIS_TIERS, Summarize, default_summary_cache
+from summary_cache import SummaryCache
+
+# Output folder name inside each project's session folder
+DOCS_FOLDER = "docs"
+
+
+def project_session_id(project_dir: str) -> str:
+    """
+    Stable session id for a project directory.
+
+    The same directory always maps to the same id, so incremental runs find
+    their checkpoint; a short hash of the absolute path keeps projects with
+    the same folder name apart.
+    """
+    path = os.path.abspath(project_dir)
+    name = os.path.basename(path.rstrip(os.sep)) or "project"
+    return f"{name}-{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}"
+
+
+def document_project(
+    project_dir: str,
+    args: argparse.Namespace,
+    scheduler: FairScheduler,
+    cache: Optional[SummaryCache]
+) -> Dict:
+    """Document one project; returns its result for the run summary."""
+    session_id = project_session_id(project_dir)
+    session_dir = os.path.join(args.output, session_id)
+    if not args.incremental and os.path.isdir(session_dir):
+        shutil.rmtree(session_dir)
+
+    start = time.time()
+    status: Dict[str, Dict] = {session_id: {}}
+    try:
+        job = Summarize(
+            project_dir,
+            DOCS_FOLDER,
+            session_id,
+            status,
+            output_base_dir=args.output,
+            provider=args.provider,
+            scheduler=scheduler,
+            formats=args.formats,
+            tier=args.tier,
+            summary_cache=cache
+        )
+        job.summarize()
+    except Exception as e:
+        return {"project": project_dir, "ok": False, "error": str(e), "seconds": time.time() - start}
+    return {
+        "project": project_dir,
+        "ok": True,
+        "output": job.output_folder,
+        "files": status[session_id].get("progress", {}).get("total", 0),
+        "seconds": time.time() - start,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Generate documentation for one or many project directories."
+    )
+    parser.add_argument("projects", nargs="+", help="Project directories to document")
+    parser.add_argument(
+        "-o", "--output", default=os.path.join(os.getcwd(), "output"),
+        help="Output base directory (default: ./output)"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None,
+        help="Worker threads shared by all projects (default: SCHEDULER_WORKERS or 4)"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Projects processed at the same time (default: all)"
+    )
+    parser.add_argument(
+        "--session-concurrency", type=int, default=None,
+        help="Maximum work units one project may run at once (default: SCHEDULER_SESSION_CONCURRENCY or 2)"
+    )
+    parser.add_argument(
+        "--cache", dest="cache", action="store_true", default=os.getenv("SUMMARY_CACHE", "1") != "0",
+        help="Reuse cached summaries of unchanged files (default)"
+    )
+    parser.add_argument("--no-cache", dest="cache", action="store_false", help="Always request new summaries")
+    parser.add_argument("--cache-dir", default=None, help="Summary cache directory (default: <output>/cache)")
+    parser.add_argument(
+        "--incremental", dest="incremental", action="store_true", default=True,
+        help="Only reprocess files changed since the last run (default)"
+    )
+    parser.add_argument(
+        "--full", dest="incremental", action="store_false",
+        help="Discard earlier results and reprocess every file"
+    )
+    parser.add_argument("--tier", choices=ANALYSIS_TIERS, default=None, help="Analysis tier (default: DOCS_ANALYSIS_TIER or full)")
+    parser.add_argument("--provider", choices=available_providers(), default=None, help="LLM provider (default: LLM_PROVIDER or openrouter)")
+    parser.add_argument(
+        "--formats", type=lambda value: [fmt.strip() for fmt in value.split(",") if fmt.strip()], default=None,
+        help=f"Comma-separated output formats: {', '.join(RENDERERS)} (default: DOCS_OUTPUT_FORMATS or md)"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    missing = [project for project in args.projects if not os.path.isdir(project)]
+    if missing:
+        print(f"Not a directory: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    if len({project_session_id(project) for project in args.projects}) != len(args.projects):
+        print("The same project was given more than once.", file=sys.stderr)
+        return 2
+
+    cache = None
+    if args.cache:
+        cache = SummaryCache(args.cache_dir) if args.cache_dir else default_summary_cache(args.output)
+    scheduler = FairScheduler(workers=args.workers, session_concurrency=args.session_concurrency)
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs or len(args.projects)) as pool:
+            results = list(pool.map(lambda project: document_project(project, args, scheduler, cache), args.projects))
+    finally:
+        scheduler.shutdown()
+
+    print("\nResults:")
+    for result in results:
+        if result["ok"]:
+            print(f"  OK     {result['project']}: {result['files']} files in {result['seconds']:.1f}s -> {result['output']}")
+        else:
+            print(f"  FAILED {result['project']}: {result['error']}")
+    if cache is not None:
+        print(f"Summary cache: {cache.hits} hits, {cache.misses} misses")
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,24 @@
 import json
 import os
-from typing import Dict, List, Any, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from doc_renderers import DocumentView, MarkdownRenderer, Renderer, get_renderers
 
 
 class DocsCreator:
-    """Creates documentation in Markdown format from parsed code analysis."""
+    """
+    Creates documentation from parsed code analysis.
+    
+    Markdown is always available; further formats (HTML, ...) come from the
+    pluggable renderers in doc_renderers.
+    """
 
     def __init__(self) -> None:
         """Initialize the DocsCreator."""
         # Ensure the output directory exists
         self.ensure_output_directory("output/json/summary.md")
+        self.markdown = MarkdownRenderer()
+        self._renderer_cache: Dict[str, Renderer] = {MarkdownRenderer.name: self.markdown}
 
     def ensure_output_directory(self, output_file: str) -> None:
         """
@@ -19,8 +28,9 @@ class DocsCreator:
             output_file: Path to the output file
         """
         output_dir = os.path.dirname(output_file)
-        if output_dir and not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        if output_dir:
+            # exist_ok: several jobs may create the same folder concurrently
+            os.makedirs(output_dir, exist_ok=True)
 
     def json_to_markdown(self, json_input: Dict[str, Any], output_file: str) -> None:
         """
@@ -32,103 +42,126 @@ class DocsCreator:
         """
         self.ensure_output_directory(output_file)
         with open(output_file, 'w', encoding='utf-8') as md_file:
-            # Write the summary
-            file_name = json_input.get("file_name", "No file name provided.")
-            md_file.write("# File Name\n\n")
-            md_file.write(f"`{file_name}`\n\n")
+            md_file.write(self.markdown.render(DocumentView.from_analysis(json_input)))
+
+    def stream_to_markdown(
+        self,
+        json_input: Dict[str, Any],
+        summary_chunks: Iterable[str],
+        output_file: str,
+        on_update: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Write a Markdown documentation file while the summary is still being generated.
+        
+        The header and each summary chunk are flushed to disk as they arrive so
+        the document can be read before generation finishes; the remaining
+        sections are written once the summary is complete.
+        
+        Args:
+            json_input: Dictionary containing parsed code analysis (without summary)
+            summary_chunks: Iterable yielding pieces of the summary text
+            output_file: Path to write the Markdown file
+            on_update: Optional callback receiving the summary text so far
             
-            summary = json_input.get("summary", "No summary provided.")
-            md_file.write("# Summary\n\n")
-            md_file.write(f"{summary}\n\n")
+        Returns:
+            The complete summary text
+        """
+        self.ensure_output_directory(output_file)
+        view = DocumentView.from_analysis(json_input)
+        parts: List[str] = []
+        with open(output_file, 'w', encoding='utf-8') as md_file:
+            md_file.write(self.markdown.render_header(view))
+            md_file.flush()
+            for chunk in summary_chunks:
+                parts.append(chunk)
+                md_file.write(chunk)
+                md_file.flush()
+                if on_update is not None:
+                    on_update("".join(parts))
+            md_file.write("\n\n")
+            md_file.write(self.markdown.render_details(view))
+        return "".join(parts)
 
-            # Write imports with cross-library analysis
-            imports = json_input.get("imports", [])
-            cross_library_info = json_input.get("cross_library_functions", {})
-            md_file.write("## Imports\n\n")
-            if imports:
-                md_file.write("This script imports the following modules:\n\n")
-                for imp in imports:
-                    md_file.write(f"- `{imp}`\n")
-                    # Add cross-library function details if available
-                    if imp in cross_library_info:
-                        func_info = cross_library_info[imp]
-                        if func_info.get("functions"):
-                            md_file.write(f"  - **Available functions:** {', '.join(func_info['functions'])}\n")
-                        if func_info.get("source_file"):
-                            md_file.write(f"  - **Source:** `{func_info['source_file']}`\n")
-            else:
-                md_file.write("No imports found.\n")
-            md_file.write("\n")
+    def render_document(
+        self,
+        json_input: Dict[str, Any],
+        output_folder: str,
+        formats: Iterable[str]
+    ) -> None:
+        """
+        Write one analysis result in each of the given output formats.
+        
+        Each document goes to ``<output_folder>/<format>/<safe name>.<ext>``.
+        The analysis is turned into a DocumentView once and shared by all formats.
+        
+        Args:
+            json_input: Dictionary containing parsed code analysis and summary
+            output_folder: Session output folder
+            formats: Format names (see doc_renderers.RENDERERS)
+        """
+        view = DocumentView.from_analysis(json_input)
+        safe_name = self.safe_filename(str(json_input.get("file_name", "unnamed")))
+        for renderer in self._renderers(formats):
+            self.write_text(self._document_path(output_folder, renderer, safe_name), renderer.render(view))
 
-            # Write functions
-            functions = json_input.get("functions", [])
-            md_file.write("## Functions\n\n")
-            if functions:
-                for func in functions:
-                    name = func.get("name", "Unnamed function")
-                    args = func.get("args", [])
-                    returns = func.get("returns", "No return value specified")
-                    docstring = json_input.get("docstrings", {}).get("functions", {}).get(name, "No description provided.")
+    def write_site_index(
+        self,
+        entries: List[Tuple[str, str]],
+        output_folder: str,
+        formats: Iterable[str]
+    ) -> None:
+        """
+        Write the merged site index (``<format>/index.<ext>``) for each format.
+        
+        Args:
+            entries: (file name, short description) for every document
+            output_folder: Session output folder
+            formats: Format names (see doc_renderers.RENDERERS)
+        """
+        for renderer in self._renderers(formats):
+            links = [
+                (file_name, f"{self.safe_filename(file_name)}.{renderer.extension}", description)
+                for file_name, description in sorted(entries)
+            ]
+            index = renderer.render_index(links)
+            if index is not None:
+                self.write_text(os.path.join(output_folder, renderer.name, f"index.{renderer.extension}"), index)
 
-                    md_file.write(f"### `{name}()`\n\n")
-                    md_file.write(f"- **Arguments:** `{', '.join(args) if args else 'None'}`\n")
-                    md_file.write(f"- **Returns:** `{returns}`\n")
-                    md_file.write(f"- **Description:** {docstring}\n\n")
-            else:
-                md_file.write("No functions found.\n")
-            md_file.write("\n")
+    def remove_document(self, file_name: str, output_folder: str, formats: Iterable[str]) -> None:
+        """
+        Delete the documents written for a file in each of the given formats.
+        
+        Args:
+            file_name: Relative path of the documented file
+            output_folder: Session output folder
+            formats: Format names (see doc_renderers.RENDERERS)
+        """
+        safe_name = self.safe_filename(file_name)
+        for renderer in self._renderers(formats):
+            path = self._document_path(output_folder, renderer, safe_name)
+            if os.path.exists(path):
+                os.remove(path)
 
-            # Write classes
-            classes = json_input.get("classes", [])
-            md_file.write("## Classes\n\n")
-            if classes:
-                for cls in classes:
-                    name = cls.get("name", "Unnamed class")
-                    bases = cls.get("bases", [])
-                    methods = cls.get("methods", [])
-                    docstring = json_input.get("docstrings", {}).get("classes", {}).get(name, "No description provided.")
+    @staticmethod
+    def safe_filename(file_path: str) -> str:
+        """Create safe filename for output (replace / with _)."""
+        return file_path.replace('/', '_').replace('\\', '_')
 
-                    md_file.write(f"### `{name}`\n\n")
-                    if bases:
-                        md_file.write(f"- **Inherits from:** `{', '.join(bases)}`\n")
-                    if methods:
-                        md_file.write(f"- **Methods:** `{', '.join(methods)}`\n")
-                    md_file.write(f"- **Description:** {docstring}\n\n")
-            else:
-                md_file.write("No classes found.\n")
-            md_file.write("\n")
+    def _renderers(self, formats: Iterable[str]) -> List[Renderer]:
+        """Return cached renderer instances for the given format names."""
+        renderers = []
+        for fmt in formats:
+            if fmt not in self._renderer_cache:
+                self._renderer_cache[fmt] = get_renderers([fmt])[0]
+            renderers.append(self._renderer_cache[fmt])
+        return renderers
 
-            # Write type hints
-            type_hints = json_input.get("type_hints", {})
-            if type_hints:
-                md_file.write("## Type Hints\n\n")
-                for func_name, hints in type_hints.items():
-                    md_file.write(f"### `{func_name}`\n\n")
-                    args = hints.get("args", {})
-                    if args:
-                        md_file.write("| Argument | Type |\n")
-                        md_file.write("|----------|------|\n")
-                        for arg, hint in args.items():
-                            md_file.write(f"| `{arg}` | `{hint or 'Any'}` |\n")
-                    returns = hints.get("returns")
-                    if returns:
-                        md_file.write(f"\n**Returns:** `{returns}`\n\n")
+    def _document_path(self, output_folder: str, renderer: Renderer, safe_name: str) -> str:
+        return os.path.join(output_folder, renderer.name, f"{safe_name}.{renderer.extension}")
 
-            # Write constants
-            constants = json_input.get("constants", [])
-            md_file.write("## Constants\n\n")
-            if constants:
-                md_file.write("This script defines the following constants:\n\n")
-                md_file.write("| Name | Value |\n")
-                md_file.write("|------|-------|\n")
-                for const in constants:
-                    if isinstance(const, dict):
-                        md_file.write(f"| `{const.get('name', 'Unknown')}` | `{const.get('value', 'N/A')}` |\n")
-                    else:
-                        md_file.write(f"| `{const}` | - |\n")
-            else:
-                md_file.write("No constants found.\n")
-            md_file.write("\n")
-            
-            md_file.write("---\n\n")
-            md_file.write("*This documentation was generated automatically by DocsGenerator.*\n")
+    def write_text(self, output_file: str, content: str) -> None:
+        """Write a text file, creating its directory if needed."""
+        self.ensure_output_directory(output_file)
+        with open(output_file, 'w', encoding='utf-8') as out_file:
+            out_file.write(content)
@@ -0,0 +1,124 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from analysis_records import ModuleSymbols
+from dependency_generator import DependencyGenerator
+from doc_renderers import DocumentView, MarkdownRenderer
+from search_index import SearchIndex
+from summary_cache import SummaryCache
+from adaptive_concurrency import get_limiter
+from batching import estimate_tokens
+from model_router import ModelRouter, Route, file_features
+
+
+class FileDocumenter:
+    """
+    Documents a single file on demand, outside of a full Summarize run.
+
+    Runs the same analysis and LLM summary as a session, but for one file at
+    a time, for interactive callers such as editor integrations. Summaries
+    come from the shared SummaryCache when the contents were seen before.
+    Given a session's SearchIndex, imports are resolved against that
+    session's modules and "Used by" references are filled in, without reading
+    the rest of the project.
+    """
+
+    def document(
+        self,
+        file_path: str,
+        content: str,
+        index: Optional[SearchIndex] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Analyze and summarize one file.
+
+        Args:
+            file_path: Relative path of the file (within the session, if any)
+            content: The file contents
+            index: Optional search index of the session the file belongs to
+
+        Returns:
+            Tuple of (per-file JSON document, True if the summary was cached)
+        """
+        # DependencyGenerator keeps per-project caches, so use one per request
+        dependency_gen = DependencyGenerator()
+        if index is not None:
+            project_files = dict.fromkeys(index.files(), "")
+            project_files[file_path] = content
+
+            def symbol_source(rel_path: str) -> Optional[ModuleSymbols]:
+                if rel_path == file_path:
+                    # The request's contents may be newer than the index
+                    return None
+                symbols = index.defined_symbols(rel_path)
+                return ModuleSymbols(rel_path, *symbols) if symbols is not None else None
+
+            analysis = dependency_gen.analyze_file(content, project_files, symbol_source=symbol_source)
+            used_by = index.used_by(file_path)
+        else:
+            analysis = dependency_gen.analyze_file(content)
+            used_by = {}
+
+        out = analysis.to_dict()
+        out["file_name"] = file_path
+        out["used_by"] = used_by
+
+        fan_in = len({user for users in used_by.values() for user in users})
+        routes = self.router.routes(file_features(analysis, content, fan_in))
+        summary = self._cached_summary(content, routes)
+        cached = summary is not None
+        if not cached:
+            summary, route = self._summarize(content, routes)
+            if self.cache is not None and summary:
+                # Under the route that produced it, which may be a fallback
+                self.cache.put(route.cache_key, content, summary)
+        out["summary"] = summary
+        return out, cached
+
+    def _cached_summary(self, content: str, routes: List[Route]) -> Optional[str]:
+        """Return a cached summary of the contents from any route of the chain, in order."""
+        if self.cache is None:
+            return None
+        for route in routes:
+            summary = self.cache.get(route.cache_key, content)
+            if summary is not None:
+                return summary
+        return None
+
+    def _summarize(self, content: str, routes: List[Route]) -> Tuple[str, Route]:
+        """
+        Summarize with the first route that succeeds; the last route's error is raised.
+
+        Returns:
+            Tuple of (summary, route that produced it)
+        """
+        for index, route in enumerate(routes):
+            client = self.router.client(route)
+            limiter = get_limiter(route.provider)
+            try:
+                if limiter is not None:
+                    return limiter.call(client.summarize, content, tokens=estimate_tokens(content)), route
+                return client.summarize(content), route
+            except Exception as e:
+                if index == len(routes) - 1:
+                    raise
+                print(f"Route '{route.name}' failed, falling back to '{routes[index + 1].name}': {e}")
+
+    def to_markdown(self, out: Dict[str, Any]) -> str:
+        """Render a document returned by document() as Markdown."""
+        return self.markdown.render(DocumentView.from_analysis(out))
+
+    def __init__(self, provider: Optional[str] = None, cache: Optional[SummaryCache] = None) -> None:
+        """
+        Initialize the FileDocumenter.
+
+        Args:
+            provider: LLM provider name; defaults to the LLM_PROVIDER
+                environment variable, then "openrouter"
+            cache: Optional shared summary cache
+        """
+        self.provider = (provider or os.getenv("LLM_PROVIDER") or "openrouter").lower()
+        self.cache = cache
+        self.markdown = MarkdownRenderer()
+        # Chooses the model per file; clients are created on first use and shared by all requests
+        self.router = ModelRouter(self.provider)
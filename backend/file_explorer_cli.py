@@ -43,13 +43,17 @@ class FileExplorer:
         Returns:
             Dict mapping relative file paths to their contents.
             Uses relative paths as keys to avoid filename collisions.
+            The explorer's own output file is never included.
         """
         content_in_all_files: Dict[str, str] = {}
+        output_path = os.path.abspath(self.output_path)
         for root, dirs, files in os.walk(self.root_dir):
             dirs[:] = [d for d in dirs if d not in self.ignore_folders]
             files[:] = [f for f in files if f not in self.ignore_files]
             for file in files:
                 file_path = os.path.join(root, file)
+                if os.path.abspath(file_path) == output_path:
+                    continue
                 # Use relative path as key to avoid filename collisions
                 rel_path = os.path.relpath(file_path, self.root_dir)
                 try:
@@ -74,14 +78,14 @@ class FileExplorer:
         for root, dirs, files in os.walk(self.root_dir):
             dirs[:] = [d for d in dirs if d not in self.ignore_folders]
             print("\033[32mDirs\033[0m", dirs)
-            self.write_to_files(f"DIR: {root}", self.output_file)
+            self.write_to_files(f"DIR: {root}", self.output_path)
 
             for file in files:
                 if file not in self.ignore_files:
                     file_path = os.path.join(root, file)
                     all_files.append(file_path)
                     print(f"Writing file: {file_path}")
-                    self.write_to_files(file_path,  self.output_file)
+                    self.write_to_files(file_path,  self.output_path)
         return all_files
 
     def detect_language(self, filename: str) -> str:
@@ -141,7 +145,8 @@ class FileExplorer:
         root_dir: str = os.getcwd(), 
         output_file: str = "output.txt",
         ignore_folders: Optional[Set[str]] = None, 
-        ignore_files: Optional[Set[str]] = None
+        ignore_files: Optional[Set[str]] = None,
+        output_dir: Optional[str] = None
     ) -> None:
         """
         Initialize the FileExplorer.
@@ -151,6 +156,8 @@ class FileExplorer:
             output_file: Default output file name
             ignore_folders: Set of folder names to ignore
             ignore_files: Set of file names to ignore
+            output_dir: Directory the output file is written under; defaults
+                to root_dir. Set it to keep the explored tree unmodified.
         """
         if ignore_folders is None:
             ignore_folders = {"venv", "__pycache__", "output", "node_modules", ".git"}
@@ -159,8 +166,10 @@ class FileExplorer:
             
         self.output_file = f"output/{output_file}.txt"
         self.root_dir = root_dir 
+        self.output_dir = output_dir or root_dir
+        self.output_path = os.path.join(self.output_dir, self.output_file)
         self.ignore_folders = ignore_folders
         self.ignore_files = ignore_files
         
         if not self.print_folder_not_found(root_dir):
-            self.clear_file(self.root_dir, self.output_file)
+            self.clear_file(self.output_dir, self.output_file)
@@ -1,13 +1,6 @@
-from google import genai
+import os
 
-
-class GeminiClient:
-
-    def summarize(self, query):
-        # System instruction + prompt
-        prompt = [
-      { 'role': 'system', 
-              'content': '''You are a Senior Software Engineer and Technical Writer with experience documenting enterprise-grade systems.
+SYSTEM_PROMPT = '''You are a Senior Software Engineer and Technical Writer with experience documenting enterprise-grade systems.
 Your task is to generate clear, professional, industry-standard documentation for the provided source code.
 
 Input
@@ -108,22 +101,43 @@ Onboarding new engineers
 
 Long-term maintenance
 
-Begin once the code is provided.''' 
-            },
-            {
-              "role": "user",
-              "content": f"'''{query}'''"
-            }
-          ]
+Begin once the code is provided.'''
+
+
+# Model used unless GEMINI_MODEL or a routing rule picks another
+DEFAULT_MODEL = "gemini-2.0-flash"
 
+
+class GeminiClient:
+
+    def summarize(self, query, system_prompt=None):
         response = self.client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=prompt,
+            model=self.model,
+            contents=self._prompt(query, system_prompt),
         )
 
         return response.text
+
+    def summarize_stream(self, query, system_prompt=None):
+        """Yield the summary for ``query`` in chunks as the provider streams it."""
+        for chunk in self.client.models.generate_content_stream(
+            model=self.model,
+            contents=self._prompt(query, system_prompt),
+        ):
+            if chunk.text:
+                yield chunk.text
+
+    def _prompt(self, query, system_prompt=None):
+        # System instruction + prompt
+        return [
+            {'role': 'system', 'content': system_prompt or SYSTEM_PROMPT},
+            {"role": "user", "content": f"'''{query}'''"}
+        ]
     
-    def __init__(self) -> None:
+    def __init__(self, model=None) -> None:
+        # Imported here so the SDK loads only when this provider is used
+        from google import genai
+        self.model = model or os.getenv("GEMINI_MODEL") or DEFAULT_MODEL
         self.client = genai.Client()
 
 
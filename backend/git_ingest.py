@@ -0,0 +1,86 @@
+import os
+import subprocess
+from typing import List, Optional, Tuple
+
+
+class GitError(Exception):
+    """A git command failed or the source is not a usable repository."""
+
+
+def run_git(args: List[str], cwd: Optional[str] = None) -> str:
+    """
+    Run a git command and return its standard output.
+
+    Raises:
+        GitError: If git is missing or the command fails
+    """
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="surrogateescape",
+            # Never prompt for credentials from a background job
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+        )
+    except FileNotFoundError:
+        raise GitError("git is not installed")
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
+
+
+def checkout(source: str, checkout_dir: str, rev: str = "HEAD") -> str:
+    """
+    Check out ``rev`` of a repository or bundle into ``checkout_dir``.
+
+    The first call creates the checkout; later calls fetch the new revision
+    into the same checkout, so only new objects are transferred.
+
+    Args:
+        source: Path of a local git repository or a bundle file
+        checkout_dir: Working tree owned by the session
+        rev: Branch, tag or commit to check out
+
+    Returns:
+        The full commit hash that was checked out
+    """
+    if not os.path.exists(source):
+        raise GitError(f"Source not found: {source}")
+    if not os.path.isdir(os.path.join(checkout_dir, ".git")):
+        os.makedirs(checkout_dir, exist_ok=True)
+        run_git(["init", "--quiet", checkout_dir])
+    run_git(["fetch", "--quiet", "--force", "--no-tags", os.path.abspath(source), rev], cwd=checkout_dir)
+    run_git(["checkout", "--quiet", "--force", "--detach", "FETCH_HEAD"], cwd=checkout_dir)
+    return current_commit(checkout_dir)
+
+
+def current_commit(checkout_dir: str) -> str:
+    """Return the commit hash checked out in ``checkout_dir``."""
+    return run_git(["rev-parse", "HEAD"], cwd=checkout_dir).strip()
+
+
+def changed_files(checkout_dir: str, old_commit: str, new_commit: str) -> Tuple[List[str], List[str]]:
+    """
+    List the files that differ between two commits.
+
+    Renames are reported as a deletion plus an addition.
+
+    Returns:
+        Tuple of (added or modified paths, deleted paths)
+    """
+    output = run_git(
+        ["diff", "--name-status", "-z", "--no-renames", old_commit, new_commit],
+        cwd=checkout_dir
+    )
+    fields = output.split("\0")
+    changed: List[str] = []
+    deleted: List[str] = []
+    for status, path in zip(fields[0::2], fields[1::2]):
+        if status.startswith("D"):
+            deleted.append(path)
+        else:
+            changed.append(path)
+    return changed, deleted
@@ -0,0 +1,215 @@
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+from batching import BATCH_SYSTEM_PROMPT, split_batch_query
+
+
+class LocalLLMError(Exception):
+    """Simulated provider failure (HTTP 5xx)."""
+
+    status_code = 500
+
+
+class RateLimitError(LocalLLMError):
+    """Simulated provider throttling (HTTP 429)."""
+
+    status_code = 429
+
+
+class LocalLLMClient:
+    """
+    Offline stand-in for OpenRouterClient and GeminiClient.
+
+    Implements the same ``summarize(query)`` interface but never touches the
+    network. Latency, token throughput, error rate and 429 responses are
+    simulated locally so the full upload pipeline can be load-tested
+    reproducibly and for free.
+
+    Every setting can be passed to the constructor or configured through
+    environment variables (constructor arguments take precedence):
+
+    - ``LOCAL_LLM_LATENCY_DISTRIBUTION``: constant, uniform, normal,
+      lognormal or exponential (time to first token)
+    - ``LOCAL_LLM_LATENCY_MEAN``: mean time to first token in seconds
+    - ``LOCAL_LLM_LATENCY_STDDEV``: spread of the latency distribution
+    - ``LOCAL_LLM_TOKENS_PER_SECOND``: simulated generation throughput
+    - ``LOCAL_LLM_MAX_OUTPUT_TOKENS``: cap on generated tokens per response
+    - ``LOCAL_LLM_ERROR_RATE``: probability of a simulated 5xx failure
+    - ``LOCAL_LLM_RATE_LIMIT_RATE``: probability of a simulated 429
+    - ``LOCAL_LLM_MAX_CONCURRENCY``: in-flight requests above this get a 429
+      (0 disables the limit)
+    - ``LOCAL_LLM_SEED``: seed for reproducible runs
+    """
+
+    DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+    # Tokens per streamed chunk in summarize_stream
+    STREAM_CHUNK_TOKENS = 8
+
+    # Shared across instances so the concurrency limit behaves like a
+    # provider-side limit, regardless of how many clients the server creates.
+    _in_flight = 0
+    _in_flight_lock = threading.Lock()
+
+    def summarize(self, query: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Return a synthetic documentation summary for ``query``.
+
+        Sleeps for the simulated time to first token plus generation time,
+        and may raise ``RateLimitError`` or ``LocalLLMError`` according to the
+        configured rates.
+        """
+        return "".join(self.summarize_stream(query, system_prompt))
+
+    def summarize_stream(self, query: str, system_prompt: Optional[str] = None):
+        """Yield the synthetic summary in chunks, paced at the simulated throughput."""
+        self._acquire_slot()
+        try:
+            with self._rng_lock:
+                ttft = self._sample_latency()
+                roll = self._rng.random()
+            time.sleep(ttft)
+
+            if roll < self.rate_limit_rate:
+                raise RateLimitError("Simulated 429: rate limit exceeded")
+            if roll < self.rate_limit_rate + self.error_rate:
+                raise LocalLLMError("Simulated 500: provider error")
+
+            response = self._build_response(query, system_prompt)
+            output_tokens = self._estimate_tokens(response)
+            chunk_size = max(1, len(response) // output_tokens * self.STREAM_CHUNK_TOKENS)
+            for start in range(0, len(response), chunk_size):
+                chunk = response[start:start + chunk_size]
+                if self.tokens_per_second > 0:
+                    time.sleep(self._estimate_tokens(chunk) / self.tokens_per_second)
+                yield chunk
+        finally:
+            self._release_slot()
+
+    def _acquire_slot(self) -> None:
+        """Count an in-flight request, rejecting it when over capacity."""
+        with LocalLLMClient._in_flight_lock:
+            if self.max_concurrency and LocalLLMClient._in_flight >= self.max_concurrency:
+                raise RateLimitError(
+                    f"Simulated 429: more than {self.max_concurrency} concurrent requests"
+                )
+            LocalLLMClient._in_flight += 1
+
+    def _release_slot(self) -> None:
+        with LocalLLMClient._in_flight_lock:
+            LocalLLMClient._in_flight -= 1
+
+    def _sample_latency(self) -> float:
+        """Draw a time-to-first-token sample (seconds) from the configured distribution."""
+        mean = self.latency_mean
+        stddev = self.latency_stddev
+        if self.latency_distribution == "uniform":
+            value = self._rng.uniform(max(0.0, mean - stddev), mean + stddev)
+        elif self.latency_distribution == "normal":
+            value = self._rng.gauss(mean, stddev)
+        elif self.latency_distribution == "lognormal":
+            # Parameterise so the resulting distribution has the requested mean/stddev
+            if mean <= 0:
+                return 0.0
+            variance = stddev ** 2
+            sigma2 = math.log1p(variance / (mean ** 2))
+            mu = math.log(mean) - sigma2 / 2
+            value = self._rng.lognormvariate(mu, sigma2 ** 0.5)
+        elif self.latency_distribution == "exponential":
+            value = self._rng.expovariate(1 / mean) if mean > 0 else 0.0
+        else:
+            value = mean
+        return max(0.0, value)
+
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token count (~4 characters per token)."""
+        return min(self.max_output_tokens, max(1, len(text) // 4))
+
+    def _build_response(self, query: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Build a deterministic response shaped like a real provider answer.
+
+        Text is cut to max_output_tokens (~4 characters per token); in batch
+        responses each file's documentation is cut, so the JSON stays valid.
+        """
+        if system_prompt == BATCH_SYSTEM_PROMPT:
+            files = split_batch_query(query)
+            return json.dumps({"files": [
+                {"path": path, "documentation": self._build_response(content)}
+                for path, content in files.items()
+            ]})
+        lines = query.splitlines()
+        non_empty = [line for line in lines if line.strip()]
+        excerpt = "\n".join(non_empty[:5])
+        response = (
+            "# Generated Documentation (local stand-in)\n\n"
+            "## Overview\n\n"
+            f"This file contains {len(lines)} lines "
+            f"({len(non_empty)} non-empty, {len(query)} characters).\n\n"
+            "## Excerpt\n\n"
+            f"```\n{excerpt}\n```\n"
+        )
+        return response[:self.max_output_tokens * 4]
+
+    def __init__(
+        self,
+        latency_distribution: Optional[str] = None,
+        latency_mean: Optional[float] = None,
+        latency_stddev: Optional[float] = None,
+        tokens_per_second: Optional[float] = None,
+        max_output_tokens: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        rate_limit_rate: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        seed: Optional[int] = None,
+        model: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the LocalLLMClient.
+
+        Args:
+            latency_distribution: Name of the time-to-first-token distribution
+            latency_mean: Mean time to first token in seconds
+            latency_stddev: Spread of the latency distribution in seconds
+            tokens_per_second: Simulated output throughput (0 = instant)
+            max_output_tokens: Cap on the simulated response length in tokens
+                (~4 characters each), truncating the text and bounding its
+                simulated generation time
+            error_rate: Probability (0-1) of a simulated provider error
+            rate_limit_rate: Probability (0-1) of a simulated 429
+            max_concurrency: Maximum simulated in-flight requests (0 = unlimited)
+            seed: Random seed for reproducible runs
+            model: Model name, recorded for routing; every model is simulated alike
+        """
+        def setting(value, env_name, default, cast):
+            if value is not None:
+                return cast(value)
+            raw = os.getenv(env_name)
+            return cast(raw) if raw not in (None, "") else default
+
+        self.latency_distribution = setting(
+            latency_distribution, "LOCAL_LLM_LATENCY_DISTRIBUTION", "lognormal", str
+        ).lower()
+        if self.latency_distribution not in self.DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution '{self.latency_distribution}'. "
+                f"Expected one of: {', '.join(self.DISTRIBUTIONS)}"
+            )
+        self.latency_mean = setting(latency_mean, "LOCAL_LLM_LATENCY_MEAN", 1.0, float)
+        self.latency_stddev = setting(latency_stddev, "LOCAL_LLM_LATENCY_STDDEV", 0.5, float)
+        self.tokens_per_second = setting(tokens_per_second, "LOCAL_LLM_TOKENS_PER_SECOND", 80.0, float)
+        self.max_output_tokens = setting(max_output_tokens, "LOCAL_LLM_MAX_OUTPUT_TOKENS", 1024, int)
+        self.error_rate = setting(error_rate, "LOCAL_LLM_ERROR_RATE", 0.0, float)
+        self.rate_limit_rate = setting(rate_limit_rate, "LOCAL_LLM_RATE_LIMIT_RATE", 0.0, float)
+        self.max_concurrency = setting(max_concurrency, "LOCAL_LLM_MAX_CONCURRENCY", 0, int)
+        seed_value = setting(seed, "LOCAL_LLM_SEED", None, int)
+
+        self._rng = random.Random(seed_value)
+        self._rng_lock = threading.Lock()
+        self.model = model or "local"
+
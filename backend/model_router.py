@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from analysis_records import FileAnalysis
+from batching import estimate_tokens
+from providers import create_client
+
+# Per-file measures routing rules can test, each as "min_<name>" / "max_<name>"
+ROUTE_FEATURES = ("lines", "tokens", "symbols", "fan_in", "complexity")
+
+# Small, fast model per provider for the built-in "trivial" rule
+SMALL_MODELS: Dict[str, str] = {
+    "openrouter": "mistralai/ministral-3b",
+    "gemini": "gemini-2.0-flash-lite",
+}
+
+# Built-in rule: short, simple modules that few files depend on
+TRIVIAL_RULE: Dict[str, Any] = {
+    "name": "trivial",
+    "max_lines": 80,
+    "max_symbols": 5,
+    "max_fan_in": 1,
+    "max_complexity": 5,
+}
+
+
+def file_features(analysis: FileAnalysis, content: str, fan_in: int) -> Dict[str, int]:
+    """Routing features of one file from its analysis record."""
+    metrics = analysis.metrics
+    return {
+        "lines": metrics.lines if metrics is not None else content.count("\n") + 1,
+        "tokens": estimate_tokens(content),
+        "symbols": len(analysis.functions) + len(analysis.classes),
+        "fan_in": fan_in,
+        "complexity": metrics.complexity if metrics is not None else 0,
+    }
+
+
+def combine_features(features: List[Dict[str, int]]) -> Dict[str, int]:
+    """Features of several files sent in one request: sizes add up, fan-in is the highest."""
+    combined = {name: sum(f[name] for f in features) for name in ROUTE_FEATURES if name != "fan_in"}
+    combined["fan_in"] = max((f["fan_in"] for f in features), default=0)
+    return combined
+
+
+class Route:
+    """A provider and model, and the conditions a file must meet to use them."""
+
+    __slots__ = ("name", "provider", "model", "conditions")
+
+    def matches(self, features: Dict[str, int]) -> bool:
+        """True if every min_/max_ condition holds for ``features``."""
+        for key, bound in self.conditions.items():
+            kind, feature = key.split("_", 1)
+            value = features[feature]
+            if (kind == "min" and value < bound) or (kind == "max" and value > bound):
+                return False
+        return True
+
+    @property
+    def cache_key(self) -> str:
+        """Summary cache namespace: the provider, plus the model when not the provider's default."""
+        return self.provider if self.model is None else f"{self.provider}:{self.model}"
+
+    def __init__(
+        self,
+        name: str,
+        provider: str,
+        model: Optional[str] = None,
+        conditions: Optional[Dict[str, float]] = None
+    ) -> None:
+        """
+        Args:
+            name: Rule name, reported in the session status
+            provider: LLM provider name (see providers.PROVIDERS)
+            model: Model name; None for the provider client's default
+            conditions: "min_<feature>" / "max_<feature>" bounds, see ROUTE_FEATURES
+        """
+        self.name = name
+        self.provider = provider.lower()
+        self.model = model
+        self.conditions = conditions or {}
+
+
+class ModelRouter:
+    """
+    Chooses the provider and model for each LLM request from file metrics.
+
+    Rules are tried in order and the first whose conditions match the
+    file's features (size, symbol count, fan-in, complexity) decides the
+    model. Each request gets a chain of routes: the matching rule, the
+    provider's default model, then the fallback provider if one is set.
+    Callers move down the chain when a request fails.
+
+    Rules come from MODEL_ROUTES (a JSON list) or the JSON file named by
+    MODEL_ROUTES_FILE, e.g.
+    ``[{"name": "core", "min_lines": 1500, "provider": "gemini"}]``. Without
+    either, the built-in "trivial" rule sends small, simple modules to the
+    provider's small model (LLM_SMALL_MODEL, or SMALL_MODELS). MODEL_ROUTING=0
+    disables rules; LLM_FALLBACK_PROVIDER / LLM_FALLBACK_MODEL set the fallback.
+    """
+
+    def routes(self, features: Dict[str, int]) -> List[Route]:
+        """Return the routes to try for a request, in order."""
+        chain = [route for route in self.rules if route.matches(features)][:1]
+        chain.append(self.default_route)
+        if self.fallback_route is not None:
+            chain.append(self.fallback_route)
+        # The same provider and model twice would only repeat a failure
+        unique: List[Route] = []
+        for route in chain:
+            if all((route.provider, route.model) != (seen.provider, seen.model) for seen in unique):
+                unique.append(route)
+        return unique
+
+    def client(self, route: Route):
+        """Return the client for a route, creating it on first use."""
+        key = (route.provider, route.model)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                kwargs = {"model": route.model} if route.model is not None else {}
+                client = self._clients[key] = create_client(route.provider, **kwargs)
+            return client
+
+    def _load_rules(self) -> List[Route]:
+        if os.getenv("MODEL_ROUTING", "1") == "0":
+            return []
+        raw = os.getenv("MODEL_ROUTES")
+        if not raw and os.getenv("MODEL_ROUTES_FILE"):
+            with open(os.getenv("MODEL_ROUTES_FILE"), "r", encoding="utf-8") as f:
+                raw = f.read()
+        if raw:
+            return [self._parse_rule(rule, index) for index, rule in enumerate(json.loads(raw))]
+        small_model = os.getenv("LLM_SMALL_MODEL") or SMALL_MODELS.get(self.provider)
+        if small_model is None:
+            return []
+        return [self._parse_rule(dict(TRIVIAL_RULE, model=small_model), 0)]
+
+    def _parse_rule(self, rule: Dict[str, Any], index: int) -> Route:
+        """Build a Route from a JSON rule, rejecting unknown keys."""
+        conditions = {}
+        for key, value in rule.items():
+            if key in ("name", "provider", "model"):
+                continue
+            kind, _, feature = key.partition("_")
+            if kind not in ("min", "max") or feature not in ROUTE_FEATURES:
+                raise ValueError(
+                    f"Unknown key '{key}' in model route {index}. Expected name, provider, model "
+                    f"or min_/max_ with one of: {', '.join(ROUTE_FEATURES)}"
+                )
+            conditions[key] = float(value)
+        return Route(
+            rule.get("name") or f"rule{index}",
+            rule.get("provider") or self.provider,
+            rule.get("model"),
+            conditions
+        )
+
+    def __init__(self, provider: str) -> None:
+        """
+        Initialize the ModelRouter.
+
+        Args:
+            provider: Primary LLM provider; its default model handles every
+                request no rule matches
+        """
+        self.provider = provider.lower()
+        self.default_route = Route("default", self.provider)
+        fallback_provider = os.getenv("LLM_FALLBACK_PROVIDER")
+        self.fallback_route = (
+            Route("fallback", fallback_provider, os.getenv("LLM_FALLBACK_MODEL") or None)
+            if fallback_provider else None
+        )
+        self.rules = self._load_rules()
+        self._clients: Dict[Tuple[str, Optional[str]], Any] = {}
+        self._lock = threading.Lock()
@@ -1,16 +1,6 @@
 import os
-from openai import OpenAI
 
-class OpenRouterClient:
-  
-  def summarize(self,query):
-    
-    completion = self.client.chat.completions.create(
-  
-    model="mistralai/mistral-nemo",
-    messages=[
-      { 'role': 'system', 
-        'content': '''You are a Senior Software Engineer and Technical Writer with experience documenting enterprise-grade systems.
+SYSTEM_PROMPT = '''You are a Senior Software Engineer and Technical Writer with experience documenting enterprise-grade systems.
 Your task is to generate clear, professional, industry-standard documentation for the provided source code.
 
 Input
@@ -115,19 +105,48 @@ Onboarding new engineers
 
 Long-term maintenance
 
-Begin once the code is provided.''' 
-            },
-            {
-              "role": "user",
-              "content": f"'''{query}'''"
-            }
-          ],
-      )
+Begin once the code is provided.'''
+
+# Model used unless OPENROUTER_MODEL or a routing rule picks another
+DEFAULT_MODEL = "mistralai/mistral-nemo"
+
+
+class OpenRouterClient:
+  
+  def summarize(self, query, system_prompt=None):
+    
+    completion = self.client.chat.completions.create(
+      model=self.model,
+      messages=self._messages(query, system_prompt),
+    )
 
     return completion.choices[0].message.content
 
+  def summarize_stream(self, query, system_prompt=None):
+    """Yield the summary for ``query`` in chunks as the provider streams it."""
+    stream = self.client.chat.completions.create(
+      model=self.model,
+      messages=self._messages(query, system_prompt),
+      stream=True,
+    )
+    for chunk in stream:
+      if not chunk.choices:
+        continue
+      delta = chunk.choices[0].delta.content
+      if delta:
+        yield delta
+
+  def _messages(self, query, system_prompt=None):
+    return [
+      {'role': 'system', 'content': system_prompt or SYSTEM_PROMPT},
+      {"role": "user", "content": f"'''{query}'''"}
+    ]
+
   
-  def __init__(self) -> None:
+  def __init__(self, model=None) -> None:
+      # Imported here so the SDK loads only when this provider is used
+      from openai import OpenAI
+      self.model = model or os.getenv("OPENROUTER_MODEL") or DEFAULT_MODEL
       self.client = OpenAI(
           base_url="https://openrouter.ai/api/v1",
           api_key=os.getenv('OPENROUTER_API_KEY')
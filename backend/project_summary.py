@@ -0,0 +1,288 @@
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+PROJECT_SUMMARY_PROMPT = '''You are a Senior Software Engineer and Technical Writer with experience documenting enterprise-grade systems.
+Your task is to write a high-level overview of a part of a software project.
+
+Input
+
+You will receive the documentation summaries already written for the files in a directory, and the overviews of its sub-directories. You will not receive source code.
+
+Documentation Requirements
+
+Purpose and responsibilities of this part of the project
+
+How the files and sub-directories fit together
+
+Key entry points, abstractions and dependencies
+
+Style Guidelines
+
+Use clear, concise, professional language
+
+Use Markdown formatting, starting at heading level 3
+
+Keep it under 400 words
+
+Begin once the summaries are provided.'''
+
+
+class ProjectAggregator:
+    """
+    Running project-level aggregates, updated as each file completes.
+
+    Keeps only lightweight data per file (language, symbol counts, local
+    dependencies and a short summary excerpt) so the project index and
+    summary can be written at the end without re-reading every output.
+    Thread-safe: files may be added concurrently by scheduler workers.
+    """
+
+    # Characters of each file summary kept for the hierarchical LLM pass
+    SUMMARY_EXCERPT_CHARS = 1500
+
+    def add(self, file_path: str, analysis: Dict[str, Any], language: str, description: str = "") -> None:
+        """
+        Record one completed file.
+
+        Args:
+            file_path: Relative path of the file
+            analysis: The per-file JSON document
+            language: Detected language of the file
+            description: One-line description for the index
+        """
+        depends_on: Set[str] = set()
+        for info in analysis.get("cross_library_functions", {}).values():
+            source = info.get("source_file")
+            if info.get("is_local") and source and source != file_path:
+                depends_on.add(source)
+
+        summary = analysis.get("summary") or ""
+        entry = {
+            "language": language,
+            "functions": len(analysis.get("functions", [])),
+            "classes": len(analysis.get("classes", [])),
+            "constants": len(analysis.get("constants", [])),
+            "complexity": (analysis.get("metrics") or {}).get("complexity", 0),
+            "todos": len(analysis.get("todos", [])),
+            "description": description,
+            "excerpt": summary[:self.SUMMARY_EXCERPT_CHARS],
+            "depends_on": sorted(depends_on),
+        }
+        with self._lock:
+            previous = self._files.get(file_path)
+            if previous is not None:
+                for target in previous["depends_on"]:
+                    self._fan_in[target] -= 1
+            self._files[file_path] = entry
+            for target in depends_on:
+                self._fan_in[target] = self._fan_in.get(target, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the aggregates in the shape written to project_summary.json."""
+        with self._lock:
+            files = dict(self._files)
+            fan_in = dict(self._fan_in)
+
+        languages: Dict[str, int] = {}
+        totals = {"files": len(files), "functions": 0, "classes": 0, "constants": 0, "todos": 0}
+        modules = {}
+        for file_path, entry in sorted(files.items()):
+            languages[entry["language"]] = languages.get(entry["language"], 0) + 1
+            for key in ("functions", "classes", "constants", "todos"):
+                totals[key] += entry[key]
+            modules[file_path] = {
+                "language": entry["language"],
+                "functions": entry["functions"],
+                "classes": entry["classes"],
+                "constants": entry["constants"],
+                "complexity": entry["complexity"],
+                "todos": entry["todos"],
+                "fan_in": fan_in.get(file_path, 0),
+                "fan_out": len(entry["depends_on"]),
+                "depends_on": entry["depends_on"],
+            }
+        return {
+            "totals": totals,
+            "languages": dict(sorted(languages.items(), key=lambda item: -item[1])),
+            "module_tree": self._module_tree(files),
+            "modules": modules,
+        }
+
+    def render_index(self, doc_link: Callable[[str], str]) -> str:
+        """
+        Render ``index.md``: a table of contents grouped by directory.
+
+        Args:
+            doc_link: Maps a file path to the relative link of its document
+        """
+        with self._lock:
+            files = dict(self._files)
+        out = ["# Documentation Index\n\n"]
+        by_directory: Dict[str, List[str]] = {}
+        for file_path in files:
+            by_directory.setdefault(os.path.dirname(file_path), []).append(file_path)
+        for directory in sorted(by_directory):
+            out.append(f"## `{directory or '.'}`\n\n")
+            for file_path in sorted(by_directory[directory]):
+                entry = files[file_path]
+                counts = f"{entry['functions']} functions, {entry['classes']} classes"
+                description = f" — {entry['description']}" if entry["description"] else ""
+                out.append(f"- [`{file_path}`]({doc_link(file_path)}) ({counts}){description}\n")
+            out.append("\n")
+        return "".join(out)
+
+    def render_summary(self, directory_overviews: Optional[Dict[str, str]] = None, top: int = 10) -> str:
+        """
+        Render ``project_summary.md``: statistics plus the hierarchical overview.
+
+        Args:
+            directory_overviews: Optional LLM overview per directory ("" = project root)
+            top: Number of modules listed in the fan-in/fan-out rankings
+        """
+        data = self.to_dict()
+        totals = data["totals"]
+        modules = data["modules"]
+        overviews = directory_overviews or {}
+
+        out = ["# Project Summary\n\n"]
+        if overviews.get(""):
+            out.append(f"{overviews['']}\n\n")
+
+        out.append("## Statistics\n\n")
+        out.append("| Metric | Count |\n|--------|-------|\n")
+        for label, key in (("Files", "files"), ("Functions", "functions"), ("Classes", "classes"),
+                           ("Constants", "constants"), ("TODO/FIXME comments", "todos")):
+            out.append(f"| {label} | {totals[key]} |\n")
+        out.append("\n")
+
+        out.append("## Languages\n\n")
+        out.append("| Language | Files |\n|----------|-------|\n")
+        for language, count in data["languages"].items():
+            out.append(f"| {language} | {count} |\n")
+        out.append("\n")
+
+        rankings = (
+            ("Most Depended-On Modules (fan-in)", "fan_in", "No local dependencies found."),
+            ("Most Dependent Modules (fan-out)", "fan_out", "No local dependencies found."),
+            ("Most Complex Modules (cyclomatic complexity)", "complexity", "No branching code found."),
+        )
+        for title, key, empty in rankings:
+            ranked = sorted(
+                ((info[key], path) for path, info in modules.items() if info[key]),
+                key=lambda item: (-item[0], item[1])
+            )[:top]
+            out.append(f"## {title}\n\n")
+            if ranked:
+                for count, path in ranked:
+                    out.append(f"- `{path}`: {count}\n")
+            else:
+                out.append(f"{empty}\n")
+            out.append("\n")
+
+        directory_sections = [d for d in sorted(overviews) if d]
+        if directory_sections:
+            out.append("## Directories\n\n")
+            for directory in directory_sections:
+                out.append(f"### `{directory}`\n\n{overviews[directory]}\n\n")
+
+        out.append("---\n\n")
+        out.append("*This documentation was generated automatically by DocsGenerator.*\n")
+        return "".join(out)
+
+    def summarize_hierarchy(
+        self,
+        summarize: Callable[[str], str],
+        max_depth: int = 2,
+        max_input_chars: int = 24000,
+        previous: Optional[Dict[str, Tuple[str, str]]] = None
+    ) -> Dict[str, str]:
+        """
+        Summarize the project bottom-up from the per-file summaries.
+
+        Directories deeper than ``max_depth`` are folded into their ancestor
+        at that depth. Each directory's request contains its files' summary
+        excerpts and its sub-directories' overviews, never raw code.
+
+        The digest of every request is kept in ``overview_inputs``. A
+        directory whose request is identical to the one in ``previous``
+        reuses that overview, so after a partial rerun only the directories
+        with changed summaries (and their ancestors) are sent to the LLM.
+
+        Args:
+            summarize: Callable sending one query to the LLM
+            max_depth: Deepest directory level that gets its own overview
+            max_input_chars: Cap on the size of one request
+            previous: Optional (request digest, overview) per directory from
+                an earlier run
+
+        Returns:
+            Dict mapping directory ("" = project root) to its overview
+        """
+        previous = previous or {}
+        with self._lock:
+            files = dict(self._files)
+
+        def bucket(file_path: str) -> str:
+            parts = os.path.dirname(file_path).replace("\\", "/").split("/")
+            return "/".join(p for p in parts[:max_depth] if p)
+
+        file_groups: Dict[str, List[str]] = {}
+        for file_path in files:
+            file_groups.setdefault(bucket(file_path), []).append(file_path)
+        directories = set(file_groups)
+        for directory in list(directories):
+            parts = directory.split("/") if directory else []
+            for i in range(len(parts)):
+                directories.add("/".join(parts[:i]))
+
+        overviews: Dict[str, str] = {}
+        # Deepest first, so children are summarized before their parents
+        for directory in sorted(directories, key=lambda d: (-(d.count("/") + bool(d)), d)):
+            sections = []
+            for child in sorted(d for d in overviews if self._parent(d) == directory and d != directory):
+                sections.append(f"## Directory `{child}`\n\n{overviews[child]}")
+            for file_path in sorted(file_groups.get(directory, [])):
+                excerpt = files[file_path]["excerpt"]
+                if excerpt:
+                    sections.append(f"## File `{file_path}`\n\n{excerpt}")
+            if not sections:
+                continue
+            query = (f"# Directory `{directory or '.'}`\n\n" + "\n\n".join(sections))[:max_input_chars]
+            digest = hashlib.sha256(query.encode("utf-8", errors="surrogatepass")).hexdigest()
+            if directory in previous and previous[directory][0] == digest:
+                overviews[directory] = previous[directory][1]
+                self.overview_inputs[directory] = digest
+                continue
+            try:
+                overviews[directory] = summarize(query)
+                self.overview_inputs[directory] = digest
+            except Exception as e:
+                print(f"Project summary failed for '{directory or '.'}': {e}")
+        return overviews
+
+    def _parent(self, directory: str) -> Optional[str]:
+        if not directory:
+            return None
+        return directory.rsplit("/", 1)[0] if "/" in directory else ""
+
+    def _module_tree(self, files: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Nested dict of directories; leaves map file names to their language."""
+        tree: Dict[str, Any] = {}
+        for file_path, entry in files.items():
+            node = tree
+            parts = file_path.replace("\\", "/").split("/")
+            for part in parts[:-1]:
+                node = node.setdefault(part + "/", {})
+            node[parts[-1]] = entry["language"]
+        return tree
+
+    def __init__(self) -> None:
+        """Initialize an empty ProjectAggregator."""
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._fan_in: Dict[str, int] = {}
+        # Request digest per directory of the last summarize_hierarchy()
+        self.overview_inputs: Dict[str, str] = {}
+        self._lock = threading.Lock()
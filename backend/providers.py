@@ -0,0 +1,49 @@
+import importlib
+from typing import Dict, List
+
+# LLM provider name -> "module:Class". Modules are imported only when a
+# client for that provider is created, so provider SDKs (openai,
+# google-genai) never load at startup or for providers that are not used.
+PROVIDERS: Dict[str, str] = {
+    "openrouter": "openrouter_client:OpenRouterClient",
+    "gemini": "gemini_client:GeminiClient",
+    "local": "local_llm_client:LocalLLMClient",
+}
+
+
+def register_provider(name: str, target: str) -> None:
+    """
+    Register (or replace) an LLM provider.
+
+    Args:
+        name: Provider name, as used in LLM_PROVIDER
+        target: "module:Class" of a client with summarize() and, optionally,
+            summarize_stream()
+    """
+    if ":" not in target:
+        raise ValueError(f"Provider target must be 'module:Class', got '{target}'")
+    PROVIDERS[name.lower()] = target
+
+
+def available_providers() -> List[str]:
+    return sorted(PROVIDERS)
+
+
+def load_client_class(provider: str) -> type:
+    """Import and return the client class of a provider."""
+    target = PROVIDERS.get(provider.lower())
+    if target is None:
+        raise ValueError(f"Unknown LLM provider: {provider}. Expected one of: {', '.join(available_providers())}")
+    module_name, class_name = target.split(":", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_client(provider: str, **kwargs):
+    """
+    Create the LLM client for a provider.
+
+    Supported providers: "openrouter" (default), "gemini" and "local"
+    (offline stand-in for load testing, see LocalLLMClient), plus any added
+    with register_provider().
+    """
+    return load_client_class(provider)(**kwargs)
@@ -0,0 +1,231 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class _SessionQueue:
+    """Per-session state: pending work units and fair-queuing bookkeeping."""
+
+    def __init__(self, weight: float, max_concurrency: int) -> None:
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.running = 0
+        self.paused = False
+        # Virtual finish tag of the last unit submitted for this session
+        self.last_finish = 0.0
+        # Entries are (start_tag, finish_tag, fn, args, future)
+        self.pending: Deque[Tuple[float, float, Callable, tuple, Future]] = deque()
+
+
+class FairScheduler:
+    """
+    Weighted fair queuing of per-file work units across sessions.
+
+    Every session submits its work units (one or a few files each) to a
+    shared pool of worker threads. Units are tagged with a virtual finish
+    time that grows with their cost divided by the session's weight, and
+    workers always run the pending unit with the smallest finish tag. A
+    session that joins while a huge job is running starts at the current
+    virtual time, so its units are interleaved with the big job's instead
+    of waiting behind all of them. Each session also has a cap on how many
+    of its units may run at once.
+
+    Configuration (constructor arguments take precedence):
+
+    - ``SCHEDULER_WORKERS``: number of worker threads
+    - ``SCHEDULER_SESSION_CONCURRENCY``: default per-session concurrency cap
+    """
+
+    def register(self, session_id: str, weight: float = 1.0, max_concurrency: Optional[int] = None) -> None:
+        """
+        Register a session before submitting work for it.
+
+        Args:
+            session_id: Unique session identifier
+            weight: Share of the workers relative to other sessions (priority)
+            max_concurrency: Per-session cap on simultaneously running units
+        """
+        if weight <= 0:
+            raise ValueError("Session weight must be positive")
+        with self._cond:
+            if session_id in self._sessions:
+                return
+            queue = _SessionQueue(weight, max_concurrency or self.session_concurrency)
+            queue.last_finish = self._virtual_time
+            self._sessions[session_id] = queue
+
+    def unregister(self, session_id: str) -> None:
+        """Forget a session; any units still pending for it are cancelled."""
+        with self._cond:
+            queue = self._sessions.pop(session_id, None)
+        if queue is not None:
+            for *_, future in queue.pending:
+                future.cancel()
+
+    def pause(self, session_id: str) -> bool:
+        """Stop dispatching a session's units; units already running finish normally."""
+        with self._cond:
+            queue = self._sessions.get(session_id)
+            if queue is None:
+                return False
+            queue.paused = True
+            return True
+
+    def resume(self, session_id: str) -> bool:
+        """Dispatch a paused session's units again."""
+        with self._cond:
+            queue = self._sessions.get(session_id)
+            if queue is None:
+                return False
+            queue.paused = False
+            # Don't let the session jump ahead of others by the time it sat idle
+            if queue.pending:
+                shift = max(0.0, self._virtual_time - queue.pending[0][0])
+                queue.pending = deque(
+                    (start + shift, finish + shift, fn, args, future)
+                    for start, finish, fn, args, future in queue.pending
+                )
+                queue.last_finish += shift
+            self._cond.notify_all()
+            return True
+
+    def cancel(self, session_id: str) -> bool:
+        """Cancel every pending unit of a session; running units finish normally."""
+        with self._cond:
+            queue = self._sessions.get(session_id)
+            if queue is None:
+                return False
+            pending = list(queue.pending)
+            queue.pending.clear()
+            self._cond.notify_all()
+        for *_, future in pending:
+            future.cancel()
+        return True
+
+    def submit(self, session_id: str, fn: Callable[..., Any], *args: Any, cost: float = 1.0) -> Future:
+        """
+        Queue a work unit for a registered session.
+
+        Args:
+            session_id: Session the unit belongs to
+            fn: Callable to run on a worker thread
+            *args: Positional arguments for ``fn``
+            cost: Relative cost of the unit (e.g. estimated tokens)
+
+        Returns:
+            Future resolved with the unit's return value
+        """
+        future: Future = Future()
+        with self._cond:
+            queue = self._sessions.get(session_id)
+            if queue is None:
+                raise KeyError(f"Session '{session_id}' is not registered with the scheduler")
+            start = max(self._virtual_time, queue.last_finish)
+            finish = start + max(cost, 1e-9) / queue.weight
+            queue.last_finish = finish
+            queue.pending.append((start, finish, fn, args, future))
+            self._cond.notify()
+        return future
+
+    def run(self, session_id: str, units: List[Tuple[Callable[..., Any], tuple, float]]) -> List[Any]:
+        """
+        Submit a list of ``(fn, args, cost)`` units and block until all finish.
+
+        Every unit runs even if another one fails; the first exception is
+        re-raised once all units are done.
+        """
+        futures = [self.submit(session_id, fn, *args, cost=cost) for fn, args, cost in units]
+        results = []
+        first_error: Optional[BaseException] = None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except BaseException as e:
+                results.append(None)
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+        return results
+
+    def stats(self, session_id: str) -> Dict[str, Any]:
+        """Return queue statistics for a session (pending/running units, weight)."""
+        with self._cond:
+            queue = self._sessions.get(session_id)
+            if queue is None:
+                return {}
+            return {
+                "pending": len(queue.pending),
+                "running": queue.running,
+                "weight": queue.weight,
+                "paused": queue.paused,
+                "max_concurrency": queue.max_concurrency
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once the units they are running finish."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for worker in self._workers:
+            worker.join()
+
+    def _next_unit(self) -> Optional[Tuple[_SessionQueue, Callable, tuple, Future]]:
+        """Pop the runnable unit with the smallest finish tag (caller holds the lock)."""
+        best: Optional[_SessionQueue] = None
+        for queue in self._sessions.values():
+            if queue.paused or not queue.pending or queue.running >= queue.max_concurrency:
+                continue
+            if best is None or queue.pending[0][1] < best.pending[0][1]:
+                best = queue
+        if best is None:
+            return None
+        start, _, fn, args, future = best.pending.popleft()
+        self._virtual_time = max(self._virtual_time, start)
+        best.running += 1
+        return best, fn, args, future
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                unit = self._next_unit()
+                while unit is None and not self._stopped:
+                    self._cond.wait()
+                    unit = self._next_unit()
+                if unit is None:
+                    return
+            queue, fn, args, future = unit
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            with self._cond:
+                queue.running -= 1
+                self._cond.notify_all()
+
+    def __init__(self, workers: Optional[int] = None, session_concurrency: Optional[int] = None) -> None:
+        """
+        Initialize the FairScheduler and start its worker threads.
+
+        Args:
+            workers: Number of worker threads shared by all sessions
+            session_concurrency: Default per-session cap on running units
+        """
+        self.workers = workers or int(os.getenv("SCHEDULER_WORKERS", "4"))
+        self.session_concurrency = session_concurrency or int(os.getenv("SCHEDULER_SESSION_CONCURRENCY", "2"))
+
+        self._sessions: Dict[str, _SessionQueue] = {}
+        self._virtual_time = 0.0
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"scheduler-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for worker in self._workers:
+            worker.start()
@@ -0,0 +1,241 @@
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SearchIndex:
+    """
+    On-disk search index over generated per-file documentation.
+
+    Backed by SQLite: a ``symbols`` table (indexed by lower-cased name) for
+    symbol-name lookups, a ``refs`` table of reverse ("used by")
+    references, and an FTS5 table for full-text queries over
+    summaries, docstrings and symbol names. Files are added one at a time as
+    they complete, replacing any earlier entry for the same file, so the
+    index is always queryable while a session is still running. Falls back
+    to a plain table with LIKE matching where SQLite lacks FTS5.
+    """
+
+    def add_document(self, file_path: str, analysis: Dict[str, Any]) -> None:
+        """
+        Index (or re-index) one file's analysis result.
+
+        Args:
+            file_path: Relative path of the documented file
+            analysis: The per-file JSON document (summarize_file output plus summary)
+        """
+        symbols = list(self._symbols(file_path, analysis))
+        text = self._document_text(analysis)
+        with self._lock, self._conn:
+            file_id = self._delete_file(file_path)
+            if file_id is None:
+                file_id = self._conn.execute("INSERT INTO files (file) VALUES (?)", (file_path,)).lastrowid
+            self._conn.executemany(
+                "INSERT INTO symbols (name, name_lower, kind, file, detail) VALUES (?, ?, ?, ?, ?)",
+                [(name, name.lower(), kind, file_path, detail) for name, kind, detail in symbols]
+            )
+            self._conn.execute("INSERT INTO documents (rowid, content) VALUES (?, ?)", (file_id, text))
+            self._conn.executemany(
+                "INSERT INTO refs (name_lower, file, user) VALUES (?, ?, ?)",
+                [
+                    (symbol.lower(), file_path, user)
+                    for symbol, users in analysis.get("used_by", {}).items()
+                    for user in users
+                ]
+            )
+
+    def remove_document(self, file_path: str) -> None:
+        """Drop a file from the index."""
+        with self._lock, self._conn:
+            file_id = self._delete_file(file_path)
+            if file_id is not None:
+                self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _delete_file(self, file_path: str):
+        """Delete a file's symbols and document (caller holds the lock); return its id."""
+        self._conn.execute("DELETE FROM symbols WHERE file = ?", (file_path,))
+        self._conn.execute("DELETE FROM refs WHERE file = ?", (file_path,))
+        row = self._conn.execute("SELECT id FROM files WHERE file = ?", (file_path,)).fetchone()
+        if row is None:
+            return None
+        # Delete by rowid: the full-text table has no index on other columns
+        self._conn.execute("DELETE FROM documents WHERE rowid = ?", (row[0],))
+        return row[0]
+
+    def search_symbols(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Find symbols whose name starts with ``query`` (case-insensitive).
+
+        Exact matches are returned first, then shorter names.
+        """
+        prefix = query.strip().lower()
+        if not prefix:
+            return []
+        with self._lock:
+            # Range scan instead of LIKE so the name_lower index is used
+            rows = self._conn.execute(
+                "SELECT name, kind, file, detail FROM symbols "
+                "WHERE name_lower >= ? AND name_lower < ? "
+                "ORDER BY name_lower != ?, length(name), name LIMIT ?",
+                (prefix, prefix + "\uffff", prefix, limit)
+            ).fetchall()
+        return [{"name": n, "kind": k, "file": f, "detail": d} for n, k, f, d in rows]
+
+    def find_usages(self, name: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return the files that use symbol ``name`` (exact, case-insensitive)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file, user FROM refs WHERE name_lower = ? ORDER BY file, user LIMIT ?",
+                (name.strip().lower(), limit)
+            ).fetchall()
+        return [{"name": name, "file": f, "used_by": user} for f, user in rows]
+
+    def files(self) -> List[str]:
+        """Return the paths of every indexed file."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT file FROM files ORDER BY file")]
+
+    def defined_symbols(self, file_path: str) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Return the (functions, classes) defined by an indexed file, in source order.
+
+        Returns None if the file is not indexed.
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM files WHERE file = ?", (file_path,)).fetchone() is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT name, kind FROM symbols WHERE file = ? AND kind IN ('function', 'class') ORDER BY rowid",
+                (file_path,)
+            ).fetchall()
+        return [n for n, k in rows if k == "function"], [n for n, k in rows if k == "class"]
+
+    def used_by(self, file_path: str) -> Dict[str, List[str]]:
+        """Return the reverse references of an indexed file: symbol -> user files."""
+        with self._lock:
+            # refs only keep the lower-cased name; take the original from symbols
+            rows = self._conn.execute(
+                "SELECT DISTINCT COALESCE(symbols.name, refs.name_lower), refs.user FROM refs "
+                "LEFT JOIN symbols ON symbols.file = refs.file AND symbols.name_lower = refs.name_lower "
+                "WHERE refs.file = ? ORDER BY refs.rowid",
+                (file_path,)
+            ).fetchall()
+        result: Dict[str, List[str]] = {}
+        for name, user in rows:
+            result.setdefault(name, []).append(user)
+        return result
+
+    def files_used_by(self, users: List[str]) -> List[str]:
+        """Return the indexed files whose "Used by" lists name any of ``users``."""
+        files = set()
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(users), 500):
+                chunk = users[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                files.update(
+                    row[0] for row in self._conn.execute(
+                        f"SELECT DISTINCT file FROM refs WHERE user IN ({placeholders})", chunk
+                    )
+                )
+        return sorted(files)
+
+    def search_text(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search; every word in ``query`` must match (as a prefix).
+
+        Returns the best-ranked files with a short snippet around the match.
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        with self._lock:
+            if self.fts_enabled:
+                match = " ".join(f'"{term}"*' for term in terms)
+                rows = self._conn.execute(
+                    "SELECT files.file, snippet(documents, 0, '**', '**', '...', 16) "
+                    "FROM documents JOIN files ON files.id = documents.rowid "
+                    "WHERE documents MATCH ? ORDER BY rank LIMIT ?",
+                    (match, limit)
+                ).fetchall()
+            else:
+                clauses = " AND ".join("content LIKE ?" for _ in terms)
+                rows = self._conn.execute(
+                    "SELECT files.file, substr(content, 1, 160) "
+                    "FROM documents JOIN files ON files.id = documents.rowid "
+                    f"WHERE {clauses} LIMIT ?",
+                    [f"%{term}%" for term in terms] + [limit]
+                ).fetchall()
+        return [{"file": f, "snippet": snippet} for f, snippet in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _symbols(self, file_path: str, analysis: Dict[str, Any]):
+        """Yield (name, kind, detail) for every symbol defined in a file."""
+        yield file_path.rsplit("/", 1)[-1], "file", None
+        for func in analysis.get("functions", []):
+            yield func["name"], "function", f"({', '.join(func.get('args', []))})"
+        for cls in analysis.get("classes", []):
+            yield cls["name"], "class", ", ".join(cls.get("bases", [])) or None
+            for method in cls.get("methods", []):
+                yield f"{cls['name']}.{method}", "method", None
+        for const in analysis.get("constants", []):
+            if isinstance(const, dict):
+                yield const["name"], "constant", const.get("value")
+
+    def _document_text(self, analysis: Dict[str, Any]) -> str:
+        """Flatten the searchable parts of a per-file document into one string."""
+        docstrings = analysis.get("docstrings", {})
+        parts = [analysis.get("file_name", ""), analysis.get("summary") or "", docstrings.get("module") or ""]
+        for group in ("functions", "classes"):
+            for name, doc in docstrings.get(group, {}).items():
+                parts.append(name)
+                if doc:
+                    parts.append(doc)
+        parts.extend(analysis.get("imports", []))
+        parts.extend(todo.get("text", "") for todo in analysis.get("todos", []))
+        return "\n".join(parts)
+
+    def _create_schema(self) -> None:
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS symbols ("
+                "name TEXT NOT NULL, name_lower TEXT NOT NULL, kind TEXT NOT NULL, "
+                "file TEXT NOT NULL, detail TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS symbols_name ON symbols (name_lower)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS symbols_file ON symbols (file)")
+            # Reverse references: symbol defined in "file" is used by "user"
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS refs (name_lower TEXT NOT NULL, file TEXT NOT NULL, user TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS refs_name ON refs (name_lower)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS refs_file ON refs (file)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, file TEXT NOT NULL UNIQUE)"
+            )
+            try:
+                self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(content)")
+                self.fts_enabled = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5
+                self._conn.execute("CREATE TABLE IF NOT EXISTS documents (content TEXT)")
+                self.fts_enabled = False
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Open (or create) the index database.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self.fts_enabled = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
@@ -1,12 +1,21 @@
-from typing import Union
+from typing import List, Optional, Union
+import json
 import os
 import zipfile
 import shutil
+import hashlib
 import uuid
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException, BackgroundTasks
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from summarize import Summarize
+from summarize import Summarize, ANALYSIS_TIERS, CHECKPOINT_FILE, SEARCH_INDEX_FILE, default_summary_cache
+from search_index import SearchIndex
+from checkpoint import Checkpoint
+from scheduler import FairScheduler
+from file_documenter import FileDocumenter
+from git_ingest import GitError, changed_files, checkout
+from storage import QuotaExceededError, StorageManager
+from work_queue import WorkQueue, default_queue_path
 
 app = FastAPI()
 
@@ -29,30 +38,310 @@ OUTPUT_ZIP_DIR = os.path.join(OUTPUT_DIR, "zip")
 # Track processing status for each session
 processing_status: dict[str, dict] = {}
 
+# Running Summarize jobs by session, for pause/resume/cancel
+active_jobs: dict[str, Summarize] = {}
+
+# Per-session file recording the upload's name, source folder and priority
+SESSION_MANIFEST = "session.json"
+
+# Shared worker pool that interleaves per-file work across sessions
+scheduler = FairScheduler()
+
+# AI summaries by file contents, shared by sessions and /document
+summary_cache = default_summary_cache(OUTPUT_DIR)
+
+# Single-file documentation for /document
+file_documenter = FileDocumenter(cache=summary_cache)
+
+# Largest source file accepted by /document
+DOCUMENT_MAX_BYTES = int(os.getenv("DOCUMENT_MAX_BYTES", str(1024 * 1024)))
+
+# Comma-separated directories that local git sources must be inside;
+# unset, only uploaded bundles can be ingested
+GIT_INGEST_ALLOWED_ROOTS = [
+    os.path.realpath(root) for root in os.getenv("GIT_INGEST_ALLOWED_ROOTS", "").split(",") if root.strip()
+]
+
+# Allowed range for the optional upload priority (fair-share weight)
+MIN_PRIORITY = 1
+MAX_PRIORITY = 10
+
+# Delete a session's extracted sources once every file has its AI summary
+DELETE_EXTRACTED_ON_COMPLETE = os.getenv("DELETE_EXTRACTED_ON_COMPLETE", "1") != "0"
+
+# Session states whose files must not be evicted
+ACTIVE_STATES = ("uploading", "queued", "fetching", "processing", "paused")
+
+# Session of every (upload SHA-256, tier), so identical uploads reuse its results
+upload_sessions: dict[tuple[str, str], str] = {}
+
+# "local": sessions run in this process on the shared scheduler.
+# "queue": this process only plans sessions; worker processes (worker.py)
+# claim their work units from the shared work queue.
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "local").lower()
+if EXECUTION_MODE not in ("local", "queue"):
+    raise ValueError(f"EXECUTION_MODE must be 'local' or 'queue', got '{EXECUTION_MODE}'")
+work_queue: Optional[WorkQueue] = WorkQueue(default_queue_path(OUTPUT_DIR)) if EXECUTION_MODE == "queue" else None
+
 # Ensure directories exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(EXTRACT_DIR, exist_ok=True)
 os.makedirs(OUTPUT_ZIP_DIR, exist_ok=True)
 
 
-def summarizer(folder_to_be_summarized: str, name: str, session_id: str) -> None:
-    """Run summarization in background with session tracking."""
+def forget_session(session_id: str) -> None:
+    """Drop the in-memory state of a session whose files were evicted."""
+    processing_status.pop(session_id, None)
+    for key in [key for key, owner in upload_sessions.items() if owner == session_id]:
+        del upload_sessions[key]
+
+
+# Quotas, TTL/size-based eviction and upload deduplication
+storage = StorageManager(
+    UPLOAD_DIR,
+    EXTRACT_DIR,
+    OUTPUT_DIR,
+    OUTPUT_ZIP_DIR,
+    is_active=lambda session_id: (
+        session_id in active_jobs
+        or processing_status.get(session_id, {}).get("status") in ACTIVE_STATES
+    ),
+    on_evict=forget_session
+)
+
+
+def summarizer(
+    folder_to_be_summarized: str,
+    name: str,
+    session_id: str,
+    priority: int = 1,
+    tier: str = "full",
+    scope: Optional[List[str]] = None,
+    changed: Optional[List[str]] = None
+) -> None:
+    """
+    Run summarization in background with session tracking.
+    
+    In queue execution mode the session is only planned here; its work
+    units go to the shared work queue and the status is updated from the
+    queue (see sync_queue_status).
+    """
+    # Cancelled while still waiting in the background queue
+    if processing_status[session_id]["status"] == "cancelled":
+        return
     try:
         processing_status[session_id]["status"] = "processing"
         # Pass processing_status and output_dir for progress updates
-        Summarize(
+        job = Summarize(
             folder_to_be_summarized, 
             name, 
             session_id, 
             processing_status,
-            output_base_dir=OUTPUT_DIR
-        ).summarize()
-        processing_status[session_id]["status"] = "completed"
+            output_base_dir=OUTPUT_DIR,
+            scheduler=scheduler,
+            priority=priority,
+            tier=tier,
+            scope=scope,
+            summary_cache=summary_cache,
+            changed_files=changed
+        )
+        active_jobs[session_id] = job
+        if processing_status[session_id]["status"] == "cancelled":
+            job.cancel()
+        units = job.plan()
+        if work_queue is not None and units and not job.cancelled:
+            # Workers process the units; the one finishing the last unit finalizes and zips
+            job.enqueue(work_queue, units, zip_path=os.path.join(OUTPUT_ZIP_DIR, f"{session_id}_{name}"))
+            processing_status[session_id]["status"] = "queued"
+            return
+        job.run(units)
+        if job.cancelled:
+            processing_status[session_id]["status"] = "cancelled"
+            return
         # Zip the folder after completion
         zip_folder(name, session_id)
+        complete_session(session_id)
     except Exception as e:
         processing_status[session_id]["status"] = "failed"
         processing_status[session_id]["error"] = str(e)
+    finally:
+        active_jobs.pop(session_id, None)
+
+
+def complete_session(session_id: str) -> None:
+    """
+    Mark a session whose docs and ZIP are written as completed.
+    
+    Records the commit of a git session and deletes the extracted sources
+    once nothing is left to deepen, i.e. the checkpoint shows an AI summary
+    for every file (a deepened file or directory alone is not enough); git
+    sessions keep their checkout for updates.
+    """
+    status = processing_status[session_id]
+    status["status"] = "completed"
+    status["download_name"] = f"{session_id}_{status['name']}"
+    manifest = load_session_manifest(session_id) or {}
+    if "git" in manifest:
+        pending = manifest["git"].pop("pending", None)
+        if pending:
+            manifest["git"].update(pending)
+            write_session_manifest(session_id, manifest)
+    elif DELETE_EXTRACTED_ON_COMPLETE and Checkpoint(
+        os.path.join(OUTPUT_DIR, session_id, CHECKPOINT_FILE)
+    ).all_summarized():
+        storage.delete_extracted(session_id)
+
+
+def sync_queue_status(session_id: str) -> None:
+    """Update a session planned into the work queue with the workers' progress."""
+    status = processing_status.get(session_id)
+    if work_queue is None or status is None or session_id in active_jobs:
+        return
+    if status["status"] not in ("queued", "processing", "paused"):
+        return
+    queued = work_queue.status(session_id)
+    if queued is None:
+        return
+    status["progress"] = {
+        "current": queued["done_files"],
+        "total": queued["total_files"],
+        "current_file": "",
+        "completed": queued["done_files"],
+        "percentage": round(queued["done_files"] / queued["total_files"] * 100) if queued["total_files"] else 0
+    }
+    status["queue"] = {"units": queued["units"], "workers": queued["workers"]}
+    if queued["status"] == "completed":
+        complete_session(session_id)
+    elif queued["status"] == "failed":
+        status["status"] = "failed"
+        status["error"] = queued["error"]
+    elif queued["status"] in ("running", "finalizing"):
+        status["status"] = "processing" if queued["units"]["claimed"] or queued["units"]["done"] else "queued"
+
+
+def git_summarizer(session_id: str, source: str, rev: str) -> None:
+    """
+    Check out a git revision for a session, then document it in background.
+    
+    If the session already has docs for an earlier commit, only the files
+    touched between the two commits (and the files whose docs they affect)
+    are reprocessed. The manifest records the commit once its docs are done.
+    """
+    if processing_status[session_id]["status"] == "cancelled":
+        return
+    manifest = load_session_manifest(session_id)
+    git_info = manifest["git"]
+    processing_status[session_id]["status"] = "fetching"
+    try:
+        commit = checkout(source, manifest["folder"], rev)
+        changed = None
+        if git_info.get("commit"):
+            changed, deleted = changed_files(manifest["folder"], git_info["commit"], commit)
+            processing_status[session_id]["changed_files"] = len(changed)
+            processing_status[session_id]["deleted_files"] = len(deleted)
+    except GitError as e:
+        processing_status[session_id]["status"] = "failed"
+        processing_status[session_id]["error"] = str(e)
+        return
+    processing_status[session_id]["commit"] = commit
+    # Becomes the session's commit once its docs are done (see complete_session)
+    git_info["pending"] = {"source": source, "rev": rev, "commit": commit}
+    write_session_manifest(session_id, manifest)
+    
+    summarizer(
+        manifest["folder"], manifest["name"], session_id,
+        manifest["priority"], manifest.get("tier", "full"), changed=changed
+    )
+
+
+def resolve_git_source(session_id: str, source: Optional[str], bundle: Optional[UploadFile]) -> str:
+    """
+    Return the path of the repository or bundle to ingest for a request.
+    
+    An uploaded bundle is saved in the session's upload folder. A local
+    repository path is only accepted inside GIT_INGEST_ALLOWED_ROOTS, and
+    not at all when that is unset.
+    """
+    if bundle is not None and bundle.filename:
+        session_upload_dir = os.path.join(UPLOAD_DIR, session_id)
+        os.makedirs(session_upload_dir, exist_ok=True)
+        bundle_path = os.path.join(session_upload_dir, os.path.basename(bundle.filename))
+        with open(bundle_path, "wb") as buffer:
+            shutil.copyfileobj(bundle.file, buffer)
+        return bundle_path
+    if not source:
+        raise HTTPException(status_code=400, detail="Send a repository path (source) or a bundle file.")
+    if not GIT_INGEST_ALLOWED_ROOTS:
+        raise HTTPException(
+            status_code=403,
+            detail="Ingesting repository paths is disabled; upload a bundle or set GIT_INGEST_ALLOWED_ROOTS."
+        )
+    real_source = os.path.realpath(source)
+    if not any(
+        real_source == root or real_source.startswith(root + os.sep) for root in GIT_INGEST_ALLOWED_ROOTS
+    ):
+        raise HTTPException(status_code=403, detail="Repository path is outside the allowed roots.")
+    if not os.path.exists(real_source):
+        raise HTTPException(status_code=404, detail=f"Repository not found: {source}")
+    return real_source
+
+
+def fail_upload(session_id: str, status_code: int, detail: str) -> None:
+    """Mark an upload as failed, delete what it stored so far and raise."""
+    processing_status[session_id]["status"] = "failed"
+    processing_status[session_id]["error"] = detail
+    storage.delete_upload(session_id)
+    storage.delete_extracted(session_id)
+    raise HTTPException(status_code=status_code, detail=detail)
+
+
+def find_upload_session(upload_hash: str, tier: str) -> Optional[str]:
+    """
+    Return the session of an identical earlier upload whose results can be reused.
+    
+    That is a session still in progress, or a completed one whose ZIP is
+    still available (also from before a server restart). Failed, cancelled
+    and evicted sessions are not reused.
+    """
+    session_id = upload_sessions.get((upload_hash, tier))
+    if session_id is None:
+        return None
+    status = processing_status.get(session_id, {}).get("status")
+    if status in ACTIVE_STATES:
+        return session_id
+    if status not in (None, "completed"):
+        return None
+    manifest = load_session_manifest(session_id)
+    if manifest is None or not os.path.exists(os.path.join(OUTPUT_ZIP_DIR, f"{session_id}_{manifest['name']}.zip")):
+        return None
+    if status is None:
+        processing_status[session_id] = {
+            "status": "completed",
+            "filename": manifest["filename"],
+            "session_id": session_id,
+            "priority": manifest["priority"],
+            "name": manifest["name"],
+            "tier": manifest.get("tier", "full"),
+            "download_name": f"{session_id}_{manifest['name']}"
+        }
+    return session_id
+
+
+def write_session_manifest(session_id: str, manifest: dict) -> None:
+    """Persist what is needed to restart a session after a server restart."""
+    session_dir = os.path.join(OUTPUT_DIR, session_id)
+    os.makedirs(session_dir, exist_ok=True)
+    with open(os.path.join(session_dir, SESSION_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_session_manifest(session_id: str) -> Optional[dict]:
+    """Return the persisted manifest of a session, or None if unknown."""
+    manifest_path = os.path.join(OUTPUT_DIR, session_id, SESSION_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 def zip_folder(name: str, session_id: str) -> str:
@@ -75,6 +364,18 @@ def zip_folder(name: str, session_id: str) -> str:
     return f"{zip_name}.zip"
 
 
+@app.on_event("startup")
+def start_storage_janitor() -> None:
+    """Re-register earlier uploads for deduplication and result reuse, and start the janitor."""
+    for session_id in os.listdir(OUTPUT_DIR):
+        manifest = load_session_manifest(session_id) if session_id not in storage.SHARED_OUTPUT_FOLDERS else None
+        if manifest and manifest.get("upload_sha256"):
+            storage.register_upload(manifest["upload_sha256"], os.path.join(EXTRACT_DIR, session_id, manifest["name"]))
+            if os.path.exists(os.path.join(OUTPUT_ZIP_DIR, f"{session_id}_{manifest['name']}.zip")):
+                upload_sessions[(manifest["upload_sha256"], manifest.get("tier", "full"))] = session_id
+    storage.start()
+
+
 @app.get("/")
 def read_root() -> dict:
     return {"status": "running"}
@@ -88,6 +389,7 @@ async def download_zip(name: str) -> FileResponse:
     zip_path = os.path.join(OUTPUT_ZIP_DIR, f"{name}.zip")
     if not os.path.exists(zip_path):
         raise HTTPException(status_code=404, detail=f"ZIP file '{name}.zip' not found.")
+    storage.touch(name.split("_", 1)[0])
     return FileResponse(
         path=zip_path,
         filename=f"{name}.zip",
@@ -102,26 +404,421 @@ async def get_status(session_id: str) -> dict:
     """
     if session_id not in processing_status:
         raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+    sync_queue_status(session_id)
+    queue_stats = scheduler.stats(session_id)
+    if queue_stats:
+        return {**processing_status[session_id], "queue": queue_stats}
     return processing_status[session_id]
 
 
+@app.get("/docs/{session_id}/{file_path:path}")
+async def get_document(session_id: str, file_path: str) -> PlainTextResponse:
+    """
+    Return the Markdown documentation generated so far for one file.
+    
+    Available while the session is still processing: completed files are
+    listed by GET /sessions/{session_id}/files, and the file currently
+    being summarized is streamed into its document progressively.
+    """
+    if session_id not in processing_status:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+    name = processing_status[session_id].get("name")
+    safe_filename = file_path.replace('/', '_').replace('\\', '_')
+    md_path = os.path.join(OUTPUT_DIR, session_id, str(name), "md", f"{safe_filename}.md")
+    if not name or not os.path.exists(md_path):
+        raise HTTPException(status_code=404, detail=f"Documentation for '{file_path}' not found.")
+    storage.touch(session_id)
+    with open(md_path, "r", encoding="utf-8") as md_file:
+        return PlainTextResponse(md_file.read(), media_type="text/markdown")
+
+
+@app.post("/document")
+def document_file(
+    file: Optional[UploadFile] = File(None),
+    session_id: Optional[str] = Form(None),
+    path: Optional[str] = Form(None),
+    format: str = Form("json")
+) -> Union[JSONResponse, PlainTextResponse]:
+    """
+    Document a single source file synchronously.
+    
+    Send either an uploaded ``file`` or the ``path`` of a file inside an
+    existing session. With a ``session_id``, imports are resolved against
+    that session's modules and "Used by" references come from its search
+    index; an uploaded file then stands in for the session's copy of
+    ``path``. Summaries are cached by file contents, so repeated requests
+    for unchanged files return without an LLM call.
+    
+    Returns the per-file JSON document (``format=json``) or its Markdown
+    rendering (``format=md``); the X-Summary-Cache header is "hit" or "miss".
+    """
+    if format not in ("json", "md"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'md'.")
+    if file is None and not (session_id and path):
+        raise HTTPException(status_code=400, detail="Send a file, or a session_id and path.")
+    
+    manifest = None
+    index = None
+    if session_id:
+        manifest = load_session_manifest(session_id)
+        if manifest is None:
+            raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+        db_path = os.path.join(OUTPUT_DIR, session_id, SEARCH_INDEX_FILE)
+        if os.path.exists(db_path):
+            index = SearchIndex(db_path)
+    
+    try:
+        if file is not None:
+            data = file.file.read(DOCUMENT_MAX_BYTES + 1)
+            file_path = (path or file.filename or "file").strip("/")
+        else:
+            file_path = path.strip("/")
+            root = os.path.realpath(manifest["folder"])
+            source = os.path.realpath(os.path.join(root, file_path))
+            if not source.startswith(root + os.sep) or not os.path.isfile(source):
+                raise HTTPException(status_code=404, detail=f"File '{file_path}' not found in session '{session_id}'.")
+            with open(source, "rb") as source_file:
+                data = source_file.read(DOCUMENT_MAX_BYTES + 1)
+        if len(data) > DOCUMENT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"File exceeds {DOCUMENT_MAX_BYTES} bytes.")
+        
+        try:
+            out, cached = file_documenter.document(file_path, data.decode("utf-8", errors="replace"), index)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Error generating documentation: {e}")
+    finally:
+        if index is not None:
+            index.close()
+    
+    headers = {"X-Summary-Cache": "hit" if cached else "miss"}
+    if format == "md":
+        return PlainTextResponse(file_documenter.to_markdown(out), media_type="text/markdown", headers=headers)
+    return JSONResponse(out, headers=headers)
+
+
+@app.post("/cancel/{session_id}")
+async def cancel_session(session_id: str) -> dict:
+    """
+    Cancel a queued or running session.
+    
+    Files already in progress finish; completed files stay checkpointed so
+    the session can be resumed later.
+    """
+    if session_id not in processing_status:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+    status = processing_status[session_id]["status"]
+    if status not in ("queued", "fetching", "processing", "paused"):
+        raise HTTPException(status_code=409, detail=f"Session '{session_id}' is {status}.")
+    
+    job = active_jobs.get(session_id)
+    if job is not None:
+        job.cancel()
+    if work_queue is not None:
+        work_queue.cancel(session_id)
+    processing_status[session_id]["status"] = "cancelled"
+    return {"session_id": session_id, "status": "cancelled"}
+
+
+@app.post("/pause/{session_id}")
+async def pause_session(session_id: str) -> dict:
+    """Pause a running session; files already in progress finish normally."""
+    job = active_jobs.get(session_id)
+    if job is not None:
+        job.pause()
+    elif work_queue is None or not work_queue.pause(session_id):
+        raise HTTPException(status_code=409, detail=f"Session '{session_id}' is not running.")
+    processing_status[session_id]["status"] = "paused"
+    return {"session_id": session_id, "status": "paused"}
+
+
+@app.post("/resume/{session_id}")
+async def resume_session(session_id: str, background_tasks: BackgroundTasks) -> dict:
+    """
+    Resume a paused session, or restart a cancelled, failed or interrupted one.
+    
+    Restarted sessions reuse their output folder and skip every file already
+    recorded in the session's checkpoint.
+    """
+    job = active_jobs.get(session_id)
+    if job is not None and job.cancelled:
+        # Still finishing the files in progress; it can be restarted once it has stopped
+        raise HTTPException(status_code=409, detail=f"Session '{session_id}' is still being cancelled; retry shortly.")
+    if job is not None:
+        job.resume()
+        processing_status[session_id]["status"] = "processing"
+        return {"session_id": session_id, "status": "processing"}
+    if work_queue is not None and work_queue.resume(session_id):
+        processing_status[session_id]["status"] = "processing"
+        return {"session_id": session_id, "status": "processing"}
+    
+    manifest = load_session_manifest(session_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+    status = processing_status.get(session_id, {}).get("status")
+    if status in ("queued", "fetching", "processing", "completed"):
+        raise HTTPException(status_code=409, detail=f"Session '{session_id}' is {status}.")
+    if not os.path.isdir(manifest["folder"]):
+        raise HTTPException(status_code=410, detail="Extracted files for this session are no longer available.")
+    
+    processing_status[session_id] = {
+        "status": "queued",
+        "filename": manifest["filename"],
+        "session_id": session_id,
+        "priority": manifest["priority"],
+        "name": manifest["name"],
+        "tier": manifest.get("tier", "full"),
+        "resumed": True
+    }
+    background_tasks.add_task(
+        summarizer, manifest["folder"], manifest["name"], session_id,
+        manifest["priority"], manifest.get("tier", "full")
+    )
+    return {"session_id": session_id, "status": "queued"}
+
+
+@app.post("/deepen/{session_id}")
+async def deepen_session(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    path: str = "",
+    tier: str = "full"
+) -> dict:
+    """
+    Compute a deeper analysis tier for one file or directory of a session.
+    
+    Only files under ``path`` (relative to the project root; empty for the
+    whole project) are reprocessed, and only those that did not already get
+    an AI summary. The session's download is re-zipped when done.
+    """
+    if tier not in ANALYSIS_TIERS:
+        raise HTTPException(status_code=400, detail=f"Tier must be one of: {', '.join(ANALYSIS_TIERS)}.")
+    manifest = load_session_manifest(session_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+    status = processing_status.get(session_id, {}).get("status")
+    if session_id in active_jobs or status in ("queued", "fetching", "processing", "paused"):
+        raise HTTPException(status_code=409, detail=f"Session '{session_id}' is {status}.")
+    if not os.path.isdir(manifest["folder"]):
+        raise HTTPException(status_code=410, detail="Extracted files for this session are no longer available.")
+    
+    path = path.strip("/")
+    target = os.path.realpath(os.path.join(manifest["folder"], path))
+    root = os.path.realpath(manifest["folder"])
+    if not (target == root or target.startswith(root + os.sep)) or not os.path.exists(target):
+        raise HTTPException(status_code=404, detail=f"Path '{path}' not found in session '{session_id}'.")
+    
+    # Updated in place: the session keeps its download_name while it is deepened
+    session_status = processing_status.setdefault(session_id, {
+        "filename": manifest["filename"],
+        "session_id": session_id,
+        "priority": manifest["priority"],
+        "name": manifest["name"]
+    })
+    for key in ("error", "partial"):
+        session_status.pop(key, None)
+    session_status.update({"status": "queued", "tier": tier, "deepening": path})
+    background_tasks.add_task(
+        summarizer, manifest["folder"], manifest["name"], session_id,
+        manifest["priority"], tier, [path]
+    )
+    return {"session_id": session_id, "status": "queued", "path": path, "tier": tier}
+
+
+@app.get("/search/{session_id}")
+def search_session(session_id: str, q: str, mode: str = "symbol", limit: int = 20) -> dict:
+    """
+    Search a session's generated documentation.
+    
+    mode "symbol" matches function, class, method, constant and file names
+    by case-insensitive prefix; mode "text" runs a full-text query over
+    summaries, docstrings and symbol names; mode "usages" lists the files
+    that use a symbol. Works while the session is
+    still processing: files are indexed as they complete.
+    """
+    if mode not in ("symbol", "text", "usages"):
+        raise HTTPException(status_code=400, detail="mode must be 'symbol', 'text' or 'usages'.")
+    db_path = os.path.join(OUTPUT_DIR, session_id, SEARCH_INDEX_FILE)
+    if not os.path.exists(db_path):
+        raise HTTPException(status_code=404, detail=f"No search index for session '{session_id}'.")
+    
+    limit = max(1, min(limit, 200))
+    index = SearchIndex(db_path)
+    try:
+        if mode == "symbol":
+            results = index.search_symbols(q, limit)
+        elif mode == "usages":
+            results = index.find_usages(q, limit)
+        else:
+            results = index.search_text(q, limit)
+    finally:
+        index.close()
+    return {"session_id": session_id, "query": q, "mode": mode, "results": results}
+
+
+@app.get("/sessions/{session_id}/files")
+def list_completed_files(session_id: str, offset: int = 0, limit: int = 100) -> dict:
+    """
+    List the files of a session whose documentation is fully written.
+    
+    Read from the session's checkpoint, so it also covers files completed
+    by queue workers or by an earlier run; paginated with offset and limit.
+    """
+    if session_id not in processing_status and load_session_manifest(session_id) is None:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+    offset = max(0, offset)
+    limit = max(1, min(limit, 1000))
+    files = sorted(Checkpoint(os.path.join(OUTPUT_DIR, session_id, CHECKPOINT_FILE)).completed())
+    return {
+        "session_id": session_id,
+        "files": files[offset:offset + limit],
+        "total": len(files),
+        "offset": offset
+    }
+
+
 @app.get("/sessions")
 async def list_sessions() -> dict:
     """
     List all active processing sessions and their statuses.
     """
+    for session_id in list(processing_status):
+        sync_queue_status(session_id)
     return {
         "sessions": list(processing_status.values()),
         "total": len(processing_status)
     }
 
 
+@app.post("/ingest/git")
+async def ingest_git(
+    background_tasks: BackgroundTasks,
+    source: Optional[str] = Form(None),
+    bundle: Optional[UploadFile] = File(None),
+    rev: str = Form("HEAD"),
+    priority: int = Form(1),
+    tier: str = Form("full")
+) -> dict:
+    """
+    Document a git repository: an uploaded bundle, or a local repository
+    path inside GIT_INGEST_ALLOWED_ROOTS (paths are refused when it is unset).
+    
+    The revision ``rev`` is checked out into the session, and the commit the
+    docs were built from is recorded in the session manifest and status.
+    Use POST /update/{session_id} to refresh the docs for a later commit.
+    """
+    if not MIN_PRIORITY <= priority <= MAX_PRIORITY:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Priority must be between {MIN_PRIORITY} and {MAX_PRIORITY}."
+        )
+    if tier not in ANALYSIS_TIERS:
+        raise HTTPException(status_code=400, detail=f"Tier must be one of: {', '.join(ANALYSIS_TIERS)}.")
+    
+    session_id = str(uuid.uuid4())
+    source_path = resolve_git_source(session_id, source, bundle)
+    name = os.path.basename(source_path.rstrip("/\\"))
+    for suffix in (".bundle", ".git"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    name = name or "repository"
+    
+    processing_status[session_id] = {
+        "status": "queued",
+        "filename": os.path.basename(source_path),
+        "session_id": session_id,
+        "priority": priority,
+        "tier": tier,
+        "name": name
+    }
+    write_session_manifest(session_id, {
+        "session_id": session_id,
+        "filename": os.path.basename(source_path),
+        "name": name,
+        "folder": os.path.join(EXTRACT_DIR, session_id, name),
+        "priority": priority,
+        "tier": tier,
+        "git": {"source": source_path, "rev": rev, "commit": None}
+    })
+    background_tasks.add_task(git_summarizer, session_id, source_path, rev)
+    return {"session_id": session_id, "status": "queued", "rev": rev}
+
+
+@app.post("/update/{session_id}")
+async def update_git_session(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    rev: str = Form("HEAD"),
+    bundle: Optional[UploadFile] = File(None)
+) -> dict:
+    """
+    Refresh a git session's docs for a later commit.
+    
+    Fetches ``rev`` from the session's repository (or from a newly uploaded
+    bundle) and reprocesses only the files changed since the commit the
+    current docs were built from; deleted files are dropped from the docs.
+    """
+    manifest = load_session_manifest(session_id)
+    if manifest is None:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found.")
+    if "git" not in manifest:
+        raise HTTPException(status_code=400, detail=f"Session '{session_id}' was not ingested from git.")
+    status = processing_status.get(session_id, {}).get("status")
+    if session_id in active_jobs or status in ("queued", "fetching", "processing", "paused"):
+        raise HTTPException(status_code=409, detail=f"Session '{session_id}' is {status}.")
+    
+    source_path = manifest["git"]["source"]
+    if bundle is not None and bundle.filename:
+        source_path = resolve_git_source(session_id, None, bundle)
+    elif not source_path.startswith(os.path.join(UPLOAD_DIR, session_id) + os.sep):
+        # A repository path: check it against the allowed roots configured now
+        source_path = resolve_git_source(session_id, source_path, None)
+    
+    processing_status[session_id] = {
+        "status": "queued",
+        "filename": manifest["filename"],
+        "session_id": session_id,
+        "priority": manifest["priority"],
+        "tier": manifest.get("tier", "full"),
+        "name": manifest["name"],
+        "previous_commit": manifest["git"].get("commit")
+    }
+    background_tasks.add_task(git_summarizer, session_id, source_path, rev)
+    return {"session_id": session_id, "status": "queued", "rev": rev}
+
+
 @app.post("/upload")
-async def post_upload(background_tasks: BackgroundTasks, file: UploadFile = File(...)) -> dict:
+async def post_upload(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    priority: int = Form(1),
+    tier: str = Form("full"),
+    reuse: bool = Form(True)
+) -> dict:
     """
     Accept a ZIP file upload and extract its contents.
     Uses unique session IDs for multi-user isolation.
+    
+    The optional priority (1-10) is the session's fair-share weight: a
+    session with priority 2 gets roughly twice the workers of one with 1.
+    
+    The optional tier selects how much is computed up front: "structure"
+    (code structure only, no AI summaries), "entry" (AI summaries for entry
+    points and widely used modules) or "full". Deeper tiers can be computed
+    later per file or directory with POST /deepen/{session_id}.
+    
+    An archive identical to an earlier upload (same SHA-256 and tier) is
+    not processed again unless reuse is false: the response carries the
+    earlier session's id, with its download_name if it is completed, or
+    its current status if it is still in progress.
     """
+    if not MIN_PRIORITY <= priority <= MAX_PRIORITY:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Priority must be between {MIN_PRIORITY} and {MAX_PRIORITY}."
+        )
+    if tier not in ANALYSIS_TIERS:
+        raise HTTPException(status_code=400, detail=f"Tier must be one of: {', '.join(ANALYSIS_TIERS)}.")
+
     # Generate unique session ID for this upload
     session_id = str(uuid.uuid4())
     
@@ -129,7 +826,9 @@ async def post_upload(background_tasks: BackgroundTasks, file: UploadFile = File
     processing_status[session_id] = {
         "status": "uploading",
         "filename": file.filename,
-        "session_id": session_id
+        "session_id": session_id,
+        "priority": priority,
+        "tier": tier
     }
     
     # Validate file type
@@ -138,26 +837,71 @@ async def post_upload(background_tasks: BackgroundTasks, file: UploadFile = File
         processing_status[session_id]["error"] = "Only ZIP files are allowed."
         raise HTTPException(status_code=400, detail="Only ZIP files are allowed.")
 
-    # Save the uploaded file with session-specific path
+    # Save the uploaded file with session-specific path, hashing it on the way
     session_upload_dir = os.path.join(UPLOAD_DIR, session_id)
     os.makedirs(session_upload_dir, exist_ok=True)
-    file_path = os.path.join(session_upload_dir, str(file.filename))
+    file_path = os.path.join(session_upload_dir, os.path.basename(file.filename))
     
+    digest = hashlib.sha256()
+    size = 0
     with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+        while chunk := file.file.read(1024 * 1024):
+            size += len(chunk)
+            if size > storage.session_max_upload_bytes:
+                break
+            digest.update(chunk)
+            buffer.write(chunk)
+    if size > storage.session_max_upload_bytes:
+        fail_upload(session_id, 413, f"Upload exceeds {storage.session_max_upload_bytes} bytes.")
+    upload_hash = digest.hexdigest()
+
+    existing = find_upload_session(upload_hash, tier) if reuse else None
+    if existing is not None:
+        # Identical archive already documented (or being documented): attach to that session
+        storage.delete_upload(session_id)
+        processing_status.pop(session_id, None)
+        storage.touch(existing)
+        response = {
+            "message": "Identical upload found, reusing its session.",
+            "filename": file.filename,
+            "session_id": existing,
+            "status": processing_status[existing]["status"],
+            "reused": True
+        }
+        if "download_name" in processing_status[existing]:
+            response["download_name"] = processing_status[existing]["download_name"]
+        return response
+    # Later identical uploads attach to this session from now on
+    upload_sessions[(upload_hash, tier)] = session_id
 
     # Extract the ZIP file to session-specific directory
     name = os.path.splitext(os.path.basename(file.filename))[0]
+    processing_status[session_id]["name"] = name
     extract_path = os.path.join(EXTRACT_DIR, session_id, name)
     os.makedirs(extract_path, exist_ok=True)
 
+    duplicate = storage.find_duplicate(upload_hash)
+    if duplicate is not None:
+        try:
+            # Identical upload already extracted: share its files via hard links
+            storage.link_tree(duplicate, extract_path)
+        except OSError:
+            # Evicted meanwhile; extract normally
+            shutil.rmtree(extract_path, ignore_errors=True)
+            os.makedirs(extract_path, exist_ok=True)
+            duplicate = None
     try:
-        with zipfile.ZipFile(file_path, "r") as zip_ref:
-            zip_ref.extractall(extract_path)
+        if duplicate is None:
+            with zipfile.ZipFile(file_path, "r") as zip_ref:
+                storage.reserve(size + storage.check_zip(zip_ref))
+                zip_ref.extractall(extract_path)
     except zipfile.BadZipFile:
-        processing_status[session_id]["status"] = "failed"
-        processing_status[session_id]["error"] = "Invalid ZIP file."
-        raise HTTPException(status_code=400, detail="Invalid ZIP file.")
+        fail_upload(session_id, 400, "Invalid ZIP file.")
+    except QuotaExceededError as e:
+        fail_upload(session_id, e.status_code, str(e))
+    # The archive is no longer needed once extracted
+    storage.delete_upload(session_id)
+    storage.register_upload(upload_hash, extract_path)
 
     # Check if the extracted folder exists
     folder_to_be_summarized = extract_path
@@ -173,9 +917,18 @@ async def post_upload(background_tasks: BackgroundTasks, file: UploadFile = File
         raise HTTPException(status_code=400, detail=f"Extracted folder not found.")
 
     processing_status[session_id]["status"] = "queued"
+    write_session_manifest(session_id, {
+        "session_id": session_id,
+        "filename": file.filename,
+        "name": name,
+        "folder": folder_to_be_summarized,
+        "priority": priority,
+        "tier": tier,
+        "upload_sha256": upload_hash
+    })
     
     # Run summarization in background so the response returns immediately
-    background_tasks.add_task(summarizer, folder_to_be_summarized, name, session_id)
+    background_tasks.add_task(summarizer, folder_to_be_summarized, name, session_id, priority, tier)
     
     return {
         "message": "File uploaded, processing started.",
@@ -0,0 +1,298 @@
+import glob
+import os
+import shutil
+import threading
+import time
+import zipfile
+from typing import Callable, Dict, List, Optional, Set
+
+
+class QuotaExceededError(Exception):
+    """An upload does not fit in the per-session or global storage quota."""
+
+    def __init__(self, message: str, status_code: int = 413) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def directory_size(path: str) -> int:
+    """Total size in bytes of the files under ``path`` (0 if it does not exist)."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class StorageManager:
+    """
+    Disk lifecycle for session data under the upload, extract and output folders.
+
+    A background janitor deletes sessions idle for longer than the TTL and,
+    when the global quota is exceeded, evicts the least recently used
+    sessions until usage fits again. Uploads are checked against per-session
+    quotas before anything is extracted, and identical uploads share their
+    extracted files through hard links. Sessions reported active by
+    ``is_active`` are never evicted.
+    """
+
+    # Folders under the output folder that are not sessions
+    SHARED_OUTPUT_FOLDERS = {"zip", "cache", "queue"}
+    # Shared folders left out of the global quota: evicting sessions cannot shrink them
+    UNMETERED_OUTPUT_FOLDERS = {"cache", "queue"}
+
+    def start(self) -> None:
+        """Start the janitor thread (no-op if already running)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._janitor_loop, name="storage-janitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def sweep(self, needed_bytes: int = 0) -> List[str]:
+        """
+        Measure disk usage and evict sessions; returns the evicted session ids.
+
+        Removes inactive sessions idle for longer than the TTL, then the least
+        recently used inactive sessions while usage plus ``needed_bytes``
+        exceeds the global quota.
+        """
+        with self._sweep_lock:
+            now = time.time()
+            sessions = {
+                session_id: self.last_used(session_id)
+                for session_id in self.session_ids() if not self.is_active(session_id)
+            }
+            evicted = []
+            if self.ttl_seconds > 0:
+                for session_id, last_used in sessions.items():
+                    if now - last_used > self.ttl_seconds:
+                        self.delete_session(session_id)
+                        evicted.append(session_id)
+
+            usage = self._measure()
+            if self.max_bytes > 0 and usage + needed_bytes > self.max_bytes:
+                remaining = sorted(
+                    (last_used, session_id) for session_id, last_used in sessions.items() if session_id not in evicted
+                )
+                for _, session_id in remaining:
+                    if usage + needed_bytes <= self.max_bytes:
+                        break
+                    usage -= self.session_size(session_id)
+                    self.delete_session(session_id)
+                    evicted.append(session_id)
+                usage = self._measure()
+
+            if evicted:
+                print(f"Storage janitor evicted {len(evicted)} sessions; usage {usage} bytes")
+            return evicted
+
+    def reserve(self, nbytes: int) -> None:
+        """
+        Account for ``nbytes`` about to be written, evicting sessions if needed.
+
+        Raises:
+            QuotaExceededError: (507) If the global quota cannot make room
+        """
+        if self.max_bytes <= 0:
+            return
+        if nbytes > self.max_bytes:
+            raise QuotaExceededError("Upload is larger than the server storage quota.", status_code=507)
+        with self._lock:
+            fits = self._usage + nbytes <= self.max_bytes
+        if not fits:
+            self.sweep(nbytes)
+        with self._lock:
+            if self._usage + nbytes > self.max_bytes:
+                raise QuotaExceededError("Server storage is full; try again later.", status_code=507)
+            self._usage += nbytes
+
+    def check_zip(self, zip_ref: zipfile.ZipFile) -> int:
+        """
+        Check a ZIP against the per-session extraction limits before extracting.
+
+        Returns:
+            Total uncompressed size in bytes
+
+        Raises:
+            QuotaExceededError: If the archive has too many entries, expands
+                past SESSION_MAX_EXTRACTED_BYTES or looks like a ZIP bomb
+        """
+        entries = zip_ref.infolist()
+        if len(entries) > self.session_max_files:
+            raise QuotaExceededError(f"ZIP has more than {self.session_max_files} entries.")
+        total = sum(info.file_size for info in entries)
+        compressed = sum(info.compress_size for info in entries)
+        if total > self.session_max_extracted_bytes:
+            raise QuotaExceededError(f"ZIP expands to more than {self.session_max_extracted_bytes} bytes.")
+        if compressed and total / compressed > self.max_compression_ratio:
+            raise QuotaExceededError("ZIP compression ratio is too high.")
+        return total
+
+    def find_duplicate(self, content_hash: str) -> Optional[str]:
+        """Return the extracted folder of an earlier identical upload, if it still exists."""
+        with self._lock:
+            folder = self._uploads.get(content_hash)
+        if folder is not None and os.path.isdir(folder):
+            return folder
+        return None
+
+    def register_upload(self, content_hash: str, extract_path: str) -> None:
+        """Record the extracted folder of an upload for deduplication."""
+        with self._lock:
+            self._uploads[content_hash] = extract_path
+
+    def link_tree(self, source: str, destination: str) -> None:
+        """Copy a folder using hard links, falling back to copies across devices."""
+        def link_or_copy(src: str, dst: str) -> None:
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+        shutil.copytree(source, destination, copy_function=link_or_copy, dirs_exist_ok=True)
+
+    def session_ids(self) -> Set[str]:
+        """Ids of every session with data in any storage folder."""
+        ids: Set[str] = set()
+        for folder in (self.upload_dir, self.extract_dir, self.output_dir):
+            if os.path.isdir(folder):
+                ids.update(name for name in os.listdir(folder) if name not in self.SHARED_OUTPUT_FOLDERS)
+        for zip_path in glob.glob(os.path.join(self.zip_dir, "*.zip")):
+            # Zips are named "<session id>_<name>.zip"; session ids contain no "_"
+            ids.add(os.path.basename(zip_path).split("_", 1)[0])
+        return ids
+
+    def last_used(self, session_id: str) -> float:
+        """Most recent modification time of any of the session's folders or zips."""
+        times = [
+            os.path.getmtime(path) for path in self._session_paths(session_id) if os.path.exists(path)
+        ]
+        return max(times, default=0.0)
+
+    def touch(self, session_id: str) -> None:
+        """Mark a session as used now, postponing its TTL eviction."""
+        session_dir = os.path.join(self.output_dir, session_id)
+        if os.path.isdir(session_dir):
+            os.utime(session_dir)
+
+    def session_size(self, session_id: str) -> int:
+        total = 0
+        for path in self._session_paths(session_id):
+            total += os.path.getsize(path) if os.path.isfile(path) else directory_size(path)
+        return total
+
+    def delete_upload(self, session_id: str) -> None:
+        """Delete a session's uploaded archive once it has been extracted."""
+        self._remove(os.path.join(self.upload_dir, session_id))
+
+    def delete_extracted(self, session_id: str) -> None:
+        """Delete a session's extracted source files once its docs are written."""
+        self._remove(os.path.join(self.extract_dir, session_id))
+
+    def delete_session(self, session_id: str) -> None:
+        """Delete everything stored for a session."""
+        for path in self._session_paths(session_id):
+            self._remove(path)
+        with self._lock:
+            self._uploads = {h: folder for h, folder in self._uploads.items() if not self._in_session(folder, session_id)}
+        if self.on_evict is not None:
+            self.on_evict(session_id)
+
+    def _session_paths(self, session_id: str) -> List[str]:
+        return [
+            os.path.join(self.upload_dir, session_id),
+            os.path.join(self.extract_dir, session_id),
+            os.path.join(self.output_dir, session_id),
+        ] + glob.glob(os.path.join(self.zip_dir, f"{glob.escape(session_id)}_*.zip"))
+
+    def _in_session(self, folder: str, session_id: str) -> bool:
+        session_dir = os.path.join(self.extract_dir, session_id)
+        return folder == session_dir or folder.startswith(session_dir + os.sep)
+
+    def _remove(self, path: str) -> None:
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def _measure(self) -> int:
+        """Re-measure total usage of all storage folders, except the unmetered output folders."""
+        usage = directory_size(self.upload_dir) + directory_size(self.extract_dir)
+        if os.path.isdir(self.output_dir):
+            for name in os.listdir(self.output_dir):
+                if name in self.UNMETERED_OUTPUT_FOLDERS:
+                    continue
+                path = os.path.join(self.output_dir, name)
+                try:
+                    usage += os.lstat(path).st_size if os.path.isfile(path) else directory_size(path)
+                except OSError:
+                    continue
+        with self._lock:
+            self._usage = usage
+        return usage
+
+    def _janitor_loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Storage janitor failed: {e}")
+
+    def __init__(
+        self,
+        upload_dir: str,
+        extract_dir: str,
+        output_dir: str,
+        zip_dir: str,
+        is_active: Callable[[str], bool] = lambda session_id: False,
+        on_evict: Optional[Callable[[str], None]] = None
+    ) -> None:
+        """
+        Initialize the StorageManager.
+
+        Limits come from environment variables (sizes in bytes, 0 = unlimited
+        where noted):
+            STORAGE_MAX_BYTES: Global quota for all folders, except the summary
+                cache and work queue under the output folder (0 default)
+            SESSION_TTL_HOURS: Idle time before a session is deleted (72 default, 0 = never)
+            JANITOR_INTERVAL_SECONDS: Time between janitor sweeps (600 default)
+            SESSION_MAX_UPLOAD_BYTES: Largest accepted upload (200 MiB default)
+            SESSION_MAX_EXTRACTED_BYTES: Largest extracted size of one upload (1 GiB default)
+            SESSION_MAX_FILES: Most entries in one uploaded ZIP (50000 default)
+            ZIP_MAX_COMPRESSION_RATIO: Highest accepted uncompressed/compressed ratio (100 default)
+
+        Args:
+            upload_dir: Folder of uploaded archives, one sub-folder per session
+            extract_dir: Folder of extracted sources, one sub-folder per session
+            output_dir: Folder of generated docs, one sub-folder per session
+            zip_dir: Folder of zipped docs, named "<session id>_<name>.zip"
+            is_active: Returns True for sessions that must not be evicted
+            on_evict: Called with the id of every deleted session
+        """
+        self.upload_dir = upload_dir
+        self.extract_dir = extract_dir
+        self.output_dir = output_dir
+        self.zip_dir = zip_dir
+        self.is_active = is_active
+        self.on_evict = on_evict
+        self.max_bytes = int(os.getenv("STORAGE_MAX_BYTES", "0"))
+        self.ttl_seconds = float(os.getenv("SESSION_TTL_HOURS", "72")) * 3600
+        self.interval_seconds = float(os.getenv("JANITOR_INTERVAL_SECONDS", "600"))
+        self.session_max_upload_bytes = int(os.getenv("SESSION_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+        self.session_max_extracted_bytes = int(os.getenv("SESSION_MAX_EXTRACTED_BYTES", str(1024 * 1024 * 1024)))
+        self.session_max_files = int(os.getenv("SESSION_MAX_FILES", "50000"))
+        self.max_compression_ratio = float(os.getenv("ZIP_MAX_COMPRESSION_RATIO", "100"))
+        # Upload content hash -> extracted folder, for deduplication
+        self._uploads: Dict[str, str] = {}
+        self._usage = 0
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._measure()
@@ -1,16 +1,57 @@
 from file_explorer_cli import FileExplorer
 from dependency_generator import DependencyGenerator
-from openrouter_client import OpenRouterClient
+from analysis_records import FileAnalysis
 from docs_creator import DocsCreator
+from doc_renderers import RENDERERS, index_description
+from batching import estimate_tokens, pack_small_files, summarize_batch
+from scheduler import FairScheduler
+from checkpoint import Checkpoint
+from search_index import SearchIndex
+from project_summary import PROJECT_SUMMARY_PROMPT, ProjectAggregator
+from summary_cache import SummaryCache
+from work_queue import WorkQueue
+from adaptive_concurrency import AdaptiveLimiter, get_limiter
+from model_router import ModelRouter, Route, combine_features, file_features
     
+import json
 import time
 import shutil
 import os
+import threading
 import uuid
-from typing import Dict, Optional
+from concurrent.futures import CancelledError
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 
-#folder_to_summarize = "mini_project"  # Replace with the desired folder name
+# Completed files of a session, stored in the session folder
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+# Search index database, stored in the session folder next to the checkpoint
+SEARCH_INDEX_FILE = "index.sqlite"
+
+# Analysis tiers, from cheapest to most complete:
+#   structure - AST analysis only, no LLM requests
+#   entry     - LLM summaries for entry points and high fan-in modules only
+#   full      - LLM summaries for every file
+ANALYSIS_TIERS = ("structure", "entry", "full")
+
+# Summary written for files documented without an LLM request
+STRUCTURE_ONLY_SUMMARY = (
+    "*Structure-only documentation: no AI summary has been generated for this file yet. "
+    "Request one with `POST /deepen/{session_id}?path=<file or directory>`.*"
+)
+
+def default_summary_cache(base_dir: str) -> Optional[SummaryCache]:
+    """
+    Return the summary cache under ``base_dir``, or None if disabled.
+    
+    Controlled by SUMMARY_CACHE ("0" disables) and SUMMARY_CACHE_DIR
+    (defaults to ``<base_dir>/cache``).
+    """
+    if os.getenv("SUMMARY_CACHE", "1") == "0":
+        return None
+    return SummaryCache(os.getenv("SUMMARY_CACHE_DIR") or os.path.join(base_dir, "cache"))
+
 
 class Summarize:
     """
@@ -23,6 +64,12 @@ class Summarize:
     # Class-level reference to processing_status dict (set by server)
     processing_status: Optional[Dict] = None
     
+    # Approximate system prompt size charged to every LLM request when scheduling
+    REQUEST_OVERHEAD_TOKENS = 500
+    
+    # Files per work unit for structure-only files (no LLM request)
+    STRUCTURE_UNIT_FILES = 50
+    
     def summarize(self) -> None:
         """
         Process all files in the project and generate documentation.
@@ -33,50 +80,636 @@ class Summarize:
         3. Generate AI summary of the code
         4. Create Markdown and JSON documentation
         """
+        self.run(self.plan())
+    
+    def plan(self) -> List[List[str]]:
+        """
+        Read and analyze the project and return the work units still to process.
+        
+        Files a previous run already finished are recorded as completed
+        instead, and the outputs of files deleted since are removed.
+        """
         print(f"Beginning summarization (session: {self.session_id})...")
+        self._load_project()
         
-        # Read all project files
-        all_files: Dict[str, str] = self.File.readFiles()
-        client = OpenRouterClient()
-        dependency_gen = DependencyGenerator()
-        docs_creator = DocsCreator()
+        # Drop the outputs of files deleted since an earlier run
+        removed_files = [file_path for file_path in self.checkpoint.completed() if file_path not in self.project_files]
+        if self.changed_files is not None:
+            self._refresh = self._with_dependents(self.changed_files, removed_files)
+            self.scope = sorted(self._refresh)
+            print(f"Incremental update: {len(self.changed_files)} changed, {len(removed_files)} removed, {len(self._refresh)} to refresh.")
+        for file_path in removed_files:
+            self._remove_outputs(file_path)
         
-        no_of_files = len(all_files)
-        print(f"Found {no_of_files} files to process.")
+        print(f"Found {self._total_files} files to process ({len(self._llm_files)} with AI summaries, tier: {self.tier}).")
+        
+        # Skip files a previous (interrupted or shallower) run already finished
+        pending_files = {}
+        for file_path, content in self.project_files.items():
+            in_scope = self._in_scope(file_path)
+            if file_path not in self._refresh and self.checkpoint.is_done(
+                file_path, content, summarized=in_scope and file_path in self._llm_files
+            ):
+                self._record_completed(file_path, self._read_json(file_path))
+                self._mark_file_completed(file_path)
+            elif in_scope:
+                pending_files[file_path] = content
+        self._total_files = len(self._index_entries) + len(pending_files)
+        self._started_files = self._total_files - len(pending_files)
+        if self._started_files:
+            print(f"Resuming: {self._started_files} files already completed.")
         
         # Update progress tracking
-        self._update_progress(0, no_of_files, "Starting...")
-        
-        for index, (file_path, content) in enumerate(all_files.items(), start=1):
-            print(f"Processing {index}/{no_of_files}: {file_path}")
-            self._update_progress(index, no_of_files, file_path)
-            
-            # Generate code analysis with cross-library function details
-            out = dependency_gen.summarize_file(content, project_files=all_files)
-            out['file_name'] = file_path
-            
-            # Generate AI summary with retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    out["summary"] = client.summarize(content)
-                    break
-                except Exception as e:
-                    print(f"Error on attempt {attempt + 1}: {e}")
-                    if attempt < max_retries - 1:
-                        print("Retrying...")
-                        time.sleep(5)
-                    else:
-                        out["summary"] = f"Error generating summary: {e}"
-
-            # Create safe filename for output (replace / with _)
-            safe_filename = file_path.replace('/', '_').replace('\\', '_')
-            
-            # Generate documentation
-            docs_creator.json_to_markdown(out, f"{self.output_folder}/md/{safe_filename}.md")
-            self.File.write_to_json(content=out, output_file=f"{self.output_folder}/json/{safe_filename}")
-            
-            print(f"Completed {index}/{no_of_files}: {file_path}")
+        self._update_progress(self._started_files, self._total_files, "Starting...")
+        return self._plan_units(pending_files)
+    
+    def run(self, units: List[List[str]]) -> None:
+        """Process the work units returned by plan(), then write the project-wide outputs."""
+        self._run_units(units)
+        if self.cancelled:
+            print(f"Summarization cancelled (session: {self.session_id})")
+            return
+        self._finalize()
+    
+    def enqueue(self, work_queue: WorkQueue, units: List[List[str]], **options) -> str:
+        """
+        Submit the work units returned by plan() to a shared WorkQueue.
+        
+        Worker processes (see worker.py) rebuild this job from the queued
+        options, process the units and finalize the job.
+        
+        Args:
+            work_queue: Queue shared with the workers
+            units: Work units from plan()
+            **options: Extra JSON-serializable settings for the workers
+        
+        Returns:
+            The queued job id
+        """
+        options.update(
+            folder_to_summarize=self.folder_to_summarize,
+            output_folder=self.output_folder_name,
+            output_base_dir=self.output_base_dir,
+            provider=self.provider,
+            stream=self.stream,
+            formats=self.formats,
+            tier=self.tier
+        )
+        return work_queue.submit(
+            self.session_id,
+            [(unit, self._unit_cost(unit)) for unit in units],
+            options,
+            priority=self.priority,
+            total_files=self._total_files,
+            done_files=self._started_files
+        )
+    
+    def run_unit(self, unit: List[str]) -> None:
+        """Process one work unit claimed from a WorkQueue, reading the project on first use."""
+        with self._load_lock:
+            if not self._loaded:
+                self._load_project()
+        self._process_unit(unit)
+    
+    def finalize_completed(self) -> None:
+        """
+        Write the project-wide outputs from the per-file outputs on disk.
+        
+        Used to finalize a queued job, whose files were documented by
+        several worker processes.
+        """
+        self._load_project()
+        completed = self.checkpoint.completed()
+        for file_path in self.project_files:
+            if file_path in completed:
+                self._record_completed(file_path, self._read_json(file_path))
+        self._finalize()
+    
+    def _load_project(self) -> None:
+        """Read all project files and build the project-wide analysis state."""
+        self.project_files: Dict[str, str] = self.File.readFiles()
+        self.client = self._create_client()
+        self.dependency_gen = DependencyGenerator()
+        self.docs_creator = DocsCreator()
+        # Compact per-file analysis records, kept for the whole run
+        self.analyses: Dict[str, FileAnalysis] = {}
+        # Reverse "used by" references for the whole project, built in one pass
+        self.reference_index = self.dependency_gen.build_reference_index(self.project_files)
+        # Files that get an LLM summary at this tier
+        self._llm_files = self._select_llm_files()
+        self._total_files = len(self.project_files)
+        self._started_files = 0
+        self._completed_files = 0
+        self._loaded = True
+    
+    def _run_units(self, units: List[List[str]]) -> None:
+        """Process work units sequentially, or through the shared scheduler if set."""
+        if self.scheduler is None:
+            for unit in units:
+                self._resumed.wait()
+                if self.cancelled:
+                    return
+                self._process_unit(unit)
+            return
+        
+        # Interleave this session's units with other sessions' work
+        self.scheduler.register(self.session_id, weight=self.priority)
+        if not self._resumed.is_set():
+            self.scheduler.pause(self.session_id)
+        try:
+            if not self.cancelled:
+                self.scheduler.run(self.session_id, [
+                    (self._process_unit, (unit,), self._unit_cost(unit)) for unit in units
+                ])
+        except CancelledError:
+            if not self.cancelled:
+                raise
+        finally:
+            self.scheduler.unregister(self.session_id)
+    
+    def _finalize(self) -> None:
+        """
+        Write the project-wide outputs once every file is documented.
+        
+        Uses the aggregates collected as files completed: the site index of
+        each extra output format, index.md (the Markdown index),
+        project_summary.md and project_summary.json.
+        The optional LLM overview summarizes the per-file summaries, not code;
+        directories whose summaries did not change since the previous
+        project_summary.json keep their overview without a new request.
+        """
+        entries = [
+            (file_path, self._index_entries[file_path])
+            for file_path in self.project_files if file_path in self._index_entries
+        ]
+        self.docs_creator.write_site_index(entries, self.output_folder, self.formats)
+        
+        summary_path = os.path.join(self.output_folder, "project_summary.json")
+        overviews: Dict[str, str] = {}
+        if self.project_summary_llm and self.tier != "structure":
+            overviews = self.aggregator.summarize_hierarchy(
+                lambda query: self._llm(
+                    self.client.summarize, query, system_prompt=PROJECT_SUMMARY_PROMPT, tokens=estimate_tokens(query)
+                ),
+                max_depth=self.project_summary_max_depth,
+                previous=self._previous_overviews(summary_path)
+            )
+        
+        self.docs_creator.write_text(
+            os.path.join(self.output_folder, "index.md"),
+            self.aggregator.render_index(lambda file_path: f"md/{self._safe_filename(file_path)}.md")
+        )
+        self.docs_creator.write_text(
+            os.path.join(self.output_folder, "project_summary.md"),
+            self.aggregator.render_summary(overviews)
+        )
+        summary_data = self.aggregator.to_dict()
+        summary_data["overviews"] = overviews
+        summary_data["overview_inputs"] = self.aggregator.overview_inputs
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary_data, f, indent=2)
+    
+    def _previous_overviews(self, summary_path: str) -> Dict[str, Tuple[str, str]]:
+        """(request digest, overview) per directory from an earlier project_summary.json."""
+        try:
+            with open(summary_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        overviews = data.get("overviews", {})
+        return {
+            directory: (digest, overviews[directory])
+            for directory, digest in data.get("overview_inputs", {}).items() if directory in overviews
+        }
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def pause(self) -> None:
+        """Stop starting new files; files already in progress finish normally."""
+        self._resumed.clear()
+        if self.scheduler is not None:
+            self.scheduler.pause(self.session_id)
+    
+    def resume(self) -> None:
+        """Continue a paused job."""
+        self._resumed.set()
+        if self.scheduler is not None:
+            self.scheduler.resume(self.session_id)
+    
+    def cancel(self) -> None:
+        """
+        Stop the job; files already in progress finish normally.
+        
+        Completed files stay recorded in the checkpoint, so a later run with
+        the same session skips them.
+        """
+        self._cancelled.set()
+        # Wake a paused sequential loop so it can observe the cancellation
+        self._resumed.set()
+        if self.scheduler is not None:
+            self.scheduler.cancel(self.session_id)
+    
+    def _select_llm_files(self) -> Set[str]:
+        """
+        Return the files that get an LLM summary at the configured tier.
+        
+        The "entry" tier selects entry points (see
+        DependencyGenerator.is_entry_point) and modules used by at least
+        ENTRY_TIER_MIN_FAN_IN other files.
+        """
+        if self.tier == "full":
+            return set(self.project_files)
+        if self.tier == "structure":
+            return set()
+        selected = set()
+        for file_path, content in self.project_files.items():
+            if self._fan_in(file_path) >= self.entry_min_fan_in or self.dependency_gen.is_entry_point(file_path, content):
+                selected.add(file_path)
+        return selected
+    
+    def _fan_in(self, file_path: str) -> int:
+        """Number of distinct project files that use this file."""
+        return len({user for users in self.reference_index.get(file_path, {}).values() for user in users})
+    
+    def _llm_priority(self, file_path: str) -> int:
+        """
+        Rank of a file for the LLM pass: complex and widely used files first.
+        
+        (1 + cyclomatic complexity) * (1 + fan-in), from the metrics pass.
+        """
+        metrics = self._analysis(file_path).metrics
+        complexity = metrics.complexity if metrics is not None else 0
+        return (1 + complexity) * (1 + self._fan_in(file_path))
+    
+    def _with_dependents(self, changed_files: List[str], removed_files: List[str]) -> Set[str]:
+        """
+        Return the changed files plus every file whose documentation they affect.
+        
+        That is the files that use a changed or removed file (their import
+        details change) and the files a changed file uses now or used before
+        (their "Used by" lists change). Unchanged files among them get their
+        summaries from the summary cache, so refreshing them is cheap.
+        """
+        changed = {file_path for file_path in changed_files if file_path in self.project_files}
+        refresh = set(changed)
+        for file_path in changed:
+            for users in self.reference_index.get(file_path, {}).values():
+                refresh.update(users)
+        for target, symbols in self.reference_index.items():
+            if any(user in changed for users in symbols.values() for user in users):
+                refresh.add(target)
+        # Relations recorded by the previous run, from the search index
+        refresh.update(self.search_index.files_used_by(sorted(changed)))
+        for file_path in removed_files:
+            for users in self.search_index.used_by(file_path).values():
+                refresh.update(users)
+        return {file_path for file_path in refresh if file_path in self.project_files}
+    
+    def _remove_outputs(self, file_path: str) -> None:
+        """Delete every output of a file that no longer exists in the project."""
+        self.docs_creator.remove_document(file_path, self.output_folder, self.formats)
+        json_path = f"{self.output_folder}/json/{self._safe_filename(file_path)}.json"
+        if os.path.exists(json_path):
+            os.remove(json_path)
+        self.search_index.remove_document(file_path)
+        self.checkpoint.mark_removed(file_path)
+    
+    def _in_scope(self, file_path: str) -> bool:
+        """True if the file is one of the scope paths or inside a scope directory."""
+        if self.scope is None:
+            return True
+        return any(
+            not path or file_path == path or file_path.startswith(path + "/")
+            for path in self.scope
+        )
+    
+    def _plan_units(self, files: Dict[str, str]) -> List[List[str]]:
+        """
+        Split the project into work units of one or more files.
+        
+        Files without an LLM summary at this tier come first, in chunks of
+        STRUCTURE_UNIT_FILES, so structural docs for the whole project are
+        available quickly. Small files are packed into a single LLM request
+        when batching is enabled (LLM_BATCH_TOKENS > 0); every other file is
+        its own unit. LLM units are ordered by _llm_priority, highest first.
+        """
+        structure_files = [file_path for file_path in files if file_path not in self._llm_files]
+        units = [
+            structure_files[i:i + self.STRUCTURE_UNIT_FILES]
+            for i in range(0, len(structure_files), self.STRUCTURE_UNIT_FILES)
+        ]
+        llm_files = {file_path: content for file_path, content in files.items() if file_path in self._llm_files}
+        if self.batch_tokens <= 0:
+            llm_units = [[file_path] for file_path in llm_files]
+        else:
+            llm_units = pack_small_files(
+                llm_files,
+                budget_tokens=self.batch_tokens,
+                max_file_tokens=self.batch_max_file_tokens,
+                max_files=self.batch_max_files
+            )
+        priority = {file_path: self._llm_priority(file_path) for file_path in llm_files}
+        llm_units.sort(key=lambda unit: -max(priority[file_path] for file_path in unit))
+        return units + llm_units
+    
+    def _unit_cost(self, unit: List[str]) -> float:
+        """Scheduling cost of a unit: estimated tokens plus a per-request overhead."""
+        if unit[0] not in self._llm_files:
+            # No LLM request; charge a nominal cost per file
+            return len(unit)
+        return sum(estimate_tokens(self.project_files[file_path]) for file_path in unit) + self.REQUEST_OVERHEAD_TOKENS
+    
+    def _process_unit(self, unit: List[str]) -> None:
+        """Analyze, summarize and document every file of a work unit."""
+        if unit[0] not in self._llm_files:
+            self._process_structure(unit)
+        elif len(unit) == 1:
+            self._process_file(unit[0])
+        else:
+            self._process_batch(unit)
+    
+    def _process_structure(self, file_paths: List[str]) -> None:
+        """Document files from their code structure alone, without LLM requests."""
+        for file_path in file_paths:
+            self._start_file(file_path)
+            out = self._analyze(file_path)
+            out["summary"] = self._structure_summary
+            self._write_json(file_path, out)
+            self._complete_file(file_path, out)
+    
+    def _process_file(self, file_path: str) -> None:
+        """Document a single file with its own LLM request."""
+        index = self._start_file(file_path)
+        out = self._analyze(file_path)
+        streamed = self._summarize_file(self.project_files[file_path], out, self._md_path(file_path))
+        self._write_json(file_path, out)
+        self._complete_file(file_path, out, markdown_written=streamed)
+        print(f"Completed {index}/{self._total_files}: {file_path}")
+    
+    def _process_batch(self, file_paths: List[str]) -> None:
+        """
+        Document several small files with a single LLM request.
+        
+        Files the model leaves out of the structured response are summarized
+        individually instead.
+        """
+        for file_path in file_paths:
+            self._start_file(file_path)
+        outputs = {file_path: self._analyze(file_path) for file_path in file_paths}
+        
+        summaries: Dict[str, str] = {}
+        for file_path in file_paths:
+            cached = self._cached_summary(self.project_files[file_path], self._routes([file_path]), batch=True)
+            if cached is not None:
+                summaries[file_path] = cached
+        uncached = {
+            file_path: self.project_files[file_path] for file_path in file_paths if file_path not in summaries
+        }
+        if uncached:
+            try:
+                route = self._routes(list(uncached))[0]
+                batch_tokens = sum(estimate_tokens(content) for content in uncached.values())
+                response = self._llm(
+                    summarize_batch, self.router.client(route), uncached, tokens=batch_tokens, route=route
+                )
+                self._count_route(route)
+                for file_path, summary in response.items():
+                    summaries[file_path] = summary
+                    # Under the batch's route, which produced the summary
+                    self._cache_summary(uncached[file_path], summary, route, batch=True)
+            except Exception as e:
+                print(f"Batch request failed, falling back to single-file requests: {e}")
+        
+        for file_path, out in outputs.items():
+            streamed = False
+            if file_path in summaries:
+                out["summary"] = summaries[file_path]
+            else:
+                streamed = self._summarize_file(self.project_files[file_path], out, self._md_path(file_path))
+            self._write_json(file_path, out)
+            self._complete_file(file_path, out, markdown_written=streamed)
+            print(f"Completed {file_path} (batch of {len(file_paths)})")
+    
+    def _start_file(self, file_path: str) -> int:
+        """Count a file as started and report progress; returns its 1-based index."""
+        with self._progress_lock:
+            self._started_files += 1
+            index = self._started_files
+        print(f"Processing {index}/{self._total_files}: {file_path}")
+        self._update_progress(index, self._total_files, file_path)
+        return index
+    
+    def _analyze(self, file_path: str) -> Dict:
+        """
+        Generate code analysis with cross-library function details.
+        
+        The compact FileAnalysis record stays resident in self.analyses; the
+        returned dict is the (transient) JSON document for this file.
+        """
+        out = self._analysis(file_path).to_dict()
+        out['file_name'] = file_path
+        out['used_by'] = self.reference_index.get(file_path, {})
+        return out
+    
+    def _analysis(self, file_path: str) -> FileAnalysis:
+        """Return the file's FileAnalysis, analyzing it on first use."""
+        analysis = self.analyses.get(file_path)
+        if analysis is None:
+            analysis = self.dependency_gen.analyze_file(self.project_files[file_path], project_files=self.project_files)
+            self.analyses[file_path] = analysis
+        return analysis
+    
+    def _safe_filename(self, file_path: str) -> str:
+        return DocsCreator.safe_filename(file_path)
+    
+    def _md_path(self, file_path: str) -> str:
+        return f"{self.output_folder}/md/{self._safe_filename(file_path)}.md"
+    
+    def _write_json(self, file_path: str, out: Dict) -> None:
+        output_file = f"{self.output_folder}/json/{self._safe_filename(file_path)}"
+        # write_to_json appends; drop output left behind by an interrupted run
+        if os.path.exists(f"{output_file}.json"):
+            os.remove(f"{output_file}.json")
+        self.File.write_to_json(content=out, output_file=output_file)
+    
+    def _record_completed(self, file_path: str, out: Dict) -> None:
+        """Fold a completed file into the index entries and project aggregates."""
+        if out.get("summary") == self._structure_summary:
+            # Describe structure-only files by their docstring, not the placeholder
+            out = dict(out, summary=out.get("docstrings", {}).get("module") or "")
+        description = index_description(out.get("summary"))
+        self._index_entries[file_path] = description
+        self.aggregator.add(file_path, out, self.File.detect_language(file_path), description)
+    
+    def _read_json(self, file_path: str) -> Dict:
+        """Load a file's JSON output written by this or an earlier run."""
+        try:
+            with open(f"{self.output_folder}/json/{self._safe_filename(file_path)}.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _complete_file(self, file_path: str, out: Dict, markdown_written: bool = False) -> None:
+        """
+        Render, index and checkpoint a file whose JSON output is written, and report it as completed.
+        
+        Every output format is rendered from one DocumentView of ``out``;
+        Markdown is skipped when it was already streamed to disk.
+        """
+        formats = self.extra_formats if markdown_written else self.formats
+        if formats:
+            self.docs_creator.render_document(out, self.output_folder, formats)
+        self._record_completed(file_path, out)
+        self.search_index.add_document(file_path, out)
+        self.checkpoint.mark_done(file_path, self.project_files[file_path], summarized=file_path in self._llm_files)
+        self._mark_file_completed(file_path)
+    
+    def _summarize_file(self, content: str, out: Dict, md_path: str) -> bool:
+        """
+        Generate the AI summary for a file into ``out["summary"]``.
+        
+        When streaming is enabled and the client supports it, the summary is
+        written to the Markdown file as it arrives and the partial text is
+        published in the session status. Failed attempts are retried; after
+        the last failure the error is recorded as the summary.
+        
+        Returns:
+            True if the Markdown document was written while streaming
+        """
+        routes = self._routes([out["file_name"]])
+        cached = self._cached_summary(content, routes)
+        if cached is not None:
+            out["summary"] = cached
+            return False
+        
+        tokens = estimate_tokens(content)
+        # Failed attempts move down the route chain, then retry its last route
+        max_retries = max(3, len(routes))
+        for attempt in range(max_retries):
+            route = routes[min(attempt, len(routes) - 1)]
+            client = self.router.client(route)
+            use_stream = self.stream and hasattr(client, "summarize_stream")
+            try:
+                if use_stream:
+                    out["summary"] = self.docs_creator.stream_to_markdown(
+                        out,
+                        self._llm_stream(lambda: client.summarize_stream(content), tokens, route=route),
+                        md_path,
+                        on_update=lambda text: self._update_partial(out["file_name"], text)
+                    )
+                    self._count_route(route)
+                    self._cache_summary(content, out["summary"], route)
+                    return True
+                out["summary"] = self._llm(client.summarize, content, tokens=tokens, route=route)
+                self._count_route(route)
+                self._cache_summary(content, out["summary"], route)
+                break
+            except Exception as e:
+                print(f"Error on attempt {attempt + 1} ({route.name}): {e}")
+                if attempt + 1 < len(routes):
+                    print(f"Falling back to route '{routes[attempt + 1].name}'...")
+                elif attempt < max_retries - 1:
+                    print("Retrying...")
+                    time.sleep(5)
+                else:
+                    out["summary"] = f"Error generating summary: {e}"
+        return False
+    
+    def _llm(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        tokens: int = 0,
+        route: Optional[Route] = None,
+        **kwargs: Any
+    ) -> Any:
+        """Make an LLM request, under its provider's adaptive concurrency limit if enabled."""
+        limiter = self._limiter(route)
+        if limiter is None:
+            return fn(*args, **kwargs)
+        return limiter.call(fn, *args, tokens=tokens, **kwargs)
+    
+    def _llm_stream(
+        self,
+        make_stream: Callable[[], Iterable[str]],
+        tokens: int = 0,
+        route: Optional[Route] = None
+    ) -> Iterable[str]:
+        """Streaming counterpart of _llm()."""
+        limiter = self._limiter(route)
+        if limiter is None:
+            return make_stream()
+        return limiter.stream(make_stream, tokens=tokens)
+    
+    def _limiter(self, route: Optional[Route]) -> Optional[AdaptiveLimiter]:
+        """Limiter of the route's provider, remembered for the session status."""
+        if route is None:
+            return self.limiter
+        limiter = get_limiter(route.provider)
+        if limiter is not None:
+            with self._progress_lock:
+                self.limiters.setdefault(route.provider, limiter)
+        return limiter
+    
+    def _routes(self, file_paths: List[str]) -> List[Route]:
+        """Route chain for a request covering ``file_paths``, from their metrics."""
+        return self.router.routes(combine_features([
+            file_features(self._analysis(file_path), self.project_files[file_path], self._fan_in(file_path))
+            for file_path in file_paths
+        ]))
+    
+    def _count_route(self, route: Route) -> None:
+        """Count a request answered through ``route``, for the session status."""
+        with self._progress_lock:
+            self.route_counts[route.name] = self.route_counts.get(route.name, 0) + 1
+            counts = dict(self.route_counts)
+        if self.processing_status is not None and self.session_id in self.processing_status:
+            self.processing_status[self.session_id]["model_routes"] = counts
+        self._update_concurrency()
+    
+    def _cached_summary(self, content: str, routes: List[Route], batch: bool = False) -> Optional[str]:
+        """
+        Return the cached summary of identical file contents from any route of the chain, in order.
+        
+        With ``batch``, summaries from batch prompts are accepted as well as
+        single-file ones; single-file lookups never return a batch summary.
+        """
+        if self.summary_cache is None:
+            return None
+        for route in routes:
+            namespaces = [route.cache_key, f"{route.cache_key}:batch"] if batch else [route.cache_key]
+            for namespace in namespaces:
+                summary = self.summary_cache.get(namespace, content)
+                if summary is not None:
+                    return summary
+        return None
+    
+    def _cache_summary(self, content: str, summary: str, route: Route, batch: bool = False) -> None:
+        """Cache a summary under the route that produced it, apart from single-file ones if ``batch``."""
+        if self.summary_cache is not None and summary:
+            namespace = f"{route.cache_key}:batch" if batch else route.cache_key
+            self.summary_cache.put(namespace, content, summary)
+    
+    def _update_partial(self, file_path: str, summary: str) -> None:
+        """Publish the partially generated summary of a file still being streamed."""
+        if self.processing_status is not None and self.session_id in self.processing_status:
+            self.processing_status[self.session_id].setdefault("partial", {})[file_path] = summary
+    
+    def _mark_file_completed(self, file_path: str) -> None:
+        """Count a file whose documentation is fully written (listed by the checkpoint)."""
+        with self._progress_lock:
+            self._completed_files += 1
+            completed = self._completed_files
+        if self.processing_status is not None and self.session_id in self.processing_status:
+            status = self.processing_status[self.session_id]
+            status.get("progress", {})["completed"] = completed
+            status.get("partial", {}).pop(file_path, None)
+    
+    def _create_client(self):
+        """Create the LLM client for the configured provider's default model."""
+        return self.router.client(self.router.default_route)
     
     def _update_progress(self, current: int, total: int, current_file: str) -> None:
         """Update progress in the shared processing_status dict."""
@@ -85,8 +718,19 @@ class Summarize:
                 "current": current,
                 "total": total,
                 "current_file": current_file,
+                "completed": self._completed_files,
                 "percentage": round((current / total) * 100) if total > 0 else 0
             }
+            self._update_concurrency()
+    
+    def _update_concurrency(self) -> None:
+        """Publish the adaptive limit of every provider used, in the shared processing_status dict."""
+        with self._progress_lock:
+            limiters = dict(self.limiters)
+        if limiters and self.processing_status is not None and self.session_id in self.processing_status:
+            self.processing_status[self.session_id]["llm_concurrency"] = {
+                provider: limiter.stats() for provider, limiter in limiters.items()
+            }
              
     def __init__(
         self, 
@@ -94,7 +738,16 @@ class Summarize:
         output_folder: str, 
         session_id: Optional[str] = None,
         processing_status: Optional[Dict] = None,
-        output_base_dir: Optional[str] = None
+        output_base_dir: Optional[str] = None,
+        provider: Optional[str] = None,
+        stream: Optional[bool] = None,
+        scheduler: Optional[FairScheduler] = None,
+        priority: int = 1,
+        formats: Optional[List[str]] = None,
+        tier: Optional[str] = None,
+        scope: Optional[List[str]] = None,
+        summary_cache: Optional[SummaryCache] = None,
+        changed_files: Optional[List[str]] = None
     ) -> None:
         """
         Initialize the Summarize class.
@@ -105,26 +758,104 @@ class Summarize:
             session_id: Optional unique session identifier for multi-user support
             processing_status: Optional reference to shared status dict for progress updates
             output_base_dir: Optional base directory for output files
+            provider: LLM provider name; defaults to the LLM_PROVIDER
+                environment variable, then "openrouter"
+            stream: Write summaries progressively as the provider streams them;
+                defaults to the LLM_STREAM environment variable (on unless "0")
+            scheduler: Optional shared scheduler that interleaves this session's
+                work units with other sessions; files run sequentially without one
+            priority: Fair-share weight of this session in the scheduler
+            formats: Output formats (see doc_renderers.RENDERERS); defaults to
+                the comma-separated DOCS_OUTPUT_FORMATS environment variable.
+                Markdown is always included.
+            tier: Analysis tier, one of ANALYSIS_TIERS; defaults to the
+                DOCS_ANALYSIS_TIER environment variable, then "full"
+            scope: Optional relative file or directory paths; only these are
+                (re)processed, while files outside keep their existing docs
+            summary_cache: Optional shared cache of AI summaries by file
+                contents; defaults to default_summary_cache(output base dir)
+            changed_files: Optional relative paths changed since the last run
+                of this session (e.g. from a git diff); only these and the
+                files whose documentation they affect are reprocessed
         """
         self.session_id = session_id or str(uuid.uuid4())
+        self.folder_to_summarize = folder_to_summarize
+        self.output_folder_name = output_folder
+        self.provider = (provider or os.getenv("LLM_PROVIDER") or "openrouter").lower()
+        self.stream = stream if stream is not None else os.getenv("LLM_STREAM", "1") != "0"
+        self.tier = (tier or os.getenv("DOCS_ANALYSIS_TIER") or "full").lower()
+        if self.tier not in ANALYSIS_TIERS:
+            raise ValueError(f"Unknown analysis tier '{self.tier}'. Expected one of: {', '.join(ANALYSIS_TIERS)}")
+        # Minimum number of distinct user files for a module to count as high fan-in
+        self.entry_min_fan_in = int(os.getenv("ENTRY_TIER_MIN_FAN_IN", "3"))
+        # "" (or ".") in the scope stands for the whole project
+        self.scope = [path.strip("/").replace("\\", "/") if path != "." else "" for path in scope] if scope else None
+        self._structure_summary = STRUCTURE_ONLY_SUMMARY.format(session_id=self.session_id)
+        self.changed_files = changed_files
+        # Files reprocessed even though their checkpoint entry is current
+        self._refresh: Set[str] = set()
+        # Small-file batching: token budget per request (0 disables batching),
+        # largest file eligible for a batch, and maximum files per batch
+        self.batch_tokens = int(os.getenv("LLM_BATCH_TOKENS", "3000"))
+        self.batch_max_file_tokens = int(os.getenv("LLM_BATCH_MAX_FILE_TOKENS", "400"))
+        self.batch_max_files = int(os.getenv("LLM_BATCH_MAX_FILES", "10"))
+        # Output formats; Markdown is always written (and streamed)
+        requested = [fmt.strip() for fmt in (formats or os.getenv("DOCS_OUTPUT_FORMATS", "md").split(",")) if fmt.strip()]
+        for fmt in requested:
+            if fmt not in RENDERERS:
+                raise ValueError(f"Unknown output format '{fmt}'. Expected one of: {', '.join(RENDERERS)}")
+        self.formats = ["md"] + [fmt for fmt in requested if fmt != "md"]
+        self.extra_formats = self.formats[1:]
+        # Short description per completed file, for the site index
+        self._index_entries: Dict[str, str] = {}
+        # Project-level aggregates, updated as files complete
+        self.aggregator = ProjectAggregator()
+        # Hierarchical LLM overview built from the per-file summaries
+        self.project_summary_llm = os.getenv("PROJECT_SUMMARY_LLM", "1") != "0"
+        self.project_summary_max_depth = int(os.getenv("PROJECT_SUMMARY_MAX_DEPTH", "2"))
         self.processing_status = processing_status
+        self.scheduler = scheduler
+        self.priority = priority
+        self._progress_lock = threading.Lock()
+        # Set once the project files are read (see _load_project)
+        self._loaded = False
+        self._load_lock = threading.Lock()
         
         # Use provided base dir or default to cwd/output
         base_dir = output_base_dir or os.path.join(os.getcwd(), "output")
+        self.output_base_dir = base_dir
         # Use session_id in path for multi-session isolation
-        self.output_folder = os.path.join(base_dir, self.session_id, output_folder)
+        self.session_dir = os.path.join(base_dir, self.session_id)
+        self.summary_cache = summary_cache if summary_cache is not None else default_summary_cache(base_dir)
+        # Adaptive (AIMD) limit on in-flight LLM requests, shared per provider
+        self.limiter = get_limiter(self.provider)
+        # Limiters of every provider this session sent requests to
+        self.limiters: Dict[str, AdaptiveLimiter] = {} if self.limiter is None else {self.provider: self.limiter}
+        # Per-file model choice, and requests answered per route
+        self.router = ModelRouter(self.provider)
+        self.route_counts: Dict[str, int] = {}
+        self.output_folder = os.path.join(self.session_dir, output_folder)
+        # Kept next to (not inside) the output folder so it is not zipped
+        self.checkpoint = Checkpoint(os.path.join(self.session_dir, CHECKPOINT_FILE))
+        # Search index, filled incrementally as files complete
+        self.search_index = SearchIndex(os.path.join(self.session_dir, SEARCH_INDEX_FILE))
+        
+        # Job control: cleared _resumed means paused
+        self._cancelled = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
         
         os.makedirs(self.output_folder, exist_ok=True)
         os.makedirs(f"{self.output_folder}/md", exist_ok=True)
         os.makedirs(f"{self.output_folder}/json", exist_ok=True)
         
+        # Its scratch file goes to the session folder, never into the project
         self.File = FileExplorer(
             root_dir=folder_to_summarize,
-            ignore_folders={"venv", "__pycache__", "node_modules", ".git"}
+            ignore_folders={"venv", "__pycache__", "node_modules", ".git"},
+            output_dir=self.session_dir
         )
         
         print(f"Initialized Summarize for: {folder_to_summarize}")
         print(f"Output folder: {self.output_folder}")
         print(f"Session ID: {self.session_id}")
-        
-#Summarize('mini_project').summarize()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+
+class SummaryCache:
+    """
+    Content-addressed cache of AI summaries.
+
+    A summary is keyed by the SHA-256 of the provider name and the file
+    contents, so an unchanged file is never sent to the same provider twice,
+    whichever session or endpoint asks for it. Entries are kept on disk (one
+    file per summary, written atomically) with a small in-memory LRU in front.
+    Thread-safe.
+    """
+
+    @staticmethod
+    def key(provider: str, content: str) -> str:
+        """Return the cache key of a file's contents for a provider."""
+        digest = hashlib.sha256(provider.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(content.encode("utf-8", errors="surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, provider: str, content: str) -> Optional[str]:
+        """Return the cached summary, or None on a miss."""
+        key = self.key(provider, content)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                summary = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, summary)
+        return summary
+
+    def put(self, provider: str, content: str, summary: str) -> None:
+        """Store a summary for a file's contents."""
+        key = self.key(provider, content)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a unique temporary file and rename, so readers never see a partial entry
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(summary)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._remember(key, summary)
+
+    def _remember(self, key: str, summary: str) -> None:
+        """Add an entry to the in-memory LRU (caller holds the lock)."""
+        self._memory[key] = summary
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.md")
+
+    def __init__(self, cache_dir: str, max_memory_entries: Optional[int] = None) -> None:
+        """
+        Initialize the SummaryCache.
+
+        Args:
+            cache_dir: Directory holding the cached summaries (created on first write)
+            max_memory_entries: Summaries kept in memory; defaults to the
+                SUMMARY_CACHE_MEMORY_ENTRIES environment variable, then 1024
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_entries = (
+            max_memory_entries if max_memory_entries is not None
+            else int(os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", "1024"))
+        )
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
@@ -0,0 +1,70 @@
+from adaptive_concurrency import AdaptiveLimiter
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FakeClock:
+    """Time that only moves when the test advances it."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def make_limiter(initial):
+    clock = FakeClock()
+    return AdaptiveLimiter(initial=initial, min_limit=1, max_limit=32, clock=clock), clock
+
+
+def test_429_immediately_reduces_in_flight_requests():
+    limiter, clock = make_limiter(initial=8)
+    requests = [limiter._acquire() for _ in range(8)]
+    assert limiter.stats()["in_flight"] == 8
+
+    clock.advance(1)
+    limiter._release(*requests.pop(), 0, error=RateLimited())
+    assert limiter.limit == 4
+    assert limiter.stats()["throttled"] == 1
+    # The freed slot is not reused: new requests wait until fewer than 4 are in flight
+    assert limiter.stats()["in_flight"] == 7 >= limiter.limit
+
+    # Requests started before the decrease do not halve the limit again
+    for started, saturated in requests[:3]:
+        limiter._release(started, saturated, 0, error=RateLimited())
+    assert limiter.limit == 4
+    assert limiter.stats()["decreases"] == 1
+    for started, saturated in requests[3:]:
+        limiter._release(started, saturated, 0)
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_latency_spike_halves_the_limit():
+    limiter, clock = make_limiter(initial=8)
+    for _ in range(10):
+        request = limiter._acquire()
+        clock.advance(1)
+        limiter._release(*request, 0)
+    assert limiter.limit == 8
+
+    request = limiter._acquire()
+    clock.advance(5)
+    limiter._release(*request, 0)
+    assert limiter.limit == 4
+
+
+def test_limit_does_not_grow_past_the_calling_threads():
+    limiter, clock = make_limiter(initial=4)
+    # Four callers, each starting its next request as soon as the last one ends
+    for _ in range(200):
+        requests = [limiter._acquire() for _ in range(4)]
+        clock.advance(1)
+        for started, saturated in requests:
+            limiter._release(started, saturated, 0)
+    assert limiter.limit == 5
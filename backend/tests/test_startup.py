@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Provider SDKs and optional backends that must only load when actually used
+LAZY_MODULES = ("openai", "google.genai", "google.generativeai", "graphviz")
+
+# Imported in a fresh interpreter with the lazy modules blocked: any import
+# of them is recorded and fails, so does a missing required dependency
+_PROBE = """
+import importlib.abc, json, sys, time
+blocked = tuple(sys.argv[2].split(","))
+attempted = []
+class Blocker(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path, target=None):
+        if any(name == b or name.startswith(b + ".") for b in blocked):
+            attempted.append(name)
+            raise ImportError(f"{name} is blocked")
+        return None
+sys.meta_path.insert(0, Blocker())
+start = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "attempted": attempted}))
+"""
+
+
+@pytest.mark.parametrize("module", ["summarize", "file_documenter", "model_router"])
+def test_import_does_not_load_provider_sdks(module):
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, module, ",".join(LAZY_MODULES)],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report["attempted"] == []
+    budget_ms = float(os.getenv("IMPORT_BUDGET_MS", "1000"))
+    assert report["ms"] <= budget_ms, f"import took {report['ms']:.0f} ms (budget {budget_ms:.0f} ms)"
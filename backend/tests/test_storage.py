@@ -0,0 +1,39 @@
+import os
+
+from storage import StorageManager
+
+
+def make_storage(tmp_path, monkeypatch, max_bytes):
+    monkeypatch.setenv("STORAGE_MAX_BYTES", str(max_bytes))
+    monkeypatch.setenv("SESSION_TTL_HOURS", "0")
+    output_dir = tmp_path / "output"
+    return StorageManager(
+        str(tmp_path / "uploads"), str(tmp_path / "extracted"), str(output_dir), str(output_dir / "zip")
+    )
+
+
+def write(path, nbytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * nbytes)
+
+
+def test_summary_cache_past_the_quota_does_not_block_uploads(tmp_path, monkeypatch):
+    for i in range(10):
+        write(str(tmp_path / "output" / "cache" / f"{i:02d}" / f"{i}.md"), 500)
+    write(str(tmp_path / "output" / "queue" / "queue.db"), 500)
+    storage = make_storage(tmp_path, monkeypatch, max_bytes=1000)
+
+    storage.reserve(800)
+    assert storage.sweep() == []
+
+
+def test_reserve_evicts_least_recently_used_sessions(tmp_path, monkeypatch):
+    write(str(tmp_path / "output" / "old" / "doc.md"), 600)
+    write(str(tmp_path / "output" / "new" / "doc.md"), 300)
+    os.utime(str(tmp_path / "output" / "old"), (1, 1))
+    storage = make_storage(tmp_path, monkeypatch, max_bytes=1000)
+
+    storage.reserve(500)
+    assert not (tmp_path / "output" / "old").exists()
+    assert (tmp_path / "output" / "new").exists()
@@ -0,0 +1,369 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Work queue database, in its own folder under the shared output folder
+QUEUE_FOLDER = "queue"
+QUEUE_FILE = "work_queue.sqlite"
+
+# Job states that still have work for the workers
+OPEN_JOB_STATES = ("running", "paused")
+
+
+def default_queue_path(output_dir: str) -> str:
+    """Return the queue database path: WORK_QUEUE_PATH, else under ``output_dir``."""
+    return os.getenv("WORK_QUEUE_PATH") or os.path.join(output_dir, QUEUE_FOLDER, QUEUE_FILE)
+
+
+def machine_id() -> str:
+    """
+    Identify the machine this process runs on.
+
+    The kernel boot id where available, so containers sharing one host
+    count as the same machine; the host name otherwise.
+    """
+    try:
+        with open("/proc/sys/kernel/random/boot_id", "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return socket.gethostname()
+
+
+class QueueHostError(RuntimeError):
+    """The work queue is in use by processes on another machine."""
+
+
+class WorkQueue:
+    """
+    Work units of documentation jobs, shared by worker processes through SQLite.
+
+    Single machine only: the database runs in WAL mode, which relies on
+    shared memory between the processes using it, and SQLite locking is not
+    reliable on network filesystems. The server and every worker must run
+    on one machine (containers on one host are fine) with the database on
+    a local disk. Opening the queue raises QueueHostError while processes
+    on another machine have used it within the last lease period.
+
+    A job is one session's list of work units (one or a few files each, as
+    planned by Summarize) plus the options needed to rebuild its Summarize
+    in another process. Workers claim units under a lease that they renew
+    while processing; a unit whose lease expires (its worker died) is
+    claimed again by another worker, up to WORK_QUEUE_MAX_ATTEMPTS times.
+    The worker that completes a job's last unit also claims its
+    finalization, so project-wide outputs are written exactly once.
+
+    Claims are fair across jobs: the next unit comes from the job with the
+    least claimed cost relative to its priority, as in FairScheduler.
+
+    Configuration:
+
+    - ``WORK_QUEUE_LEASE_SECONDS``: lease on a claimed unit (300 default)
+    - ``WORK_QUEUE_MAX_ATTEMPTS``: claims per unit before it fails (3 default)
+    """
+
+    def submit(
+        self,
+        session_id: str,
+        units: List[Tuple[List[str], float]],
+        options: Dict[str, Any],
+        priority: int = 1,
+        total_files: Optional[int] = None,
+        done_files: int = 0
+    ) -> str:
+        """
+        Add a job, replacing any earlier job of the same session.
+
+        Args:
+            session_id: Session the job belongs to
+            units: (files, scheduling cost) of every work unit, in processing order
+            options: JSON-serializable settings workers need for this job
+            priority: Fair-share weight of the job
+            total_files: Files in the job including ones already done
+                (defaults to the files in ``units``)
+            done_files: Files already done before the job was submitted
+
+        Returns:
+            The new job id
+        """
+        job_id = str(uuid.uuid4())
+        if total_files is None:
+            total_files = done_files + sum(len(files) for files, _ in units)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM units WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM jobs WHERE session_id = ?", (session_id,))
+            conn.execute(
+                "INSERT INTO jobs (session_id, job_id, status, priority, options, total_files, done_files, created) "
+                "VALUES (?, ?, 'running', ?, ?, ?, ?, ?)",
+                (session_id, job_id, max(priority, 1), json.dumps(options), total_files, done_files, time.time())
+            )
+            conn.executemany(
+                "INSERT INTO units (session_id, seq, files, cost) VALUES (?, ?, ?, ?)",
+                [(session_id, seq, json.dumps(files), cost) for seq, (files, cost) in enumerate(units)]
+            )
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim the next work unit, or return None if there is none.
+
+        Returns:
+            Dict with the unit "id", "session_id", "job_id", "files",
+            "attempt" and the job's "options". A unit that ran out of
+            attempts is failed instead; if that ends its job, the returned
+            dict has "finalize" set and no "id", and the caller must
+            finalize the job.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT u.id, u.session_id, u.files, u.cost, u.attempts, j.job_id, j.options "
+                    "FROM units u JOIN jobs j ON j.session_id = u.session_id "
+                    "WHERE j.status = 'running' AND (u.status = 'pending' OR (u.status = 'claimed' AND u.lease_until < ?)) "
+                    "ORDER BY j.claimed_cost / j.priority, j.created, u.seq LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    return None
+                unit_id, session_id, files, cost, attempts, job_id, options = row
+                item = {"session_id": session_id, "job_id": job_id, "options": json.loads(options)}
+                if attempts < self.max_attempts:
+                    break
+                # Every worker that claimed it died: give up on the unit
+                error = "Work unit lease expired too many times"
+                conn.execute("UPDATE units SET status = 'failed', worker = NULL, error = ? WHERE id = ?", (error, unit_id))
+                conn.execute("UPDATE jobs SET error = ? WHERE session_id = ?", (error, session_id))
+                if self._claim_finalize(conn, session_id):
+                    return dict(item, finalize=True)
+            conn.execute(
+                "UPDATE units SET status = 'claimed', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now + self.lease_seconds, unit_id)
+            )
+            conn.execute("UPDATE jobs SET claimed_cost = claimed_cost + ? WHERE session_id = ?", (cost, session_id))
+        return dict(item, id=unit_id, files=json.loads(files), attempt=attempts + 1)
+
+    def heartbeat(self, unit_ids: List[int], worker_id: str) -> None:
+        """Renew the leases of units a worker is still processing, and mark its machine as active."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE units SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'claimed'",
+                [(time.time() + self.lease_seconds, unit_id, worker_id) for unit_id in unit_ids]
+            )
+
+    def complete(self, unit_id: int, worker_id: str) -> bool:
+        """
+        Mark a claimed unit as done.
+
+        Returns:
+            True if the caller must now finalize the job (it was the last unit)
+        """
+        with self._transaction() as conn:
+            row = self._release(conn, unit_id, worker_id, "done")
+            if row is None:
+                return False
+            session_id, files = row
+            conn.execute(
+                "UPDATE jobs SET done_files = done_files + ? WHERE session_id = ?",
+                (len(json.loads(files)), session_id)
+            )
+            return self._claim_finalize(conn, session_id)
+
+    def fail(self, unit_id: int, worker_id: str, error: str) -> bool:
+        """
+        Record a failed attempt; the unit is retried until its attempts run out.
+
+        Returns:
+            True if the caller must now finalize the job (it was the last unit)
+        """
+        with self._transaction() as conn:
+            attempts = conn.execute("SELECT attempts FROM units WHERE id = ?", (unit_id,)).fetchone()
+            if attempts is not None and attempts[0] < self.max_attempts:
+                conn.execute(
+                    "UPDATE units SET status = 'pending', worker = NULL, error = ? "
+                    "WHERE id = ? AND worker = ? AND status = 'claimed'",
+                    (error, unit_id, worker_id)
+                )
+                return False
+            row = self._release(conn, unit_id, worker_id, "failed", error)
+            if row is None:
+                return False
+            conn.execute("UPDATE jobs SET error = ? WHERE session_id = ?", (error, row[0]))
+            return self._claim_finalize(conn, row[0])
+
+    def finish(self, session_id: str, error: Optional[str] = None) -> None:
+        """Record the end of a job's finalization; the job fails if any unit failed."""
+        with self._transaction() as conn:
+            failed = conn.execute(
+                "SELECT COUNT(*) FROM units WHERE session_id = ? AND status = 'failed'", (session_id,)
+            ).fetchone()[0]
+            if error is None and not failed:
+                conn.execute("UPDATE jobs SET status = 'completed' WHERE session_id = ?", (session_id,))
+            elif error is None:
+                conn.execute("UPDATE jobs SET status = 'failed' WHERE session_id = ?", (session_id,))
+            else:
+                conn.execute("UPDATE jobs SET status = 'failed', error = ? WHERE session_id = ?", (error, session_id))
+
+    def pause(self, session_id: str) -> bool:
+        """Stop handing out a job's units; units already claimed finish normally."""
+        return self._set_status(session_id, "paused", ("running",))
+
+    def resume(self, session_id: str) -> bool:
+        return self._set_status(session_id, "running", ("paused",))
+
+    def cancel(self, session_id: str) -> bool:
+        """Drop a job's pending units; units already claimed finish normally."""
+        with self._transaction() as conn:
+            if not self._set_status(session_id, "cancelled", OPEN_JOB_STATES, conn):
+                return False
+            conn.execute("DELETE FROM units WHERE session_id = ? AND status = 'pending'", (session_id,))
+            return True
+
+    def status(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's state, progress and unit counts, or None if unknown."""
+        with self._lock:
+            job = self._conn.execute(
+                "SELECT job_id, status, total_files, done_files, error FROM jobs WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM units WHERE session_id = ? GROUP BY status", (session_id,)
+            ).fetchall())
+            workers = self._conn.execute(
+                "SELECT COUNT(DISTINCT worker) FROM units WHERE session_id = ? AND status = 'claimed'", (session_id,)
+            ).fetchone()[0]
+        job_id, status, total_files, done_files, error = job
+        return {
+            "job_id": job_id,
+            "status": status,
+            "total_files": total_files,
+            "done_files": done_files,
+            "error": error,
+            "units": {state: counts.get(state, 0) for state in ("pending", "claimed", "done", "failed")},
+            "workers": workers,
+        }
+
+    def is_open(self, job_id: str) -> bool:
+        """True while a job (by id) still has units to process."""
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row is not None and row[0] in OPEN_JOB_STATES
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _release(self, conn: sqlite3.Connection, unit_id: int, worker_id: str, status: str, error: Optional[str] = None):
+        """Move a unit claimed by ``worker_id`` to a final state; return (session_id, files) or None."""
+        row = conn.execute(
+            "SELECT session_id, files FROM units WHERE id = ? AND worker = ? AND status = 'claimed'",
+            (unit_id, worker_id)
+        ).fetchone()
+        if row is None:
+            # Lease lost: the unit was claimed again by another worker
+            return None
+        conn.execute(
+            "UPDATE units SET status = ?, worker = NULL, error = ? WHERE id = ?", (status, error, unit_id)
+        )
+        return row
+
+    def _claim_finalize(self, conn: sqlite3.Connection, session_id: str) -> bool:
+        """Move a job with no unfinished units to "finalizing"; True for the one caller that did."""
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'finalizing' WHERE session_id = ? AND status IN ('running', 'paused') "
+            "AND NOT EXISTS (SELECT 1 FROM units WHERE session_id = ? AND status IN ('pending', 'claimed'))",
+            (session_id, session_id)
+        )
+        return cursor.rowcount == 1
+
+    def _set_status(self, session_id: str, status: str, from_states: Tuple[str, ...], conn=None) -> bool:
+        placeholders = ", ".join("?" for _ in from_states)
+        query = f"UPDATE jobs SET status = ? WHERE session_id = ? AND status IN ({placeholders})"
+        if conn is not None:
+            return conn.execute(query, (status, session_id, *from_states)).rowcount == 1
+        with self._transaction() as conn:
+            return conn.execute(query, (status, session_id, *from_states)).rowcount == 1
+
+    def _register_host(self) -> None:
+        """Record this machine as a user of the queue; refuse if another one is active."""
+        with self._transaction() as conn:
+            other = conn.execute(
+                "SELECT host FROM hosts WHERE host != ? AND last_seen >= ? LIMIT 1",
+                (self.host, time.time() - self.lease_seconds)
+            ).fetchone()
+            if other is not None:
+                raise QueueHostError(
+                    f"Work queue {self.db_path} is in use on another machine. The SQLite work queue "
+                    "only supports a server and workers on one machine, with the database on a local disk."
+                )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Write transaction; BEGIN IMMEDIATE serializes writers across processes.
+
+        Every write also marks this machine as an active user of the queue.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO hosts (host, last_seen) VALUES (?, ?)", (self.host, time.time())
+                )
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "session_id TEXT PRIMARY KEY, job_id TEXT NOT NULL, status TEXT NOT NULL, "
+                "priority INTEGER NOT NULL, options TEXT NOT NULL, claimed_cost REAL NOT NULL DEFAULT 0, "
+                "total_files INTEGER NOT NULL, done_files INTEGER NOT NULL, error TEXT, created REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS units ("
+                "id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, seq INTEGER NOT NULL, files TEXT NOT NULL, "
+                "cost REAL NOT NULL, status TEXT NOT NULL DEFAULT 'pending', worker TEXT, "
+                "lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0, error TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS units_session ON units (session_id, status, seq)")
+            # Machines using the queue, to refuse sharing it across machines
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS hosts (host TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+            )
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Open (or create) the queue database.
+
+        Args:
+            db_path: Path of the SQLite database file, on a local disk of
+                the machine running the server and every worker
+
+        Raises:
+            QueueHostError: If processes on another machine use the queue
+        """
+        self.db_path = db_path
+        self.lease_seconds = float(os.getenv("WORK_QUEUE_LEASE_SECONDS", "300"))
+        self.max_attempts = int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", "3"))
+        parent_dir = os.path.dirname(db_path)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode; _transaction() opens explicit transactions
+        self._conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self.host = machine_id()
+        self._create_schema()
+        self._register_host()
+
@@ -0,0 +1,196 @@
+"""
+Worker process for queue execution mode (EXECUTION_MODE=queue).
+
+    python worker.py [--queue PATH] [--threads N] [--worker-id ID]
+
+Claims work units from the shared WorkQueue, documents their files into the
+session's output folder and, when it completes a job's last unit, writes the
+project-wide outputs and the download ZIP. Run as many workers as needed on
+the server's machine: the SQLite work queue cannot be shared between
+machines (see WorkQueue), and a worker refuses to start while the queue is
+in use on another one.
+"""
+import argparse
+import os
+import shutil
+import socket
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from summarize import Summarize
+from work_queue import QueueHostError, WorkQueue, default_queue_path
+
+
+class Worker:
+    """
+    Processes work units claimed from a WorkQueue on a number of threads.
+
+    A Summarize per job is kept between units, so the project is read and
+    its reference index built once per job and worker rather than per unit.
+    Leases of the units in progress are renewed by a heartbeat thread,
+    which also keeps this machine registered as the queue's active host.
+    """
+
+    # Summarize jobs kept in memory between units
+    MAX_CACHED_JOBS = 8
+
+    def run(self) -> None:
+        """Process units until stop() is called (or forever)."""
+        print(f"Worker {self.worker_id} started with {self.threads} threads on {self.queue.db_path}")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="worker-heartbeat", daemon=True)
+        heartbeat.start()
+        threads = [
+            threading.Thread(target=self._work_loop, name=f"worker-{index}")
+            for index in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            print("Stopping after the units in progress...")
+            self.stop()
+            for thread in threads:
+                thread.join()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def process(self, item: Dict[str, Any]) -> None:
+        """Process one claimed unit, or the finalization of a job."""
+        if item.get("finalize"):
+            self._finalize(item)
+            return
+        with self._lock:
+            self._held.add(item["id"])
+        try:
+            self._job(item).run_unit(item["files"])
+        except Exception as e:
+            print(f"Unit {item['id']} of session {item['session_id']} failed: {e}")
+            finalize = self.queue.fail(item["id"], self.worker_id, str(e))
+        else:
+            finalize = self.queue.complete(item["id"], self.worker_id)
+        finally:
+            with self._lock:
+                self._held.discard(item["id"])
+        if finalize:
+            self._finalize(item)
+
+    def _work_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                item = self.queue.claim(self.worker_id)
+            except Exception as e:
+                print(f"Claiming work failed: {e}")
+                item = None
+            if item is None:
+                self._stop.wait(self.poll_seconds)
+                continue
+            self.process(item)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.queue.lease_seconds / 3):
+            with self._lock:
+                held = list(self._held)
+            try:
+                self.queue.heartbeat(held, self.worker_id)
+            except Exception as e:
+                print(f"Lease renewal failed: {e}")
+
+    def _job(self, item: Dict[str, Any]) -> Summarize:
+        """Return the cached Summarize of the unit's job, creating it on first use."""
+        with self._lock:
+            job = self._jobs.get(item["job_id"])
+            if job is None:
+                # Cheap: the project is only read by the job's first run_unit()
+                job = self._jobs[item["job_id"]] = self._create_job(item)
+                while len(self._jobs) > self.MAX_CACHED_JOBS:
+                    self._jobs.popitem(last=False)
+            else:
+                self._jobs.move_to_end(item["job_id"])
+            return job
+
+    def _create_job(self, item: Dict[str, Any]) -> Summarize:
+        options = item["options"]
+        return Summarize(
+            options["folder_to_summarize"],
+            options["output_folder"],
+            item["session_id"],
+            output_base_dir=options["output_base_dir"],
+            provider=options["provider"],
+            stream=options["stream"],
+            formats=options["formats"],
+            tier=options["tier"]
+        )
+
+    def _finalize(self, item: Dict[str, Any]) -> None:
+        """Write a job's project-wide outputs and ZIP once all its units are done."""
+        with self._lock:
+            self._jobs.pop(item["job_id"], None)
+        try:
+            # A new instance reloads the checkpoint that every worker appended to
+            job = self._create_job(item)
+            job.finalize_completed()
+            zip_path = item["options"].get("zip_path")
+            if zip_path:
+                shutil.make_archive(zip_path, "zip", job.output_folder)
+        except Exception as e:
+            print(f"Finalizing session {item['session_id']} failed: {e}")
+            self.queue.finish(item["session_id"], error=str(e))
+            return
+        self.queue.finish(item["session_id"])
+        print(f"Finalized session {item['session_id']}")
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        threads: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        poll_seconds: Optional[float] = None
+    ) -> None:
+        """
+        Initialize the Worker.
+
+        Args:
+            queue: The shared work queue
+            threads: Units processed at once; defaults to WORKER_THREADS, then 4
+            worker_id: Unique id of this worker; defaults to host, pid and a random suffix
+            poll_seconds: Wait between claims when the queue is empty;
+                defaults to WORKER_POLL_SECONDS, then 1
+        """
+        self.queue = queue
+        self.threads = threads or int(os.getenv("WORKER_THREADS", "4"))
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.poll_seconds = poll_seconds if poll_seconds is not None else float(os.getenv("WORKER_POLL_SECONDS", "1"))
+        self._jobs: "OrderedDict[str, Summarize]" = OrderedDict()
+        # Ids of the units currently being processed, for lease renewal
+        self._held = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Process documentation work units from the shared work queue.")
+    parser.add_argument(
+        "--queue", default=default_queue_path(os.path.join(os.path.dirname(os.getcwd()), "output")),
+        help="Work queue database (default: WORK_QUEUE_PATH, else ../output/queue/work_queue.sqlite like the server)"
+    )
+    parser.add_argument("--threads", type=int, default=None, help="Units processed at once (default: WORKER_THREADS or 4)")
+    parser.add_argument("--worker-id", default=None, help="Unique worker id (default: host-pid-random)")
+    args = parser.parse_args(argv)
+    try:
+        queue = WorkQueue(args.queue)
+    except QueueHostError as e:
+        print(e, file=sys.stderr)
+        return 1
+    Worker(queue, threads=args.threads, worker_id=args.worker_id).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())